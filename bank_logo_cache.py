@@ -0,0 +1,150 @@
+"""
+Cache logo ngân hàng cho bảng danh sách ngân hàng.
+Mục đích: Chỉ tải logo khi dòng được vẽ (DecorationRole), tải ở thread pool nền,
+giữ QPixmap đã giải mã trong LRU bộ nhớ và lưu PNG xuống đĩa để lần sau (kể cả offline)
+không phải tải lại.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+from PyQt5.QtCore import QObject, Qt, pyqtSignal
+from PyQt5.QtGui import QImage, QPixmap
+
+logger = logging.getLogger(__name__)
+
+
+class BankLogoCache(QObject):
+    # Logo của url đã sẵn sàng (phát trên thread UI)
+    logo_ready = pyqtSignal(str)
+    # Nội bộ: chuyển ảnh đã giải mã từ thread nền về thread UI
+    _decoded = pyqtSignal(str, QImage)
+
+    def __init__(self, cache_dir: str = "bank_logos", max_items: int = 200, size: int = 24,
+                 max_workers: int = 4, retry_after: float = 300.0, timeout: float = 10.0, parent=None):
+        """
+        Args:
+            cache_dir: Thư mục lưu PNG đã tải (tên file = sha1(url).png)
+            max_items: Số QPixmap tối đa giữ trong bộ nhớ
+            size: Kích thước (px) logo sau khi thu nhỏ
+            max_workers: Số thread tải song song
+            retry_after: Giây chờ trước khi thử tải lại url bị lỗi
+            timeout: Timeout mỗi request tải logo
+        """
+        super().__init__(parent)
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_items = max_items
+        self.size = size
+        self.retry_after = retry_after
+        self.timeout = timeout
+
+        self._pixmaps = OrderedDict()  # url -> QPixmap (chỉ truy cập trên thread UI)
+        self._pending = set()
+        self._failed = {}  # url -> thời điểm lỗi
+        self._lock = threading.Lock()
+        self._session = requests.Session()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="BankLogo")
+        self._decoded.connect(self._on_decoded)
+
+        self.stats = {"memory_hits": 0, "disk_loads": 0, "downloads": 0, "failures": 0}
+
+    def _count(self, name: str):
+        with self._lock:
+            self.stats[name] += 1
+
+    def path_for(self, url: str) -> Path:
+        return self.cache_dir / f"{hashlib.sha1(url.encode('utf-8')).hexdigest()}.png"
+
+    def pixmap(self, url: str):
+        """
+        Trả về QPixmap nếu đã có trong bộ nhớ; nếu chưa thì đưa vào hàng đợi tải và trả về None.
+        Gọi trên thread UI (từ data() của model).
+        """
+        if not url:
+            return None
+        pixmap = self._pixmaps.get(url)
+        if pixmap is not None:
+            self._pixmaps.move_to_end(url)
+            self._count("memory_hits")
+            return pixmap
+        self._request(url)
+        return None
+
+    def _request(self, url: str):
+        with self._lock:
+            if url in self._pending:
+                return
+            failed_at = self._failed.get(url)
+            if failed_at is not None and time.time() - failed_at < self.retry_after:
+                return
+            self._pending.add(url)
+        self._executor.submit(self._load, url)
+
+    def _read_or_download(self, url: str) -> bytes:
+        path = self.path_for(url)
+        if path.exists():
+            self._count("disk_loads")
+            return path.read_bytes()
+        response = self._session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        data = response.content
+        self._count("downloads")
+        self._write(path, data)
+        return data
+
+    def _write(self, path: Path, data: bytes):
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def _load(self, url: str):
+        # Chạy trên thread nền: QImage an toàn ngoài thread UI, QPixmap thì không
+        try:
+            image = QImage.fromData(self._read_or_download(url))
+            if image.isNull():
+                raise ValueError("dữ liệu ảnh không hợp lệ")
+            image = image.scaled(self.size, self.size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        except Exception as e:
+            logger.warning(f"⚠️ Không tải được logo {url}: {e}")
+            with self._lock:
+                self._pending.discard(url)
+                self._failed[url] = time.time()
+            self._count("failures")
+            return
+        self._decoded.emit(url, image)
+
+    def _on_decoded(self, url: str, image: QImage):
+        with self._lock:
+            self._pending.discard(url)
+            self._failed.pop(url, None)
+        self._pixmaps[url] = QPixmap.fromImage(image)
+        self._pixmaps.move_to_end(url)
+        while len(self._pixmaps) > self.max_items:
+            self._pixmaps.popitem(last=False)
+        self.logo_ready.emit(url)
+
+    def seed(self, url: str, data: bytes):
+        """Nạp sẵn logo (ví dụ từ gói cài đặt) vào cache đĩa để dùng offline"""
+        self._write(self.path_for(url), data)
+
+    def prefetch(self, urls):
+        """Tải trước các logo chưa có trên đĩa (chạy nền, không giải mã vào bộ nhớ)"""
+        def fetch(url):
+            try:
+                if not self.path_for(url).exists():
+                    self._read_or_download(url)
+            except Exception as e:
+                logger.warning(f"⚠️ Không tải trước được logo {url}: {e}")
+        return [self._executor.submit(fetch, url) for url in urls if url]
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._session.close()
@@ -0,0 +1,145 @@
+"""
+Model cho bảng danh sách ngân hàng (tab "Danh sách ngân hàng").
+Mục đích: Mỗi ngân hàng có sẵn chuỗi hiển thị và khóa tìm kiếm (viết thường, bỏ dấu);
+proxy lọc theo khóa này khi gõ, chỉ thu hẹp trên kết quả trước nếu từ khóa được gõ thêm.
+QTableView chỉ vẽ các dòng đang hiện nên không cần phân trang; logo cũng chỉ được tải
+cho các dòng đang hiện (qua BankLogoCache).
+"""
+
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, QSortFilterProxyModel, Qt
+
+from module.field_mapping import normalize_label
+
+HEADERS = [
+    "Tên viết tắt", "Tên đầy đủ", "Mã ngân hàng",
+    "Mã BIN", "Logo", "Hỗ trợ chuyển khoản",
+    "Hỗ trợ tra cứu", "Swift Code"
+]
+COL_LOGO = 4
+
+
+def display_row(bank_code: str, info: dict) -> tuple:
+    """Chuỗi hiển thị của từng cột cho một ngân hàng"""
+    return (
+        bank_code,
+        info.get('name', ''),
+        info.get('code', ''),
+        info.get('bin', ''),
+        info.get('logo', ''),
+        "Có" if info.get('transferSupported') == 1 else "Không",
+        "Có" if info.get('lookupSupported') == 1 else "Không",
+        str(info.get('swift_code', '') or ''),
+    )
+
+
+def search_key(bank_code: str, info: dict) -> str:
+    """Khóa tìm kiếm: tên viết tắt, tên đầy đủ, mã ngân hàng, mã BIN (bỏ dấu, viết thường)"""
+    return normalize_label(" | ".join([
+        bank_code, info.get('name', ''), info.get('code', ''), info.get('bin', ''),
+    ]))
+
+
+class BankTableModel(QAbstractTableModel):
+    def __init__(self, parent=None, logo_cache=None):
+        """
+        Args:
+            logo_cache: BankLogoCache (tùy chọn); không có thì cột logo hiển thị URL
+        """
+        super().__init__(parent)
+        self._codes = []
+        self._infos = []
+        self._display = []
+        self.keys = []  # khóa tìm kiếm theo dòng, dùng bởi BankFilterProxyModel
+        self._logo_rows = {}  # url logo -> các dòng dùng logo đó
+        self.logo_cache = logo_cache
+        if logo_cache is not None:
+            logo_cache.logo_ready.connect(self._on_logo_ready)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._codes)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row, col = index.row(), index.column()
+        if col == COL_LOGO and self.logo_cache is not None:
+            if role == Qt.DecorationRole:
+                # Chỉ được gọi cho dòng đang hiện -> tải logo lười
+                return self.logo_cache.pixmap(self._display[row][col])
+            if role == Qt.ToolTipRole:
+                return self._display[row][col]
+            if role == Qt.DisplayRole:
+                return ""
+        if role == Qt.DisplayRole:
+            return self._display[row][col]
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def set_banks(self, banks: dict):
+        """Nạp danh sách ngân hàng ({tên viết tắt: thông tin}) và tính sẵn khóa tìm kiếm"""
+        self.beginResetModel()
+        self._codes = list(banks.keys())
+        self._infos = list(banks.values())
+        self._display = [display_row(c, i) for c, i in zip(self._codes, self._infos)]
+        self.keys = [search_key(c, i) for c, i in zip(self._codes, self._infos)]
+        self._logo_rows = {}
+        for row, display in enumerate(self._display):
+            self._logo_rows.setdefault(display[COL_LOGO], []).append(row)
+        self.endResetModel()
+
+    def _on_logo_ready(self, url: str):
+        for row in self._logo_rows.get(url, []):
+            index = self.index(row, COL_LOGO)
+            self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+    def bank_at(self, row: int):
+        """(tên viết tắt, thông tin) ở dòng `row` của model nguồn"""
+        return self._codes[row], self._infos[row]
+
+
+class BankFilterProxyModel(QSortFilterProxyModel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._query = ""
+        self._accepted = None  # None = không lọc
+
+    def setSourceModel(self, model):
+        super().setSourceModel(model)
+        model.modelReset.connect(self._reset_filter)
+
+    def _reset_filter(self):
+        query, self._query, self._accepted = self._query, "", None
+        self.set_query(query)
+
+    def set_query(self, text: str):
+        """Lọc theo từ khóa (không phân biệt hoa thường và dấu)"""
+        query = normalize_label(text)
+        if query == self._query:
+            return
+        keys = self.sourceModel().keys
+        if not query:
+            accepted = None
+        elif self._accepted is not None and self._query in query:
+            # Gõ thêm ký tự: kết quả mới là tập con của kết quả cũ
+            accepted = {row for row in self._accepted if query in keys[row]}
+        else:
+            accepted = {row for row, key in enumerate(keys) if query in key}
+        self._query, self._accepted = query, accepted
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        return self._accepted is None or source_row in self._accepted
@@ -0,0 +1,75 @@
+"""
+So sánh tốc độ các backend JSON (module.json_codec) trên file giao dịch thật.
+
+Cách dùng:
+    python bench_json_codec.py [thư mục giao dịch] [--repeat N]
+Không có file ngày nào thì dùng một ngày giả lập 2.000 giao dịch.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from tabulate import tabulate
+
+from module import json_codec
+
+
+def _synthetic_day(rows: int = 2000) -> list:
+    return [{
+        "type": "buy" if i % 2 else "sell",
+        "order_number": f"2271{i:015d}",
+        "amount": 1500000 + i,
+        "bank_name": "Vietcombank",
+        "account_number": f"0071{i:08d}",
+        "account_name": "NGUYỄN VĂN A",
+        "reference": f"P2P {i}",
+        "message": "Status: TRADING\nType: BUY\nPrice: ₫25950\nFiat Amount: 1500000.0 VND\n",
+        "timestamp": 1718000000.0 + i,
+        "order_status": "COMPLETED",
+        "qr_hash": "ab" * 32,
+    } for i in range(rows)]
+
+
+def _best(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("directory", nargs="?", default="transactions")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    files = sorted(Path(args.directory).glob("transactions_*.json"))
+    if files:
+        raw_files = [path.read_bytes() for path in files]
+        source = f"{len(files)} file ngày trong {args.directory}"
+    else:
+        raw_files = [json_codec.get_codec("json").dumps(_synthetic_day(), pretty=True)]
+        source = "1 ngày giả lập (2.000 giao dịch)"
+    days = [json_codec.get_codec("json").loads(raw) for raw in raw_files]
+    rows = sum(len(day) for day in days)
+    print(f"Dữ liệu: {source}, {rows} giao dịch, {sum(map(len, raw_files)) / 1024:.0f} KiB")
+
+    table = []
+    for name in json_codec.available():
+        codec = json_codec.get_codec(name)
+        decode = _best(lambda: [codec.loads(raw) for raw in raw_files], args.repeat)
+        encode = _best(lambda: [codec.dumps(day) for day in days], args.repeat)
+        size = sum(len(codec.dumps(day)) for day in days)
+        table.append([name, f"{decode * 1000:.2f}", f"{encode * 1000:.2f}",
+                      f"{rows / decode:,.0f}", f"{size / 1024:.0f}"])
+    print(tabulate(table, headers=["Backend", "Giải mã (ms)", "Mã hóa gọn (ms)",
+                                   "Giao dịch/giây (giải mã)", "Kích thước gọn (KiB)"]))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
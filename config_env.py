@@ -10,9 +10,15 @@ TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
 
 DISCORD_TOKEN = os.getenv("DISCORD_TOKEN")
-DISCORD_CHAT_ID = int(os.getenv("DISCORD_CHANNEL_ID"))
+DISCORD_CHAT_ID = int(os.getenv("DISCORD_CHANNEL_ID") or 0)
 DISCORD_WEBHOOK = os.getenv("DISCORD_WEBHOOK")
 
+# Kênh thông báo (JSON), ví dụ:
+# [{"name": "buy", "type": "discord", "webhook": "https://...", "trade_types": ["BUY"], "min_amount": 1000000},
+#  {"name": "ops", "type": "telegram", "chat_id": "-100123", "statuses": ["TRADING", "COMPLETED"]}]
+# Trống = dùng DISCORD_WEBHOOK và TELEGRAM_CHAT_ID (có thể nhiều giá trị, cách nhau bởi dấu phẩy)
+NOTIFY_CHANNELS = os.getenv("NOTIFY_CHANNELS", "")
+
 # Specific Environment Variables
 BINANCE_KEY = os.getenv("BINANCE_KEY")
 BINANCE_SECRET = os.getenv("BINANCE_SECRET")
@@ -32,6 +38,24 @@ TELEGRAM_URL = os.getenv("TELEGRAM_URL")
 # CHROME
 CHROME_PATH = os.getenv("CHROME_PATH")
 CHROME_DRIVE = os.getenv("CHROME_DRIVE")
+# Pool nhiều Chrome: "account:port:profile[:concurrency],..." (trống = 1 Chrome mặc định cổng 9222)
+CHROME_INSTANCES = os.getenv("CHROME_INSTANCES", "")
+# Tài khoản của bot này trong CHROME_INSTANCES (trống = instance đầu tiên)
+BINANCE_ACCOUNT = os.getenv("BINANCE_ACCOUNT") or None
+
+# Logging: level của root logger (DEBUG bật log chẩn đoán ở các hàm phân trang/lọc)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+# Số dòng tối đa của khung log trên màn hình
+LOG_VIEW_MAX_LINES = int(os.getenv("LOG_VIEW_MAX_LINES") or 1000)
+
+# Thư mục cache logo ngân hàng (có thể chép sẵn PNG vào đây để dùng offline)
+BANK_LOGO_DIR = os.getenv("BANK_LOGO_DIR", "bank_logos")
+
+# Số ngày giữ pack ảnh QR của các ngày đã qua (0 = giữ vĩnh viễn)
+QR_RETENTION_DAYS = int(os.getenv("QR_RETENTION_DAYS") or 0)
+# Số ngày gần nhất (tính cả hôm nay) giữ dạng JSON; ngày cũ hơn chuyển sang archive dạng cột
+# (mặc định 0 = tắt; khôi phục JSON: python -m module.transaction_archive --restore all)
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS") or 0)
 
 # Version
 VERSION = os.getenv("VERSION", "1.0.0")
\ No newline at end of file
@@ -3,13 +3,15 @@
 Script debug để test việc xử lý order TRADING
 """
 
+import argparse
 import logging
 import sys
 import os
 sys.path.append(os.path.dirname(__file__))
 
 from module.binance_p2p import P2PBinance
-from module.selenium_get_info import extract_order_info, extract_info_by_key
+from module.selenium_get_info import extract_order_info, extract_info_by_key, parse_order_html
+from module.scrape_cache import ScrapeCache, REQUIRED_FIELDS
 
 # Thiết lập logging chi tiết
 logging.basicConfig(
@@ -23,14 +25,43 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
-def test_order_extraction(order_number):
+def load_raw_info(order_number, cache, replay=False, use_cache=True):
+    """
+    Lấy thông tin thô của order: replay HTML đã lưu, dùng cache nếu đã đủ,
+    nếu không thì scrape lại và gộp vào cache
+    """
+    if replay:
+        html = cache.load_html(order_number)
+        if html:
+            logger.info("📼 Replay HTML đã lưu (offline)")
+            raw_info, _ = parse_order_html(html)
+            return raw_info
+        entry = cache.get(order_number, allow_expired=True)
+        if entry:
+            logger.info("📼 Replay kết quả JSON đã lưu (offline)")
+            return entry.get("raw", {})
+        logger.error("❌ Không có dữ liệu đã lưu để replay")
+        return {}
+
+    entry = cache.get(order_number) if use_cache else None
+    if entry and entry.get("complete"):
+        logger.info("💾 Dùng kết quả trong scrape cache")
+        return entry["raw"]
+    pages = []
+    raw_info = extract_order_info(order_number, on_html=pages.append)
+    if raw_info:
+        raw_info = cache.put(order_number, raw_info, pages[-1] if pages else None)["raw"]
+    return raw_info
+
+def test_order_extraction(order_number, replay=False, use_cache=True):
     """Test việc trích xuất thông tin order"""
     logger.info(f"🧪 Bắt đầu test trích xuất order: {order_number}")
     
     try:
         # Test extract_order_info
         logger.info("1️⃣ Test extract_order_info...")
-        raw_info = extract_order_info(order_number)
+        cache = ScrapeCache()
+        raw_info = load_raw_info(order_number, cache, replay=replay, use_cache=use_cache)
         logger.info(f"📊 Raw info: {raw_info}")
         
         if not raw_info:
@@ -43,10 +74,9 @@ def test_order_extraction(order_number):
         logger.info(f"🔧 Processed info: {processed_info}")
         
         # Kiểm tra các trường bắt buộc
-        required_fields = ["Fiat amount", "Full Name", "Bank Card", "Bank Name", "Reference message"]
         missing_fields = []
         
-        for field in required_fields:
+        for field in REQUIRED_FIELDS:
             value = processed_info.get(field)
             if not value:
                 missing_fields.append(field)
@@ -90,16 +120,22 @@ def test_p2p_handling(order_number):
 
 def main():
     """Main function"""
+    parser = argparse.ArgumentParser(description="Debug xử lý order TRADING")
     # Order number từ log của bạn
-    order_number = "22768168737054167040"
+    parser.add_argument("order_number", nargs="?", default="22768168737054167040")
+    parser.add_argument("--replay", action="store_true",
+                        help="Chỉ dùng HTML/JSON đã lưu trong scrape cache, không mở trình duyệt")
+    parser.add_argument("--no-cache", action="store_true", help="Bỏ qua scrape cache, luôn scrape lại")
+    args = parser.parse_args()
+    order_number = args.order_number
     
     logger.info("🚀 Bắt đầu debug order processing")
     logger.info(f"📋 Order number: {order_number}")
     
     # Test 1: Trích xuất thông tin
-    success = test_order_extraction(order_number)
+    success = test_order_extraction(order_number, replay=args.replay, use_cache=not args.no_cache)
     
-    if success:
+    if success and not args.replay:
         # Test 2: Xử lý trong P2P
         test_p2p_handling(order_number)
     else:
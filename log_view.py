@@ -0,0 +1,76 @@
+"""
+Khung log của màn hình chính.
+Mục đích: Handler chỉ đẩy dòng log vào ring buffer (không phát signal cho từng bản ghi);
+LogView rút buffer theo nhịp khung hình và thêm cả lô vào QPlainTextEdit giới hạn số dòng.
+Ghi log từ thread nào cũng được, việc vẽ luôn ở thread UI.
+"""
+
+import logging
+import threading
+from collections import deque
+
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QPlainTextEdit
+
+
+class RingLogHandler(logging.Handler):
+    def __init__(self, max_lines: int = 1000, level=logging.NOTSET):
+        """
+        Args:
+            max_lines: Số dòng chờ hiển thị tối đa; dòng cũ nhất bị bỏ khi đầy
+        """
+        super().__init__(level)
+        self._pending = deque(maxlen=max_lines)
+        self._pending_lock = threading.Lock()
+        self.dropped = 0
+
+    def emit(self, record):
+        try:
+            msg = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        with self._pending_lock:
+            if len(self._pending) == self._pending.maxlen:
+                self.dropped += 1
+            self._pending.append(msg)
+
+    def drain(self):
+        """Lấy toàn bộ dòng đang chờ; trả về (danh sách dòng, số dòng đã bị bỏ)"""
+        with self._pending_lock:
+            lines = list(self._pending)
+            self._pending.clear()
+            dropped, self.dropped = self.dropped, 0
+        return lines, dropped
+
+
+class LogView(QPlainTextEdit):
+    def __init__(self, handler: RingLogHandler, max_lines: int = 1000, interval_ms: int = 33, parent=None):
+        """
+        Args:
+            handler: RingLogHandler cung cấp dòng log
+            max_lines: Số dòng tối đa giữ trên màn hình
+            interval_ms: Chu kỳ thêm lô log (mặc định ~1 khung hình 30fps)
+        """
+        super().__init__(parent)
+        self.handler = handler
+        self.setReadOnly(True)
+        self.setMaximumBlockCount(max_lines)
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self.flush)
+        self._timer.start()
+
+    def flush(self):
+        """Thêm mọi dòng đang chờ trong một lần cập nhật widget"""
+        lines, dropped = self.handler.drain()
+        if not lines:
+            return
+        if dropped:
+            lines.insert(0, f"… bỏ qua {dropped} dòng log")
+        scrollbar = self.verticalScrollBar()
+        self.appendPlainText("\n".join(lines))
+        scrollbar.setValue(scrollbar.maximum())
+
+    def stop(self):
+        self._timer.stop()
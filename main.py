@@ -2,22 +2,24 @@ from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QPushButton,
                            QLabel, QVBoxLayout, QPlainTextEdit, QFileDialog, 
                            QDateEdit, QMessageBox, QHBoxLayout, QTabWidget, 
                            QGroupBox, QLineEdit, QTextEdit, QComboBox, 
-                           QSpinBox, QDoubleSpinBox, QTableWidget, QHeaderView, 
-                           QTableWidgetItem, QScrollArea, QAbstractItemView, 
+                           QSpinBox, QDoubleSpinBox, QHeaderView, 
+                           QTableView, QScrollArea, QAbstractItemView, 
                            QFormLayout, QCheckBox, QProgressDialog, QProgressBar,
                            QFrame, QSplitter, QDialog, QDialogButtonBox, QTimeEdit,
                            QSizePolicy)
-from PyQt5.QtCore import QObject, pyqtSignal, QThread, QDate, QThread, Qt, QTimer, QTime
+from PyQt5.QtCore import QObject, pyqtSignal, QThread, QDate, QThread, Qt, QTimer, QTime, QSize
 from PyQt5.QtGui import QFont, QIcon, QPixmap, QImage
 
 import sys
 import logging
-from module.selenium_get_info import login_app, launch_chrome_remote_debugging
+from module.selenium_get_info import login_app
+from module.browser_pool import get_browser_pool
 from module.binance_p2p import P2PBinance
-from datetime import datetime
+from datetime import datetime, timedelta
 import tracemalloc
 import os
 import time
+import threading
 import json
 import pandas as pd
 from selenium import webdriver
@@ -28,9 +30,18 @@ from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from module.generate_qrcode import generate_vietqr, get_bank_bin, get_nganhang_api
 from dotenv import load_dotenv
 from module.transaction_storage import TransactionStorage
+from module.models import OrderSide, Transaction
 from transaction_viewer import TransactionViewer
+from transaction_table_model import TransactionTableModel
+from bank_table_model import BankTableModel, BankFilterProxyModel
+from bank_logo_cache import BankLogoCache
+from qr_preview_cache import get_preview_cache
+from transaction_watcher import TransactionChangeWatcher
+from transaction_loader import TransactionLoader, format_day_summary
 from module.resource_path import resource_path
-from config_env import VERSION
+from config_env import (VERSION, LOG_LEVEL, LOG_VIEW_MAX_LINES, BANK_LOGO_DIR, QR_RETENTION_DAYS,
+                        ARCHIVE_AFTER_DAYS, BINANCE_ACCOUNT)
+from log_view import LogView, RingLogHandler
 
 # Load biến môi trường
 load_dotenv()
@@ -62,17 +73,6 @@ if expire_date_str:
 
 tracemalloc.start()
 
-class LogHandler(logging.Handler, QObject):
-    log_signal = pyqtSignal(str)
-
-    def __init__(self):
-        logging.Handler.__init__(self)
-        QObject.__init__(self)
-
-    def emit(self, record):
-        msg = self.format(record)
-        self.log_signal.emit(msg)
-
 class ApiKeyDialog(QDialog):
     """Dialog để người dùng nhập BINANCE_KEY và BINANCE_SECRET"""
     
@@ -177,7 +177,8 @@ class ApiKeyDialog(QDialog):
         
 class ChromeThread(QThread):
     def run(self):
-        launch_chrome_remote_debugging()
+        # Chỉ mở Chrome của tài khoản bot này; instance khác dành cho bot chạy tài khoản khác
+        get_browser_pool().instance_for(BINANCE_ACCOUNT).launch()
 
 class Worker(QObject):
     finished = pyqtSignal()
@@ -247,17 +248,33 @@ class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         # Khởi tạo P2PBinance với API keys đã được cập nhật
-        self.p2p_instance = P2PBinance(api_key=BINANCE_KEY, api_secret=BINANCE_SECRET)
+        self.p2p_instance = P2PBinance(api_key=BINANCE_KEY, api_secret=BINANCE_SECRET,
+                                        account=BINANCE_ACCOUNT)
         self.chrome_thread = ChromeThread()
         self.bank_cache = None  # Cache cho danh sách ngân hàng
-        self.current_page = 0  # Trang hiện tại của danh sách ngân hàng
-        self.rows_per_page = 20  # Số dòng mỗi trang của danh sách ngân hàng
-        self.transaction_cache = None  # Cache cho danh sách giao dịch
         self.transaction_page = 0  # Trang hiện tại của danh sách giao dịch
+        self.transaction_total = 0  # Tổng số giao dịch sau khi lọc
+        self._transaction_request = 0  # request_id của yêu cầu tải trang mới nhất
+        self._transaction_request_silent = False
         self.transaction_rows_per_page = 20  # Số dòng mỗi trang của danh sách giao dịch
         
         # Khởi tạo storage trước
         self.transaction_storage = TransactionStorage()
+        # Theo dõi thay đổi file giao dịch cho chế độ realtime
+        self.transaction_watcher = TransactionChangeWatcher(self.transaction_storage, parent=self)
+        self.transaction_watcher.changed.connect(self.realtime_refresh)
+        # Bảo trì lưu trữ (đóng gói QR, lưu trữ ngày đã đóng) khi mở app và mỗi đêm lúc 00:05
+        self.start_storage_maintenance()
+        self.maintenance_timer = QTimer(self)
+        self.maintenance_timer.setSingleShot(True)
+        self.maintenance_timer.timeout.connect(self.run_nightly_maintenance)
+        self.schedule_nightly_maintenance()
+        # Ảnh xem trước QR dùng chung với TransactionViewer
+        self.qr_previews = get_preview_cache()
+        # Đọc/lọc giao dịch ở thread nền
+        self.transaction_loader = TransactionLoader(self.transaction_storage)
+        self.transaction_loader.page_ready.connect(self.on_transaction_page_ready)
+        self.transaction_loader.failed.connect(self.on_transaction_load_failed)
         
         # Khởi tạo logging và UI
         self.init_logging()
@@ -272,9 +289,10 @@ class MainWindow(QMainWindow):
         # Load dữ liệu ban đầu
         self.refresh_transaction_list()
         
-        # Khởi tạo timer cho realtime update
+        # Timer dự phòng cho realtime: chỉ so sánh mtime/size file ngày (không đọc file),
+        # phòng khi watcher bỏ lỡ sự kiện (ổ mạng...). Refresh thật do watcher kích hoạt.
         self.realtime_timer = QTimer()
-        self.realtime_timer.timeout.connect(self.realtime_refresh)
+        self.realtime_timer.timeout.connect(self.transaction_watcher.check_now)
         self.realtime_enabled = False  # Mặc định tắt realtime
         self.realtime_interval = 5000  # 5 giây mặc định
         self.last_update_time = None  # Thời gian cập nhật cuối cùng
@@ -372,9 +390,7 @@ class MainWindow(QMainWindow):
         # Phần log
         log_group = QGroupBox("Log")
         log_layout = QVBoxLayout()
-        self.log_output = QPlainTextEdit()
-        self.log_output.setReadOnly(True)
-        self.log_output.setMaximumBlockCount(1000)
+        self.log_output = LogView(self.log_handler, max_lines=LOG_VIEW_MAX_LINES)
         self.log_output.setFont(QFont("Arial", 10))  # Giảm cỡ chữ log
         # Cho phép log output resize linh hoạt hơn
         self.log_output.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
@@ -464,25 +480,25 @@ class MainWindow(QMainWindow):
         realtime_group.setLayout(realtime_layout)
         trade_layout.addWidget(realtime_group)
         
-        # Bảng giao dịch
-        self.trade_table = QTableWidget()
-        self.trade_table.setColumnCount(10)  # Tăng lên 10 cột
+        # Bảng giao dịch (QTableView + model cập nhật theo diff)
+        self.trade_table = QTableView()
+        self.trade_model = TransactionTableModel(self)
+        self.trade_table.setModel(self.trade_model)
         self.trade_table.setFont(QFont("Arial", 10))  # Giảm cỡ chữ bảng giao dịch
-        self.trade_table.setHorizontalHeaderLabels([
-            "Loại", "Số Order", "Số tiền", "Ngân hàng",
-            "Số TK", "Tên TK", "Thông tin", "Thời gian", "Trạng thái", "Action"
-        ])
         # Tự động điều chỉnh độ rộng cột
         self.trade_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
         # Làm cho cột 'Thông tin' tự động co giãn để lấp đầy không gian còn lại
         self.trade_table.horizontalHeader().setSectionResizeMode(6, QHeaderView.Stretch)
         # Cho phép chọn từng ô và cho phép chọn nhiều ô
-        self.trade_table.setSelectionBehavior(QTableWidget.SelectItems)
+        self.trade_table.setSelectionBehavior(QAbstractItemView.SelectItems)
         self.trade_table.setSelectionMode(QAbstractItemView.ExtendedSelection)
         # Tắt chỉnh sửa
-        self.trade_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.trade_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        # Mặc định sắp xếp theo thời gian, mới nhất lên đầu
+        self.trade_table.horizontalHeader().setSortIndicator(7, Qt.DescendingOrder)
+        self.trade_table.setSortingEnabled(True)
         # Kết nối sự kiện chọn dòng
-        self.trade_table.itemSelectionChanged.connect(self.on_trade_selection_change)
+        self.trade_table.selectionModel().selectionChanged.connect(self.on_trade_selection_change)
         
         # Cho phép bảng resize linh hoạt hơn
         self.trade_table.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
@@ -501,6 +517,11 @@ class MainWindow(QMainWindow):
         trade_pagination_layout.addWidget(self.trade_next_page_btn)
         trade_layout.addLayout(trade_pagination_layout)
         
+        # Tổng kết ngày đang xem (từ bảng tổng hợp, không duyệt lại giao dịch)
+        self.trade_summary_label = QLabel()
+        self.trade_summary_label.setFont(QFont("Arial", 10))
+        trade_layout.addWidget(self.trade_summary_label)
+        
         # Thêm nút xem QR và label hiển thị QR
         qr_layout = QHBoxLayout()
         self.view_qr_btn = QPushButton("Xem QR")
@@ -734,37 +755,31 @@ class MainWindow(QMainWindow):
         search_group.setLayout(search_layout)
         bank_layout.addWidget(search_group)
         
-        # Bảng danh sách ngân hàng
-        self.bank_table = QTableWidget()
-        self.bank_table.setColumnCount(8)
-        self.bank_table.setHorizontalHeaderLabels([
-            "Tên viết tắt", "Tên đầy đủ", "Mã ngân hàng", 
-            "Mã BIN", "Logo URL", "Hỗ trợ chuyển khoản",
-            "Hỗ trợ tra cứu", "Swift Code"
-        ])
-        # Tự động điều chỉnh độ rộng cột
-        self.bank_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        # Bảng danh sách ngân hàng (model + proxy lọc, không phân trang)
+        self.bank_logo_cache = BankLogoCache(BANK_LOGO_DIR, parent=self)
+        self.bank_model = BankTableModel(self, logo_cache=self.bank_logo_cache)
+        self.bank_proxy = BankFilterProxyModel(self)
+        self.bank_proxy.setSourceModel(self.bank_model)
+        self.bank_table = QTableView()
+        self.bank_table.setModel(self.bank_proxy)
+        self.bank_table.setSortingEnabled(True)
+        self.bank_table.sortByColumn(-1, Qt.AscendingOrder)  # Giữ thứ tự gốc cho tới khi bấm tiêu đề
+        # Chiều cao dòng cố định: view chỉ tính và vẽ các dòng đang hiện
+        self.bank_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.bank_table.verticalHeader().setDefaultSectionSize(28)
+        self.bank_table.setIconSize(QSize(self.bank_logo_cache.size, self.bank_logo_cache.size))
+        self.bank_table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
         # Chỉ cho phép chọn dòng
-        self.bank_table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.bank_table.setSelectionBehavior(QTableView.SelectRows)
         # Tắt chỉnh sửa
-        self.bank_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.bank_table.setEditTriggers(QTableView.NoEditTriggers)
         
         # Cho phép bảng resize linh hoạt hơn
         self.bank_table.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         
         bank_layout.addWidget(self.bank_table)
-        
-        # Thêm phân trang
-        pagination_layout = QHBoxLayout()
-        self.prev_page_btn = QPushButton("Trang trước")
-        self.prev_page_btn.clicked.connect(self.prev_page)
-        self.next_page_btn = QPushButton("Trang sau")
-        self.next_page_btn.clicked.connect(self.next_page)
-        self.page_label = QLabel("Trang 1")
-        pagination_layout.addWidget(self.prev_page_btn)
-        pagination_layout.addWidget(self.page_label)
-        pagination_layout.addWidget(self.next_page_btn)
-        bank_layout.addLayout(pagination_layout)
+        self.bank_count_label = QLabel("")
+        bank_layout.addWidget(self.bank_count_label)
         
         bank_tab.setLayout(bank_layout)
         self.tab_widget.addTab(main_tab, "Chính")
@@ -926,7 +941,7 @@ class MainWindow(QMainWindow):
         try:
             # Nếu đã có cache và không phải đang đồng bộ, sử dụng cache
             if self.bank_cache is not None and not hasattr(self, '_syncing_banks'):
-                self.display_bank_page()
+                self.display_banks()
                 return
 
             # Sử dụng resource_path để lấy đường dẫn chính xác
@@ -943,8 +958,7 @@ class MainWindow(QMainWindow):
             
             # Lưu vào cache
             self.bank_cache = banks
-            self.current_page = 0
-            self.display_bank_page()
+            self.display_banks()
             
             self.log(f"✅ Đã tải {len(banks)} ngân hàng thành công")
             
@@ -956,107 +970,21 @@ class MainWindow(QMainWindow):
                 f"Không thể tải danh sách ngân hàng: {str(e)}"
             )
 
-    def display_bank_page(self):
-        """Hiển thị trang hiện tại của danh sách ngân hàng"""
-        self.log(f"Gọi display_bank_page. Current page: {self.current_page}")
-        if not self.bank_cache:
-            self.log("Bank cache rỗng, không hiển thị trang.")
-            return
-
-        # Tính toán phạm vi dữ liệu cần hiển thị
-        start_idx = self.current_page * self.rows_per_page
-        
-        # Lấy danh sách ngân hàng đã lọc (nếu có)
-        filtered_banks = self.get_filtered_banks()
-        
-        end_idx = min(start_idx + self.rows_per_page, len(filtered_banks))
-        
-        self.log(f"Hiển thị từ {start_idx} đến {end_idx}. Tổng số ngân hàng đã lọc: {len(filtered_banks)}")
-        
-        # Cập nhật bảng
-        self.bank_table.setRowCount(end_idx - start_idx)
-        
-        # Hiển thị dữ liệu cho trang hiện tại
-        for row, (bank_code, bank_info) in enumerate(list(filtered_banks.items())[start_idx:end_idx]):
-            # Tên viết tắt
-            self.bank_table.setItem(row, 0, QTableWidgetItem(bank_code))
-            
-            # Tên đầy đủ
-            self.bank_table.setItem(row, 1, QTableWidgetItem(bank_info['name']))
-            
-            # Mã ngân hàng
-            self.bank_table.setItem(row, 2, QTableWidgetItem(bank_info['code']))
-            
-            # Mã BIN
-            self.bank_table.setItem(row, 3, QTableWidgetItem(bank_info['bin']))
-            
-            # Logo URL
-            self.bank_table.setItem(row, 4, QTableWidgetItem(bank_info['logo']))
-            
-            # Hỗ trợ chuyển khoản
-            transfer_supported = "Có" if bank_info['transferSupported'] == 1 else "Không"
-            self.bank_table.setItem(row, 5, QTableWidgetItem(transfer_supported))
-            
-            # Hỗ trợ tra cứu
-            lookup_supported = "Có" if bank_info['lookupSupported'] == 1 else "Không"
-            self.bank_table.setItem(row, 6, QTableWidgetItem(lookup_supported))
-            
-            # Swift Code
-            self.bank_table.setItem(row, 7, QTableWidgetItem(str(bank_info.get('swift_code', ''))))
-            
-            # Căn giữa các cột
-            for col in range(self.bank_table.columnCount()):
-                item = self.bank_table.item(row, col)
-                if item:
-                    item.setTextAlignment(Qt.AlignCenter)
-        
-        # Cập nhật thông tin phân trang
-        total_pages = (len(filtered_banks) + self.rows_per_page - 1) // self.rows_per_page
-        self.page_label.setText(f"Trang {self.current_page + 1}/{total_pages}")
-        self.prev_page_btn.setEnabled(self.current_page > 0)
-        self.next_page_btn.setEnabled(self.current_page < total_pages - 1)
-
-    def get_filtered_banks(self):
-        """Lấy danh sách ngân hàng đã được lọc theo từ khóa tìm kiếm"""
-        self.log(f"Đang gọi get_filtered_banks. Bank cache: {len(self.bank_cache) if self.bank_cache else 'None'}")
-        if not self.bank_cache:
-            return {}
-            
-        search_text = self.bank_search.text().lower()
-        self.log(f"Search text: '{search_text}'")
-        if not search_text:
-            self.log("Trả về toàn bộ cache vì không có từ khóa tìm kiếm.")
-            return self.bank_cache
-            
-        filtered_banks = {
-            code: info for code, info in self.bank_cache.items()
-            if search_text in code.lower() or 
-               search_text in info['name'].lower() or
-               search_text in info['code'].lower() or
-               search_text in info['bin'].lower()
-        }
-        self.log(f"Đã lọc, tìm thấy {len(filtered_banks)} ngân hàng.")
-        return filtered_banks
+    def display_banks(self):
+        """Nạp bank_cache vào bảng (từ khóa tìm kiếm hiện tại được áp dụng lại)"""
+        self.bank_model.set_banks(self.bank_cache or {})
+        self.bank_table.resizeColumnsToContents()
+        self.update_bank_count()
 
     def filter_banks(self):
         """Lọc danh sách ngân hàng theo từ khóa tìm kiếm"""
-        self.log("Gọi filter_banks: Đang reset trang và hiển thị lại.")
-        self.current_page = 0  # Reset về trang đầu
-        self.display_bank_page()
-
-    def prev_page(self):
-        """Chuyển đến trang trước"""
-        if self.current_page > 0:
-            self.current_page -= 1
-            self.display_bank_page()
-
-    def next_page(self):
-        """Chuyển đến trang sau"""
-        filtered_banks = self.get_filtered_banks()
-        total_pages = (len(filtered_banks) + self.rows_per_page - 1) // self.rows_per_page
-        if self.current_page < total_pages - 1:
-            self.current_page += 1
-            self.display_bank_page()
+        self.bank_proxy.set_query(self.bank_search.text())
+        self.update_bank_count()
+
+    def update_bank_count(self):
+        self.bank_count_label.setText(
+            f"Hiển thị {self.bank_proxy.rowCount()}/{self.bank_model.rowCount()} ngân hàng"
+        )
 
     def sync_bank_list(self):
         """Đồng bộ danh sách ngân hàng từ API VietQR"""
@@ -1066,8 +994,7 @@ class MainWindow(QMainWindow):
             banks = get_nganhang_api()
             if banks:
                 self.bank_cache = banks  # Cập nhật cache
-                self.current_page = 0  # Reset về trang đầu
-                self.display_bank_page()
+                self.display_banks()
                 self.log(f"✅ Đã cập nhật {len(banks)} ngân hàng thành công")
                 QMessageBox.information(
                     self,
@@ -1119,7 +1046,8 @@ class MainWindow(QMainWindow):
                 os.environ["BINANCE_SECRET"] = BINANCE_SECRET
                 
                 # Tạo lại P2PBinance instance với API keys mới
-                self.p2p_instance = P2PBinance(api_key=BINANCE_KEY, api_secret=BINANCE_SECRET)
+                self.p2p_instance = P2PBinance(api_key=BINANCE_KEY, api_secret=BINANCE_SECRET,
+                                                account=BINANCE_ACCOUNT)
                 
                 self.log("✅ API Keys đã được cập nhật thành công")
                 QMessageBox.information(
@@ -1176,18 +1104,19 @@ class MainWindow(QMainWindow):
                 return
 
             # Tạo thông tin giao dịch
-            transaction_info = {
-                'type': trade_type,
-                'amount': amount,
-                'bank_name': bank_name,
-                'account_number': account_number,
-                'account_name': account_name,
-                'message': message,
-                'timestamp': int(datetime.now().timestamp())
-            }
+            transaction = Transaction(
+                side=OrderSide.parse(trade_type),
+                amount=amount,
+                bank_name=bank_name,
+                account_number=account_number,
+                account_name=account_name,
+                message=message,
+                timestamp=int(datetime.now().timestamp()),
+            )
 
             # Lưu giao dịch
-            order_number = self.transaction_storage.save_transaction(transaction_info)
+            saved = self.transaction_storage.save_transaction(transaction)
+            order_number = saved.get('order_number')
             
             # Cập nhật giao diện
             self.generate_qr_button.setEnabled(True)
@@ -1201,8 +1130,7 @@ class MainWindow(QMainWindow):
                 self.log(f"💬 Nội dung: {message}")
 
             # Lưu thông tin giao dịch hiện tại
-            self.p2p_instance.current_transaction = transaction_info
-            self.p2p_instance.current_transaction['order_number'] = order_number
+            self.p2p_instance.current_transaction = Transaction.from_dict(saved)
 
             # Xóa form
             self.clear_form()
@@ -1225,24 +1153,18 @@ class MainWindow(QMainWindow):
 
     def init_logging(self):
         """Khởi tạo logging"""
-        self.log_handler = LogHandler()
-        self.log_handler.log_signal.connect(self.append_log)
+        # Handler chỉ ghi vào ring buffer; LogView thêm log theo lô mỗi khung hình
+        self.log_handler = RingLogHandler(max_lines=LOG_VIEW_MAX_LINES)
         formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s', datefmt='%H:%M:%S')
         self.log_handler.setFormatter(formatter)
 
         root_logger = logging.getLogger()
         root_logger.addHandler(self.log_handler)
-        root_logger.setLevel(logging.INFO)
+        root_logger.setLevel(getattr(logging, LOG_LEVEL.upper(), logging.INFO))
 
         self.logger = logging.getLogger("MyApp")
         self.logger.info("🚀 Ứng dụng khởi động")
 
-    def append_log(self, msg):
-        """Thêm log vào text box"""
-        if hasattr(self, 'log_output'):
-            self.log_output.appendPlainText(msg)
-            self.log_output.verticalScrollBar().setValue(self.log_output.verticalScrollBar().maximum())
-
     def log(self, msg):
         """Ghi log với level INFO"""
         if hasattr(self, 'logger'):
@@ -1250,6 +1172,13 @@ class MainWindow(QMainWindow):
         else:
             print(msg)  # Fallback nếu logger chưa được khởi tạo
 
+    def debug(self, msg, *args):
+        """
+        Ghi log chẩn đoán level DEBUG cho các hàm gọi thường xuyên (phân trang, lọc).
+        Chuỗi chỉ được format khi DEBUG đang bật (LOG_LEVEL=DEBUG).
+        """
+        self.logger.debug(msg, *args)
+
     def clear_log(self):
         self.log_output.clear()
         self.log("🗑️ Log đã được xóa")
@@ -1530,12 +1459,12 @@ class MainWindow(QMainWindow):
             tx = self.p2p_instance.current_transaction
             
             # Lấy thông tin từ giao dịch hiện tại
-            amount = tx.get("amount", "1000000")
-            account_number = tx.get("account_number", "")
-            account_name = tx.get("account_name", "")
-            bank_name = tx.get("bank_name", "")
-            reference = tx.get("reference", "")
-            order_number = tx.get("order_number", "")
+            amount = tx.amount or 1000000
+            account_number = tx.account_number or ""
+            account_name = tx.account_name or ""
+            bank_name = tx.bank_name or ""
+            reference = tx.reference or ""
+            order_number = tx.order_number or ""
 
             # Kiểm tra thông tin bắt buộc
             if not all([amount, account_number, account_name, bank_name]):
@@ -1594,7 +1523,7 @@ class MainWindow(QMainWindow):
         self.log("🔚 Đóng ứng dụng...")
         if self.p2p_instance:
             self.p2p_instance.stop()
-        if self.login_thread:
+        if getattr(self, 'login_thread', None):
             try:
                 if self.login_thread.isRunning():
                     self.login_thread.quit()
@@ -1602,7 +1531,7 @@ class MainWindow(QMainWindow):
             except RuntimeError:
                 pass  # Thread có thể đã bị delete
 
-        if self.run_thread:
+        if getattr(self, 'run_thread', None):
             try:
                 if self.run_thread.isRunning():
                     self.run_thread.quit()
@@ -1610,11 +1539,16 @@ class MainWindow(QMainWindow):
             except RuntimeError:
                 pass  # Thread có thể đã bị delete
 
+        self.transaction_watcher.stop()
+        self.transaction_loader.shutdown()
+        get_browser_pool().stop_all()
+        self.log_output.stop()
+        self.bank_logo_cache.shutdown()
         logging.getLogger().removeHandler(self.log_handler)
         event.accept()
 
     def refresh_transaction_list(self, silent=False):
-        """Refresh danh sách giao dịch trong bảng"""
+        """Refresh danh sách giao dịch trong bảng (đọc lại file ngày ở thread nền)"""
         try:
             if not silent:
                 self.log("Đang làm mới danh sách giao dịch...")
@@ -1622,36 +1556,14 @@ class MainWindow(QMainWindow):
             date = self.date_edit.date().toPyDate()
             if not silent:
                 self.log(f"Ngày đã chọn: {date.strftime('%d/%m/%Y')}")
-            
-            # Lấy danh sách giao dịch từ storage
-            transactions = self.transaction_storage.get_transactions_by_date(date)
-            
-            # Kiểm tra xem có giao dịch mới không
-            old_count = len(self.transaction_cache) if self.transaction_cache else 0
-            new_count = len(transactions)
-            
-            # Lưu vào cache
-            self.transaction_cache = transactions
+            # Mốc so sánh cho watcher là trạng thái file tại lần đọc này
+            self.transaction_watcher.set_date(date)
             
             # Chỉ reset trang nếu không phải realtime update
             if not silent:
                 self.transaction_page = 0  # Reset về trang đầu
             
-            if not silent:
-                self.log(f"Đã tải {len(transactions)} giao dịch từ storage.")
-            
-            # Hiển thị danh sách
-            self.display_transaction_page()
-            
-            if not transactions:
-                if not silent:
-                    self.log(f"ℹ️ Không tìm thấy giao dịch nào cho ngày {date.strftime('%d/%m/%Y')}")
-            else:
-                if silent and new_count > old_count:
-                    # Chỉ log khi có giao dịch mới trong realtime
-                    self.log(f"🆕 Phát hiện {new_count - old_count} giao dịch mới! (Tổng: {new_count})")
-                elif not silent:
-                    self.log(f"🔄 Đã cập nhật danh sách giao dịch ({len(transactions)} giao dịch)")
+            self.request_transaction_page(reload=True, silent=silent)
             
         except Exception as e:
             self.log(f"❌ Lỗi khi cập nhật danh sách giao dịch: {str(e)}")
@@ -1662,137 +1574,94 @@ class MainWindow(QMainWindow):
                     f"Không thể cập nhật danh sách giao dịch: {str(e)}"
                 )
 
-    def display_transaction_page(self):
-        """Hiển thị trang hiện tại của danh sách giao dịch"""
-        self.log(f"Gọi display_transaction_page. Trang hiện tại: {self.transaction_page}")
-        
-        # Lấy danh sách giao dịch đã lọc
-        filtered_transactions = self.get_filtered_transactions()
-        self.log(f"Tổng số giao dịch sau khi lọc: {len(filtered_transactions)}")
-        
-        # Tính toán phạm vi dữ liệu cần hiển thị
-        start_idx = self.transaction_page * self.transaction_rows_per_page
-        end_idx = min(start_idx + self.transaction_rows_per_page, len(filtered_transactions))
-        
-        self.log(f"Phạm vi hiển thị: từ {start_idx} đến {end_idx}. Số hàng sẽ hiển thị: {end_idx - start_idx}")
-        
-        # Tắt sorting trước khi cập nhật dữ liệu
-        self.trade_table.setSortingEnabled(False)
-        # Cập nhật bảng
-        self.trade_table.setRowCount(end_idx - start_idx)
+    def schedule_nightly_maintenance(self):
+        """Hẹn giờ bảo trì lần tới lúc 00:05 (theo đồng hồ, không phụ thuộc giờ mở app)"""
+        now = datetime.now()
+        next_run = datetime.combine(now.date() + timedelta(days=1), datetime.min.time()) + timedelta(minutes=5)
+        self.maintenance_timer.start(int((next_run - now).total_seconds() * 1000))
+
+    def run_nightly_maintenance(self):
+        self.start_storage_maintenance()
+        self.schedule_nightly_maintenance()
+
+    def start_storage_maintenance(self):
+        """
+        Chạy nền (không chặn giao diện): đóng gói ảnh QR, chuyển các ngày đã đóng sang archive
+        và xóa scrape cache hết hạn
+        """
+        p2p_instance = self.p2p_instance
+
+        def run():
+            self.transaction_storage.compact_qr_assets(retention_days=QR_RETENTION_DAYS)
+            self.transaction_storage.compact_closed_days(keep_days=ARCHIVE_AFTER_DAYS)
+            if p2p_instance is not None:
+                p2p_instance.scrape_cache.purge_expired()
+        threading.Thread(target=run, name="StorageMaintenance", daemon=True).start()
+
+    def request_transaction_page(self, reload=False, silent=True):
+        """Gửi yêu cầu tải trang hiện tại theo bộ lọc; yêu cầu cũ chưa xong sẽ bị bỏ"""
+        self._transaction_request_silent = bool(silent)
+        self._transaction_request = self.transaction_loader.request(
+            self.date_edit.date().toPyDate(),
+            self.transaction_page,
+            self.transaction_rows_per_page,
+            order_suffix=self.order_number_input.text().strip(),
+            trade_type=self.transaction_type_combo.currentText(),
+            order_status=self.order_status_combo.currentText(),
+            reload=reload,
+        )
+
+    def on_transaction_page_ready(self, request_id, result):
+        """Nhận trang đã lọc/sắp xếp từ thread nền và cập nhật bảng"""
+        if request_id != self._transaction_request:
+            return  # Kết quả của bộ lọc cũ
+        silent = self._transaction_request_silent
+        self.transaction_page = result["page_index"]
+        self.transaction_total = result["total"]
         
-        # Hiển thị dữ liệu cho trang hiện tại
-        for row, trans in enumerate(filtered_transactions[start_idx:end_idx]):
-            # Loại giao dịch
-            trans_type = trans.get('type', '').lower()
-            display_type = "Mua" if trans_type == 'buy' else "Bán"
-            self.trade_table.setItem(row, 0, QTableWidgetItem(display_type))
-            
-            # Số order
-            self.trade_table.setItem(row, 1, QTableWidgetItem(
-                str(trans['order_number'])
-            ))
-            
-            # Số tiền
-            amount = f"{int(trans['amount']):,} VND"
-            self.trade_table.setItem(row, 2, QTableWidgetItem(amount))
-            
-            # Ngân hàng
-            self.trade_table.setItem(row, 3, QTableWidgetItem(
-                trans.get('bank_name', '')
-            ))
-            
-            # Số tài khoản
-            self.trade_table.setItem(row, 4, QTableWidgetItem(
-                trans.get('account_number', '')
-            ))
-            
-            # Tên tài khoản
-            self.trade_table.setItem(row, 5, QTableWidgetItem(
-                trans.get('account_name', '')
-            ))
-            
-            # Thông tin thêm
-            self.trade_table.setItem(row, 6, QTableWidgetItem(
-                trans.get('message', '')
-            ))
-            
-            # Thời gian
-            timestamp = trans.get('timestamp', 0)
-            time_str = datetime.fromtimestamp(timestamp).strftime('%H:%M:%S')
-            item_time = QTableWidgetItem(time_str)
-            item_time.setData(Qt.UserRole, timestamp)
-            self.trade_table.setItem(row, 7, item_time)
-            
-            # Trạng thái
-            order_status = trans.get('order_status', 'TRADING')
-            self.trade_table.setItem(row, 8, QTableWidgetItem(order_status))
-            
-            # Lưu đường dẫn QR vào item nếu có
-            if 'qr_path' in trans:
-                self.trade_table.item(row, 1).setData(Qt.UserRole, trans['qr_path'])
-            
-            # Căn giữa các cột
-            for col in range(9):
-                item = self.trade_table.item(row, col)
-                if item:
-                    item.setTextAlignment(Qt.AlignCenter)
-            # Thêm nút Action cho BUY
-            # if trans.get('type', '').lower() == 'buy':
-            #     action_btn = QPushButton("Tạo QR")
-            #     action_btn.setStyleSheet("background-color: #27ae60; color: white; font-weight: bold;")
-            #     def make_action_func(tr=trans):
-            #         return lambda: self.handle_action_create_qr(tr)
-            #     action_btn.clicked.connect(make_action_func())
-            #     self.trade_table.setCellWidget(row, 9, action_btn)
-            # else:
-            #     self.trade_table.setCellWidget(row, 9, None)
-        
-        # Bật lại sorting sau khi cập nhật dữ liệu
-        self.trade_table.setSortingEnabled(True)
+        # Chỉ các dòng thêm/đổi/xóa (theo order_number) mới được cập nhật trên bảng
+        self.trade_model.set_transactions(result["page"])
+        # Giải mã trước QR của các dòng trên trang để bấm xem là hiện ngay
+        self.qr_previews.prefetch(self.transaction_storage.qr_path_for(t) for t in result["page"])
         
         # Cập nhật thông tin phân trang
-        total_pages = (len(filtered_transactions) + self.transaction_rows_per_page - 1) // self.transaction_rows_per_page
+        total_pages = (self.transaction_total + self.transaction_rows_per_page - 1) // self.transaction_rows_per_page
         self.trade_page_label.setText(f"Trang {self.transaction_page + 1}/{total_pages}")
         self.trade_prev_page_btn.setEnabled(self.transaction_page > 0)
         self.trade_next_page_btn.setEnabled(self.transaction_page < total_pages - 1)
-
-    def get_filtered_transactions(self):
-        """Lấy danh sách giao dịch đã được lọc theo điều kiện tìm kiếm"""
-        self.log(f"Gọi get_filtered_transactions. Transaction cache: {len(self.transaction_cache) if self.transaction_cache is not None else 'None'}")
-        if not self.transaction_cache: # Kiểm tra None thay vì chỉ if not
-            self.log("Cache giao dịch rỗng, trả về []")
-            return []
-        
-        filtered = self.transaction_cache
-        self.log(f"Cache ban đầu: {len(filtered)} giao dịch")
-        
-        # Lọc theo số order (tìm kiếm theo số cuối)
-        order_number = self.order_number_input.text().strip()
-        if order_number:
-            filtered = [t for t in filtered if str(t.get('order_number', '')).endswith(order_number)]
-        
-        # Lọc theo loại giao dịch
-        trade_type = self.transaction_type_combo.currentText()
-        if trade_type != "Tất cả":
-            type_map = {
-                "Mua": "buy",
-                "Bán": "sell"
-            }
-            target_type = type_map.get(trade_type)
-            if target_type:
-                filtered = [t for t in filtered if t.get('type', '').lower() == target_type.lower()]
+        self.trade_summary_label.setText(f"Tổng kết ngày: {format_day_summary(result['summary'])}")
         
-        # Lọc theo trạng thái order
-        order_status = self.order_status_combo.currentText()
-        if order_status != "Tất cả":
-            filtered = [t for t in filtered if t.get('order_status', '') == order_status]
-        
-        # Sắp xếp theo thời gian giảm dần (mới nhất lên đầu)
-        filtered.sort(key=lambda x: x.get('timestamp', 0), reverse=True)
-        self.log(f"Sau khi sắp xếp: {len(filtered)} giao dịch")
-        
-        return filtered
+        if not result["reloaded"]:
+            return
+        new_count = result["loaded"]
+        old_count = result["previous_loaded"]
+        if not silent:
+            self.log(f"Đã tải {new_count} giao dịch từ storage.")
+        if not new_count:
+            if not silent:
+                date = self.date_edit.date().toPyDate()
+                self.log(f"ℹ️ Không tìm thấy giao dịch nào cho ngày {date.strftime('%d/%m/%Y')}")
+        elif silent and new_count > old_count:
+            # Chỉ log khi có giao dịch mới trong realtime
+            self.log(f"🆕 Phát hiện {new_count - old_count} giao dịch mới! (Tổng: {new_count})")
+        elif not silent:
+            self.log(f"🔄 Đã cập nhật danh sách giao dịch ({new_count} giao dịch)")
+
+    def on_transaction_load_failed(self, request_id, err):
+        if request_id != self._transaction_request:
+            return
+        self.log(f"❌ Lỗi khi cập nhật danh sách giao dịch: {err}")
+        if not self._transaction_request_silent:
+            QMessageBox.critical(
+                self,
+                "Lỗi",
+                f"Không thể cập nhật danh sách giao dịch: {err}"
+            )
+
+    def display_transaction_page(self):
+        """Hiển thị trang hiện tại của danh sách giao dịch"""
+        self.debug("Gọi display_transaction_page. Trang hiện tại: %s", self.transaction_page)
+        self.request_transaction_page()
 
     def filter_transactions(self):
         """Lọc danh sách giao dịch theo điều kiện tìm kiếm"""
@@ -1807,8 +1676,7 @@ class MainWindow(QMainWindow):
 
     def next_transaction_page(self):
         """Chuyển đến trang sau của danh sách giao dịch"""
-        filtered_transactions = self.get_filtered_transactions()
-        total_pages = (len(filtered_transactions) + self.transaction_rows_per_page - 1) // self.transaction_rows_per_page
+        total_pages = (self.transaction_total + self.transaction_rows_per_page - 1) // self.transaction_rows_per_page
         if self.transaction_page < total_pages - 1:
             self.transaction_page += 1
             self.display_transaction_page()
@@ -1828,13 +1696,19 @@ class MainWindow(QMainWindow):
         except Exception as e:
             self.log(f"❌ Lỗi khi chuyển tab: {str(e)}")
 
+    def selected_trade_qr_path(self):
+        """Đường dẫn QR của dòng đang chọn trong bảng giao dịch (None nếu chưa chọn)"""
+        selected = self.trade_table.selectionModel().selectedIndexes()
+        if not selected:
+            return None
+        return self.transaction_storage.qr_path_for(self.trade_model.transaction_at(selected[0].row()))
+
     def on_trade_selection_change(self):
         """Xử lý khi chọn một dòng trong bảng giao dịch"""
-        selected = self.trade_table.selectedItems()
+        selected = self.trade_table.selectionModel().selectedIndexes()
         if selected:
             # Lấy đường dẫn QR từ dòng được chọn
-            row = selected[0].row()
-            qr_path = self.trade_table.item(row, 1).data(Qt.UserRole)
+            qr_path = self.selected_trade_qr_path()
             self.view_qr_btn.setEnabled(bool(qr_path))
             # Tự động hiển thị QR khi chọn dòng
             self.show_trade_qr()
@@ -1845,13 +1719,11 @@ class MainWindow(QMainWindow):
     def show_trade_qr(self):
         """Hiển thị mã QR của giao dịch được chọn"""
         try:
-            selected = self.trade_table.selectedItems()
-            if not selected:
+            if not self.trade_table.selectionModel().selectedIndexes():
                 return
             
             # Lấy đường dẫn QR
-            row = selected[0].row()
-            qr_path = self.trade_table.item(row, 1).data(Qt.UserRole)
+            qr_path = self.selected_trade_qr_path()
             
             if not qr_path or not os.path.exists(qr_path):
                 QMessageBox.warning(
@@ -1861,13 +1733,10 @@ class MainWindow(QMainWindow):
                 )
                 return
             
-            # Hiển thị QR
-            pixmap = QPixmap(qr_path)
-            scaled_pixmap = pixmap.scaled(
-                300, 300,
-                Qt.KeepAspectRatio,
-                Qt.SmoothTransformation
-            )
+            # Hiển thị QR (ảnh đã thu nhỏ sẵn từ cache)
+            scaled_pixmap = self.qr_previews.get(qr_path)
+            if scaled_pixmap is None:
+                raise ValueError(f"File QR không hợp lệ: {qr_path}")
             self.trade_qr_label.setPixmap(scaled_pixmap)
             self.trade_qr_label.show()
             
@@ -1883,12 +1752,14 @@ class MainWindow(QMainWindow):
         """Bật/tắt cập nhật realtime"""
         if state == Qt.Checked:
             self.realtime_enabled = True
+            self.transaction_watcher.start(self.date_edit.date().toPyDate())
             self.realtime_timer.start(self.realtime_interval)
             self.realtime_status_label.setText("Đang cập nhật...")
             self.realtime_status_label.setStyleSheet("color: green; font-weight: bold;")
             self.log("🔄 Đã bật cập nhật realtime")
         else:
             self.realtime_enabled = False
+            self.transaction_watcher.stop()
             self.realtime_timer.stop()
             self.realtime_status_label.setText("Đã tắt")
             self.realtime_status_label.setStyleSheet("color: red; font-weight: bold;")
@@ -1913,8 +1784,8 @@ class MainWindow(QMainWindow):
             self.realtime_timer.start(new_interval)
             self.log(f"🔄 Đã thay đổi tần suất cập nhật: {text}")
 
-    def realtime_refresh(self):
-        """Hàm thực hiện refresh danh sách giao dịch trong realtime"""
+    def realtime_refresh(self, path=None):
+        """Refresh danh sách giao dịch khi file ngày đang xem thay đổi (realtime)"""
         self.refresh_transaction_list(silent=True)
         self.last_update_time = datetime.now()
         # Cập nhật status label với thời gian
@@ -8,10 +8,15 @@ from module.generate_qrcode import generate_vietqr, get_nganhang_id
 import re
 from unidecode import unidecode
 # from module.telegram_send_message import TelegramBot
-from module.discord_send_message import DiscordBot
-from module.selenium_get_info import extract_order_info, extract_info_by_key
+from module.selenium_get_info import extract_info_by_key
+from module.field_mapping import default_mapper as field_mapper
+from module.browser_pool import get_browser_pool
+from module.order_prefetch import OrderPrefetcher, PRE_PAYMENT_STATUSES
+from module.scrape_cache import REQUIRED_FIELDS, ScrapeCache
+from module.notifier_registry import NotifierRegistry
 import pandas as pd
 from module.transaction_storage import TransactionStorage
+from module.models import Order, OrderSide, OrderStatus, Transaction, parse_fiat
 from dotenv import load_dotenv
 import os
 
@@ -27,19 +32,26 @@ logger = logging.getLogger(__name__)
 
 
 class P2PBinance:
-    def __init__(self, storage_dir: str = "transactions", api_key: str = None, api_secret: str = None):
+    def __init__(self, storage_dir: str = "transactions", api_key: str = None, api_secret: str = None,
+                 account: str = None):
         """
         Khởi tạo P2PBinance
         Args:
             storage_dir: Thư mục lưu trữ dữ liệu giao dịch
             api_key: Binance API key (nếu không truyền sẽ sử dụng từ biến môi trường)
             api_secret: Binance API secret (nếu không truyền sẽ sử dụng từ biến môi trường)
+            account: Tên tài khoản, dùng để chọn Chrome trong browser pool
         """
         self._stop_flag = False
         self._running = False
         self.current_transaction = None
         self.logger = logging.getLogger("P2P")
         self.storage = TransactionStorage(storage_dir)
+        self.account = account
+        self.browser_pool = get_browser_pool()
+        self.scrape_cache = ScrapeCache(os.path.join(storage_dir, "scrape_cache"))
+        self.prefetcher = OrderPrefetcher(self.scrape_order)
+        self.notifier = NotifierRegistry.from_config()
 
         # Sử dụng API keys được truyền vào hoặc từ biến môi trường
         self.api_key = api_key or BINANCE_KEY
@@ -70,6 +82,24 @@ class P2PBinance:
         except Exception as e:
             self.logger.error(f"Lỗi khi đồng bộ thời gian với Binance: {e}")
 
+    def scrape_order(self, order_number):
+        """
+        Scrape thông tin order qua browser pool, dùng scrape cache bền vững:
+        order đã đủ trường thì không scrape lại, còn thiếu thì scrape và gộp phần mới.
+        """
+        cached = self.scrape_cache.get(order_number)
+        if cached and cached.get("complete"):
+            self.logger.info(f"💾 Dùng scrape cache cho order {order_number}")
+            return cached["raw"]
+        if cached:
+            self.logger.info(f"🔁 Scrape lại order {order_number}, còn thiếu: {cached.get('missing_fields')}")
+        pages = []
+        raw = self.browser_pool.extract(order_number, account=self.account, on_html=pages.append)
+        if not raw:
+            return cached["raw"] if cached else raw
+        entry = self.scrape_cache.put(order_number, raw, pages[-1] if pages else None)
+        return entry["raw"]
+
     def handle_buy_order(self, order_number, message):
         """Xử lý đơn hàng mua"""
         self.logger.info(f"🔍 Bắt đầu xử lý BUY order: {order_number}")
@@ -80,11 +110,25 @@ class P2PBinance:
             self.logger.info(f"[handle_buy_order] get_transaction_by_order: {(t1-t0)*1000:.2f} ms")
             if existing_tx:
                 self.logger.info(f"✅ Order {order_number} đã tồn tại trong database, bỏ qua xử lý.")
-                self.current_transaction = existing_tx
+                self.current_transaction = Transaction.from_dict(existing_tx)
                 return
-            # Trích xuất thông tin từ order
-            self.logger.info(f"📋 Đang trích xuất thông tin cho order: {order_number}")
-            infor_seller = extract_order_info(order_number)
+            # Ưu tiên kết quả đã prefetch khi order vừa xuất hiện
+            prefetched = self.prefetcher.get(order_number)
+            if prefetched:
+                # Prefetch lúc PENDING có thể chưa đủ trường (trang chưa hiện thông tin thanh toán):
+                # khi đó scrape lại, scrape_order gộp phần mới vào ScrapeCache
+                missing = [field for field in REQUIRED_FIELDS if not prefetched["info"].get(field)]
+                if missing:
+                    self.logger.info(f"🔁 Prefetch order {order_number} còn thiếu {missing}, scrape lại")
+                    self.prefetcher.invalidate(order_number)
+                    prefetched = None
+            if prefetched:
+                self.logger.info(f"⚡ Dùng thông tin prefetch cho order: {order_number}")
+                infor_seller = prefetched["raw"]
+            else:
+                # Trích xuất thông tin từ order
+                self.logger.info(f"📋 Đang trích xuất thông tin cho order: {order_number}")
+                infor_seller = self.scrape_order(order_number)
             t2 = time.time()
             self.logger.info(f"[handle_buy_order] extract_order_info: {(t2-t1)*1000:.2f} ms")
             self.logger.info(f"📊 Thông tin trích xuất ban đầu: {infor_seller}")
@@ -108,16 +152,16 @@ class P2PBinance:
             self.logger.info(f"🏦 Bank Name: {bank_name}")
             self.logger.info(f"📝 Reference Message: {reference_message}")
             # Tạo thông tin giao dịch
-            transaction_info = {
-                "type": "buy",
-                "order_number": order_number,
-                "amount": fiat_amount,
-                "bank_name": bank_name,
-                "account_number": bank_card,
-                "account_name": full_name,
-                "reference": reference_message,
-                "message": message,
-            }
+            transaction = Transaction(
+                order_number=order_number,
+                side=OrderSide.BUY,
+                amount=parse_fiat(fiat_amount),
+                bank_name=bank_name,
+                account_number=bank_card,
+                account_name=full_name,
+                reference=reference_message,
+                message=message,
+            )
             # Kiểm tra điều kiện đầy đủ thông tin
             required_fields = [fiat_amount, bank_card, bank_name, reference_message, full_name]
             missing_fields = []
@@ -133,23 +177,25 @@ class P2PBinance:
                 missing_fields.append("Full Name")
             if missing_fields:
                 self.logger.warning(f"⚠️ Thiếu thông tin cho order {order_number}: {missing_fields}")
-                self.logger.info(f"📋 Thông tin hiện có: {transaction_info}")
+                self.logger.info(f"📋 Thông tin hiện có: {transaction}")
                 return
             self.logger.info(f"✅ Đủ thông tin, bắt đầu tạo QR code cho order: {order_number}")
             # Đảm bảo chỉ xử lý tiếp khi đủ thông tin
             if all([fiat_amount, bank_card, bank_name, reference_message, full_name]):
-                acqid_bank = get_nganhang_id(bank_name)
+                if prefetched and prefetched.get("bank_name") == bank_name and prefetched.get("acqid"):
+                    acqid_bank = prefetched["acqid"]
+                else:
+                    acqid_bank = get_nganhang_id(bank_name)
                 if not acqid_bank:
                     self.logger.error(f"❌ Không tìm được mã ngân hàng cho: {bank_name}. Vẫn lưu transaction với trạng thái lỗi.")
-                    transaction_info['qr_error'] = "Không tìm được mã ngân hàng"
+                    transaction.qr_error = "Không tìm được mã ngân hàng"
                     qr_image = generate_vietqr()
                     qr_bytes = qr_image.getvalue()
                     t3 = time.time()
-                    qr_path = self.storage.save_transaction(transaction_info, None, "ERROR_BANK_NAME")
+                    saved = self.storage.save_transaction(transaction, None, OrderStatus.ERROR_BANK_NAME.value)
                     t4 = time.time()
                     self.logger.info(f"[handle_buy_order] save_transaction (ERROR_BANK_NAME): {(t4-t3)*1000:.2f} ms")
-                    self.current_transaction = transaction_info
-                    self.current_transaction["qr_path"] = qr_path
+                    self.current_transaction = Transaction.from_dict(saved) if saved else transaction
                     self.logger.info(f"🎉 Hoàn thành xử lý BUY order: {order_number}")
                     self.logger.info(f"[handle_buy_order] Tổng thời gian xử lý: {(t4-t0)*1000:.2f} ms")
                     return
@@ -171,11 +217,11 @@ class P2PBinance:
                 self.logger.info(f"📸 Đã tạo QR code, kích thước: {len(qr_bytes)} bytes")
                 t4 = time.time()
                 self.logger.info(f"[handle_buy_order] generate_vietqr: {(t4-t3)*1000:.2f} ms")
-                qr_path = self.storage.save_transaction(transaction_info, qr_bytes, "TRADING")
+                saved = self.storage.save_transaction(transaction, qr_bytes, OrderStatus.TRADING.value)
                 t5 = time.time()
                 self.logger.info(f"[handle_buy_order] save_transaction: {(t5-t4)*1000:.2f} ms")
-                self.current_transaction = transaction_info
-                self.current_transaction["qr_path"] = qr_path
+                self._send_qr_photo(qr_bytes, f"BUY #{order_number}\n{message}", "BUY", fiat_amount)
+                self.current_transaction = Transaction.from_dict(saved) if saved else transaction
                 self.logger.info(f"🎉 Hoàn thành xử lý BUY order: {order_number}")
                 self.logger.info(f"[handle_buy_order] Tổng thời gian xử lý: {(t5-t0)*1000:.2f} ms")
             else:
@@ -192,7 +238,7 @@ class P2PBinance:
             if existing_tx:
                 # Nếu transaction đã tồn tại, dù có QR hay không cũng bỏ qua để tránh tracking liên tục
                 self.logger.info(f"✅ Order {order_number} đã tồn tại trong database, bỏ qua xử lý.")
-                self.current_transaction = existing_tx
+                self.current_transaction = Transaction.from_dict(existing_tx)
                 return
             
             qr_image = generate_vietqr(
@@ -204,20 +250,20 @@ class P2PBinance:
             self.logger.info(f"📸 Đã tạo QR code cho SELL order, kích thước: {len(qr_bytes)} bytes")
 
             # Tạo thông tin giao dịch
-            transaction_info = {
-                "type": "sell",
-                "order_number": order_number,
-                "amount": fiat_amount,
-                "message": message,
-            }
+            transaction = Transaction(
+                order_number=order_number,
+                side=OrderSide.SELL,
+                amount=parse_fiat(fiat_amount),
+                message=message,
+            )
 
             # Lưu thông tin giao dịch và mã QR
-            qr_path = self.storage.save_transaction(transaction_info, qr_bytes, "TRADING")
-            self.logger.info(f"💾 Đã lưu QR code tại: {qr_path}")
+            saved = self.storage.save_transaction(transaction, qr_bytes, OrderStatus.TRADING.value)
+            self.logger.info(f"💾 Đã lưu QR code tại: {saved.get('qr_path')}")
+            self._send_qr_photo(qr_bytes, f"SELL #{order_number}\n{message}", "SELL", fiat_amount)
 
             # Cập nhật thông tin giao dịch hiện tại
-            self.current_transaction = transaction_info
-            self.current_transaction["qr_path"] = qr_path
+            self.current_transaction = Transaction.from_dict(saved) if saved else transaction
             
             self.logger.info(f"🎉 Hoàn thành xử lý SELL order: {order_number}")
         except Exception as e:
@@ -237,19 +283,17 @@ class P2PBinance:
 
     def transactions_trading(self):
         self._stop_flag = False  # Reset cờ dừng khi bắt đầu RUN mới
+        # Giữ driver Selenium của Chrome thuộc tài khoản này luôn sống ở nền trong lúc chạy
+        browser = self.browser_pool.instance_for(self.account)
+        browser.start()
+        try:
+            self._trading_loop()
+        finally:
+            # Dừng supervisor khi thoát vòng lặp (DỪNG, lỗi, hoặc P2PBinance được tạo lại với API key mới)
+            browser.stop()
 
+    def _trading_loop(self):
         time.sleep(2)  # Test: giữ worker chạy 3 giây để kiểm tra nút DỪNG
-        status = {
-            "COMPLETED": "COMPLETED",
-            "PENDING": "PENDING",
-            "TRADING": "TRADING",
-            "BUYER_PAYED": "BUYER PAYED",
-            "DISTRIBUTING": "DISTRIBUTING",
-            "IN_APPEAL": "IN APPEAL",
-            "CANCELLED": "CANCELLED",
-            "CANCELLED_BY_SYSTEM": "CANCELLED BY SYSTEM",
-        }
-        side = {"BUY": "BUY", "SELL": "SELL"}
         
         # Load used_orders từ JSON thay vì khởi tạo rỗng
         end = int(datetime.utcnow().timestamp() * 1000)
@@ -276,11 +320,12 @@ class P2PBinance:
                         tradeType=trade_type, startDate=start, endDate=end
                     )
 
-                    for order in result["data"]:
+                    for row in result["data"]:
                         if self._stop_flag:
                             break
-                        order_status = order["orderStatus"]
-                        order_number = order["orderNumber"]
+                        order = Order.from_api(row)
+                        order_status = order.status.value
+                        order_number = order.order_number
                         previous_status = used_orders.get(order_number)
                         # self.logger.info(
                         #     f"[Order] #{order_number} | Status: {order_status} | Type: {order['tradeType']} | "
@@ -314,32 +359,31 @@ class P2PBinance:
                             # for key, value in order.items():
                             #     self.logger.info(f"   {key}: {value}")
                             
-                            message = (
-                                f"Status: {status.get(order_status)}\n"
-                                f"Type: {side.get(order['tradeType'])}\n"
-                                f"Price: {order['fiatSymbol']}{order['unitPrice']}\n"
-                                f"Fiat Amount: {float(order['totalPrice'])} {order['fiat']}\n"
-                                f"Crypto Amount: {float(order['amount'])} {order['asset']}\n"
-                                f"Order No.: {order_number}"
-                            )
+                            message = order.message()
+
+                            # Prefetch thông tin người bán khi order BUY còn PENDING (trước TRADING)
+                            if trade_type == "BUY" and order_status in PRE_PAYMENT_STATUSES:
+                                self.prefetcher.prefetch(order_number)
 
                             used_orders[order_number] = order_status
                             # Cập nhật vào JSON
                             self.storage.update_used_orders(order_number, order_status)
-                            self._send_notification(message)
+                            self._send_notification(
+                                message,
+                                key=order_number,
+                                trade_type=trade_type,
+                                status=order_status,
+                                amount=order.total_price,
+                            )
 
-                            if order_status == 'TRADING':
+                            if order.status is OrderStatus.TRADING:
                                 self.logger.info(f"🎯 Bắt đầu xử lý order TRADING: {order_number} (Type: {trade_type})")
                                 if trade_type == "BUY":
                                     self.logger.info(f"🛒 Gọi handle_buy_order cho order: {order_number}")
                                     self.handle_buy_order(order_number, message)
                                 elif trade_type == "SELL":
                                     self.logger.info(f"🛍️ Gọi handle_sell_order cho order: {order_number}")
-                                    self.handle_sell_order(
-                                        order_number,
-                                        float(order["totalPrice"]),
-                                        message,
-                                    )
+                                    self.handle_sell_order(order_number, order.fiat_amount, message)
                                 else:
                                     self.logger.warning(f"⚠️ Trade type không xác định: {trade_type}")
                             # else:
@@ -357,6 +401,9 @@ class P2PBinance:
                     self._send_notification(f"Error Count is {err_count}. Bot Stopped.")
                 if self._stop_flag:
                     break
+        self.logger.info(f"🩺 Browser pool metrics: {self.browser_pool.metrics()}")
+        self.logger.info(f"🏷️ Field mapping metrics: {field_mapper.metrics()}")
+        self.logger.info(f"📨 Notification metrics: {self.notifier.metrics()}")
         self.logger.info("🛑 Đã thoát vòng lặp transactions_trading.")
 
     def stop(self):
@@ -373,16 +420,28 @@ class P2PBinance:
         except Exception as e:
             raise
 
-    def _send_notification(self, message):
-        """Gửi thông báo qua các kênh đã cấu hình"""
+    def _send_notification(self, message, key=None, trade_type=None, status=None, amount=None):
+        """
+        Đưa thông báo vào hàng đợi của các kênh có luật khớp (không chờ gửi xong)
+        Args:
+            message: Nội dung
+            key: Số order, các thay đổi trạng thái liên tiếp của cùng order được gộp lại
+            trade_type, status, amount: Thông tin order dùng để định tuyến kênh
+        """
         try:
-            if hasattr(self, "telegram_bot"):
-                self.telegram_bot.send_message(message)
-            if hasattr(self, "discord_bot"):
-                self.discord_bot.send_message(message)
+            self.notifier.send_message(message, key=key, trade_type=trade_type,
+                                       status=status, amount=amount)
         except Exception as e:
             pass  # Bỏ qua lỗi khi gửi thông báo
 
+    def _send_qr_photo(self, qr_bytes, caption, trade_type=None, amount=None):
+        """Gửi ảnh QR tới các kênh nhận ảnh (caption Telegram tối đa 1024 ký tự)"""
+        try:
+            self.notifier.send_photo(qr_bytes, caption[:900], trade_type=trade_type,
+                                     status="TRADING", amount=amount)
+        except Exception as e:
+            self.logger.warning(f"⚠️ Không gửi được ảnh QR: {e}")
+
     def get_all_c2c_trades(self, start_timestamp=None, end_timestamp=None):
         """Lấy tất cả giao dịch C2C trong khoảng thời gian và trả về DataFrame đã xử lý"""
         rows = 100
@@ -515,13 +574,12 @@ class P2PBinance:
                 self.logger.debug(f"Startup Trade History Result for {trd}: {res}")
                 
                 if res.get("data"):
-                    for k in res["data"]:
-                        order_number = k["orderNumber"]
-                        order_status = k["orderStatus"]
-                        database[order_number] = order_status
+                    for row in res["data"]:
+                        order = Order.from_api(row)
+                        database[order.order_number] = order.status.value
                         
                         # Cập nhật vào JSON
-                        self.storage.update_used_orders(order_number, order_status)
+                        self.storage.update_used_orders(order.order_number, order.status.value)
             
             self.logger.info(f"✅ Startup_update hoàn thành, đã cập nhật {len(database)} orders")
             
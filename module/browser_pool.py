@@ -0,0 +1,202 @@
+"""
+Module quản lý pool nhiều Chrome (mỗi Chrome một profile, một cổng remote debugging).
+Mục đích: Scrape order của nhiều tài khoản Binance song song, mỗi order được
+chuyển tới Chrome của tài khoản sở hữu order đó.
+"""
+
+import logging
+import os
+import queue
+import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from config_env import CHROME_INSTANCES
+from module.driver_supervisor import DriverSupervisor
+from module.selenium_get_info import (
+    BASE_DIR,
+    PROFILE_PATH,
+    create_driver,
+    extract_order_info,
+    get_driver_supervisor,
+    launch_chrome_remote_debugging,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ACCOUNT = "default"
+DEFAULT_PORT = 9222
+
+
+class BrowserInstance:
+    def __init__(self, account: str, port: int, profile_path: Path, max_concurrency: int = 1):
+        """
+        Một Chrome gắn với một tài khoản Binance
+        Args:
+            account: Tên tài khoản sở hữu Chrome này
+            port: Cổng remote debugging
+            profile_path: Thư mục profile Chrome (đã đăng nhập tài khoản)
+            max_concurrency: Số order scrape song song tối đa trên Chrome này
+        """
+        self.account = account
+        self.port = port
+        self.profile_path = Path(profile_path)
+        self.max_concurrency = max(1, int(max_concurrency))
+
+        # Mỗi slot là một session WebDriver riêng gắn vào cùng Chrome,
+        # vì một session không thể điều khiển hai tab cùng lúc
+        self.sessions: List[DriverSupervisor] = []
+        for slot in range(self.max_concurrency):
+            if slot == 0 and port == DEFAULT_PORT and self.profile_path == PROFILE_PATH:
+                # Dùng chung supervisor mặc định với extract_order_info
+                supervisor = get_driver_supervisor(port)
+            else:
+                supervisor = DriverSupervisor(
+                    self._driver_factory, port=port, name=f"{account}#{slot}"
+                )
+            self.sessions.append(supervisor)
+        self._free_sessions = queue.Queue()
+        for supervisor in self.sessions:
+            self._free_sessions.put(supervisor)
+
+        # Hàng đợi FIFO riêng cho tài khoản, số worker = số slot
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency, thread_name_prefix=f"Scrape-{account}"
+        )
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def _driver_factory(self):
+        return create_driver(False, use_existing_chrome=True, port=self.port,
+                             profile_path=self.profile_path)
+
+    def start(self):
+        for supervisor in self.sessions:
+            supervisor.start()
+
+    def stop(self):
+        for supervisor in self.sessions:
+            supervisor.stop()
+
+    def shutdown(self):
+        """Dừng giám sát và hủy các order còn chờ trong hàng đợi (khi đóng ứng dụng)"""
+        self.stop()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def launch(self):
+        """Mở Chrome remote debugging cho tài khoản này"""
+        launch_chrome_remote_debugging(port=self.port, profile_path=self.profile_path)
+
+    def submit(self, order_no: str, on_html=None) -> Future:
+        """Đưa order vào hàng đợi của tài khoản, trả về Future chứa kết quả scrape"""
+        with self._lock:
+            self._pending += 1
+        return self._executor.submit(self._scrape, order_no, on_html)
+
+    def _scrape(self, order_no: str, on_html=None) -> dict:
+        supervisor = self._free_sessions.get()
+        try:
+            return extract_order_info(order_no, supervisor=supervisor, on_html=on_html)
+        finally:
+            self._free_sessions.put(supervisor)
+            with self._lock:
+                self._pending -= 1
+
+    def metrics(self) -> dict:
+        return {
+            "account": self.account,
+            "port": self.port,
+            "profile": str(self.profile_path),
+            "max_concurrency": self.max_concurrency,
+            "pending": self._pending,
+            "sessions": [s.metrics() for s in self.sessions],
+        }
+
+
+class BrowserPool:
+    def __init__(self, instances: List[BrowserInstance]):
+        """Pool các Chrome, định tuyến order theo tài khoản"""
+        if not instances:
+            raise ValueError("BrowserPool cần ít nhất một BrowserInstance")
+        self.instances: Dict[str, BrowserInstance] = {}
+        for instance in instances:
+            if instance.account in self.instances:
+                raise ValueError(f"Tài khoản bị trùng trong pool: {instance.account}")
+            self.instances[instance.account] = instance
+        self.default_account = instances[0].account
+
+    @classmethod
+    def from_config(cls, spec: str = None) -> "BrowserPool":
+        """
+        Tạo pool từ cấu hình CHROME_INSTANCES
+        Định dạng: "account:port:profile[:concurrency],..."; profile tương đối theo BASE_DIR
+        """
+        spec = CHROME_INSTANCES if spec is None else spec
+        instances = []
+        for entry in filter(None, (part.strip() for part in (spec or "").split(","))):
+            parts = entry.split(":")
+            if len(parts) < 3:
+                raise ValueError(f"Cấu hình Chrome không hợp lệ: '{entry}'")
+            account, port, profile = parts[0], int(parts[1]), parts[2]
+            concurrency = int(parts[3]) if len(parts) > 3 else 1
+            profile_path = Path(profile)
+            if not profile_path.is_absolute():
+                profile_path = BASE_DIR / profile_path
+            instances.append(BrowserInstance(account, port, profile_path, concurrency))
+        if not instances:
+            instances.append(BrowserInstance(DEFAULT_ACCOUNT, DEFAULT_PORT, PROFILE_PATH))
+        return cls(instances)
+
+    def instance_for(self, account: Optional[str] = None) -> BrowserInstance:
+        """Chọn Chrome của tài khoản sở hữu order (mặc định: instance đầu tiên)"""
+        if account and account in self.instances:
+            return self.instances[account]
+        if account and account != DEFAULT_ACCOUNT:
+            logger.warning(f"⚠️ Không có Chrome cho tài khoản '{account}', dùng '{self.default_account}'")
+        return self.instances[self.default_account]
+
+    def submit(self, order_no: str, account: Optional[str] = None, on_html=None) -> Future:
+        """Scrape order bất đồng bộ trên Chrome của tài khoản"""
+        return self.instance_for(account).submit(order_no, on_html)
+
+    def extract(self, order_no: str, account: Optional[str] = None, timeout: float = None,
+                on_html=None) -> dict:
+        """Scrape order và chờ kết quả"""
+        return self.submit(order_no, account, on_html).result(timeout)
+
+    def start(self):
+        for instance in self.instances.values():
+            instance.start()
+
+    def stop(self):
+        for instance in self.instances.values():
+            instance.stop()
+
+    def stop_all(self):
+        """Tắt toàn bộ pool khi thoát ứng dụng: dừng supervisor và hàng đợi scrape của mọi tài khoản"""
+        for instance in self.instances.values():
+            instance.shutdown()
+
+    def launch_all(self):
+        """Mở tất cả Chrome trong pool"""
+        for instance in self.instances.values():
+            instance.launch()
+
+    def metrics(self) -> dict:
+        return {account: instance.metrics() for account, instance in self.instances.items()}
+
+
+_browser_pool = None
+_browser_pool_lock = threading.Lock()
+
+
+def get_browser_pool() -> BrowserPool:
+    """Lấy pool Chrome dùng chung (khởi tạo từ config_env lần đầu)"""
+    global _browser_pool
+    with _browser_pool_lock:
+        if _browser_pool is None:
+            _browser_pool = BrowserPool.from_config()
+        return _browser_pool
@@ -4,28 +4,59 @@ import sys
 import requests
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from config_env import DISCORD_WEBHOOK
+from module import json_codec
 from module.generate_qrcode import generate_vietqr
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+# (connect timeout, read timeout) cho mọi request tới webhook
+DEFAULT_TIMEOUT = (5, 15)
+
+
+def rate_limit_info(response) -> dict:
+    """Đọc Retry-After / X-RateLimit-* từ response của Discord"""
+    headers = response.headers
+    info = {}
+    retry_after = headers.get("Retry-After")
+    if response.status_code == 429:
+        try:
+            retry_after = json_codec.decode_response(response, schema=dict).get("retry_after", retry_after)
+        except ValueError:
+            pass
+    if retry_after is not None:
+        info["retry_after"] = float(retry_after)
+    remaining = headers.get("X-RateLimit-Remaining")
+    reset_after = headers.get("X-RateLimit-Reset-After")
+    if remaining is not None:
+        info["rate_limit"] = {
+            "remaining": int(remaining),
+            "reset_after": float(reset_after) if reset_after is not None else None,
+        }
+    return info
+
+
 class DiscordBot:
-    def __init__(self, webhook_url):
+    def __init__(self, webhook_url, timeout=DEFAULT_TIMEOUT):
         self.webhook_url = DISCORD_WEBHOOK if webhook_url is None else webhook_url
+        self.timeout = timeout
+        # Session giữ kết nối keep-alive tới Discord giữa các lần gửi
+        self.session = requests.Session()
 
     def send_message(self, content):
         data = {"content": content}
         try:
-            response = requests.post(self.webhook_url, json=data)
-            if response.status_code == 204:
+            response = self.session.post(self.webhook_url, json=data, timeout=self.timeout)
+            limits = rate_limit_info(response)
+            if response.status_code in (200, 204):
                 logger.info("📨 Gửi tin nhắn thành công")
-                return {"ok": True}
+                return {"ok": True, "status": response.status_code, **limits}
             else:
                 logger.error(f"❌ Gửi thất bại: {response.status_code}, {response.text}")
-                return {"ok": False, "error": response.text}
+                return {"ok": False, "status": response.status_code, "error": response.text, **limits}
         except Exception as e:
             logger.exception("❌ Lỗi gửi webhook")
-            return {"ok": False, "error": str(e)}
+            return {"ok": False, "status": None, "error": str(e)}
 
     def send_photo(self, image, caption=""):
         try:
@@ -33,16 +64,18 @@ class DiscordBot:
                     'file': ('image.png', image, 'image/png')
                 }
                 payload = {'content': caption}
-                response = requests.post(self.webhook_url, data=payload, files=files)
+                response = self.session.post(self.webhook_url, data=payload, files=files,
+                                             timeout=self.timeout)
+                limits = rate_limit_info(response)
                 if response.status_code in (200, 204):
                     logger.info("🖼 Ảnh gửi thành công")
-                    return {"ok": True}
+                    return {"ok": True, "status": response.status_code, **limits}
                 else:
                     logger.error(f"❌ Gửi ảnh thất bại: {response.status_code}, {response.text}")
-                    return {"ok": False, "error": response.text}
+                    return {"ok": False, "status": response.status_code, "error": response.text, **limits}
         except Exception as e:
             logger.exception("❌ Lỗi gửi ảnh")
-            return {"ok": False, "error": str(e)}
+            return {"ok": False, "status": None, "error": str(e)}
 
 if __name__ == "__main__":
     bot = DiscordBot(webhook_url='https://discord.com/api/webhooks/1381122297104175246/oyttLr1x76JL52K896ZiU8vbH87D82pD-CdMesReyVo749L9yyYayDWeM7oKlXiN79hh')
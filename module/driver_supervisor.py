@@ -0,0 +1,246 @@
+"""
+Module giám sát sức khỏe Selenium driver gắn vào Chrome remote debugging.
+Mục đích: Phát hiện session chết ở nền và kết nối lại trước khi có order mới,
+để extract_order_info không phải trả giá create_driver trên đường xử lý chính.
+"""
+
+import logging
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class DriverUnavailableError(Exception):
+    """Không có driver sẵn sàng trong thời gian chờ cho phép"""
+
+
+class DriverSupervisor:
+    def __init__(self, driver_factory: Callable, port: int = 9222, host: str = "127.0.0.1",
+                 interval: float = 5.0, name: str = "default"):
+        """
+        Khởi tạo DriverSupervisor
+        Args:
+            driver_factory: Hàm tạo driver mới (gắn vào Chrome đang mở ở `port`)
+            port: Cổng remote debugging của Chrome
+            host: Địa chỉ Chrome remote debugging
+            interval: Chu kỳ ping (giây)
+            name: Tên instance, dùng cho log và metrics
+        """
+        self.driver_factory = driver_factory
+        self.port = port
+        self.host = host
+        self.interval = interval
+        self.name = name
+
+        self._driver = None
+        self._lock = threading.RLock()
+        self._use_lock = threading.Lock()  # Chỉ một luồng điều khiển tab tại một thời điểm
+        self._ready = threading.Event()
+        self._wakeup = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        # Metrics
+        self.reconnect_count = 0
+        self.failed_reconnects = 0
+        self.dead_sessions = 0
+        self.last_reconnect_ms = None
+        self._reconnect_total_ms = 0.0
+        self.devtools_alive = False
+        self.last_check_time = None
+
+    # ------------------------------------------------------------------
+    # Vòng đời
+    # ------------------------------------------------------------------
+    def start(self):
+        """Khởi động luồng giám sát nền (idempotent)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name=f"DriverSupervisor-{self.name}", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"🩺 [{self.name}] Bắt đầu giám sát Chrome tại {self.host}:{self.port}")
+
+    def stop(self):
+        """Dừng luồng giám sát, không đóng Chrome của user"""
+        self._stop_event.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    # ------------------------------------------------------------------
+    # API cho nơi sử dụng driver
+    # ------------------------------------------------------------------
+    def is_ready(self) -> bool:
+        """True nếu đang có driver sống sẵn sàng dùng"""
+        return self._ready.is_set()
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Chờ tới khi có driver sẵn sàng"""
+        return self._ready.wait(timeout)
+
+    def get_driver(self, timeout: float = 15.0):
+        """
+        Lấy driver đang sống. Nếu supervisor đang chạy thì chờ luồng nền kết nối lại,
+        nếu không thì tạo driver đồng bộ như trước đây.
+        """
+        with self._lock:
+            if self._driver is not None:
+                return self._driver
+        if self.running:
+            self._wakeup.set()
+            if self.wait_ready(timeout):
+                with self._lock:
+                    if self._driver is not None:
+                        return self._driver
+            raise DriverUnavailableError(
+                f"[{self.name}] Không có driver sẵn sàng sau {timeout}s"
+            )
+        return self._reconnect()
+
+    @contextmanager
+    def lease(self, timeout: float = 15.0):
+        """
+        Mượn driver để thao tác. Trong lúc mượn (kể cả lúc đang chờ driver), luồng nền
+        không probe session để tránh chen lệnh vào giữa thao tác chuyển tab.
+        """
+        with self._use_lock:
+            yield self.get_driver(timeout)
+
+    def mark_dead(self, reason: str = ""):
+        """Đánh dấu driver hiện tại đã chết, luồng nền sẽ kết nối lại ngay"""
+        with self._lock:
+            driver = self._driver
+            if driver is None:
+                return
+            self._driver = None
+            self._ready.clear()
+            self.dead_sessions += 1
+        logger.warning(f"⚠️ [{self.name}] Driver bị đánh dấu chết: {reason}")
+        self._quit(driver)
+        self._wakeup.set()
+
+    def metrics(self) -> dict:
+        """Thống kê reconnect và độ trễ"""
+        avg_ms = (
+            self._reconnect_total_ms / self.reconnect_count if self.reconnect_count else None
+        )
+        return {
+            "name": self.name,
+            "port": self.port,
+            "ready": self.is_ready(),
+            "devtools_alive": self.devtools_alive,
+            "reconnect_count": self.reconnect_count,
+            "failed_reconnects": self.failed_reconnects,
+            "dead_sessions": self.dead_sessions,
+            "last_reconnect_ms": self.last_reconnect_ms,
+            "avg_reconnect_ms": avg_ms,
+            "last_check_time": self.last_check_time,
+        }
+
+    # ------------------------------------------------------------------
+    # Nội bộ
+    # ------------------------------------------------------------------
+    def _ping_devtools(self) -> bool:
+        """Ping endpoint /json/version của Chrome remote debugging"""
+        url = f"http://{self.host}:{self.port}/json/version"
+        try:
+            with urllib.request.urlopen(url, timeout=1.0) as response:
+                return response.status == 200
+        except Exception:
+            return False
+
+    @staticmethod
+    def _session_alive(driver) -> bool:
+        """Kiểm tra session WebDriver còn phản hồi không"""
+        try:
+            driver.window_handles
+            return True
+        except Exception:
+            return False
+
+    def _quit(self, driver):
+        """Đóng session chết để không để lại process chromedriver (lỗi được bỏ qua)"""
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.debug(f"[{self.name}] Bỏ qua lỗi khi quit driver cũ: {e}")
+
+    def _reconnect(self):
+        """Tạo driver mới và cập nhật metrics"""
+        start = time.time()
+        try:
+            driver = self.driver_factory()
+        except Exception as e:
+            self.failed_reconnects += 1
+            logger.error(f"❌ [{self.name}] Kết nối lại driver thất bại: {e}")
+            raise
+        elapsed = (time.time() - start) * 1000
+        with self._lock:
+            self._driver = driver
+            self.reconnect_count += 1
+            self.last_reconnect_ms = elapsed
+            self._reconnect_total_ms += elapsed
+            self._ready.set()
+        logger.info(
+            f"🔌 [{self.name}] Đã kết nối driver sau {elapsed:.2f} ms "
+            f"(reconnect #{self.reconnect_count})"
+        )
+        return driver
+
+    def _check_once(self):
+        """Một chu kỳ kiểm tra: ping Chrome, probe session, kết nối lại nếu cần"""
+        self.last_check_time = time.time()
+        alive = self._ping_devtools()
+        if not alive:
+            if self.devtools_alive:
+                logger.warning(f"⚠️ [{self.name}] Chrome tại cổng {self.port} không phản hồi")
+            self.devtools_alive = False
+            with self._lock:
+                driver, self._driver = self._driver, None
+                if driver is not None:
+                    self.dead_sessions += 1
+                self._ready.clear()
+            if driver is not None:
+                self._quit(driver)
+            return
+        self.devtools_alive = True
+
+        with self._lock:
+            driver = self._driver
+        if driver is not None:
+            # Driver đang được mượn: bỏ qua probe chu kỳ này (cùng khóa với lease)
+            if not self._use_lock.acquire(blocking=False):
+                return
+            try:
+                alive = self._session_alive(driver)
+            finally:
+                self._use_lock.release()
+            if alive:
+                return
+            self.mark_dead("session không phản hồi")
+        try:
+            self._reconnect()
+        except Exception:
+            pass  # Sẽ thử lại ở chu kỳ sau
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                self._check_once()
+            except Exception as e:
+                logger.error(f"💥 [{self.name}] Lỗi trong vòng giám sát driver: {e}")
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+        logger.info(f"🛑 [{self.name}] Đã dừng giám sát driver")
@@ -0,0 +1,147 @@
+"""
+Module ánh xạ nhãn (label) trên trang chi tiết order Binance P2P sang tên trường chuẩn.
+Mục đích: Bảng ánh xạ khai báo, hỗ trợ nhiều ngôn ngữ (giao diện tiếng Anh và tiếng Việt),
+tra cứu bằng dict theo nhãn đã chuẩn hóa, chỉ dùng regex đã biên dịch khi không khớp.
+"""
+
+import re
+import threading
+import unicodedata
+import logging
+from collections import Counter
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Tên trường chuẩn -> alias theo ngôn ngữ (viết thường, có thể có dấu; sẽ được chuẩn hóa)
+FIELD_ALIASES = {
+    "Fiat amount": {
+        "en": ["fiat amount"],
+        "vi": ["số tiền fiat", "số tiền pháp định", "số tiền"],
+    },
+    "Reference message": {
+        "en": ["reference message", "reference"],
+        "vi": ["nội dung tham chiếu", "tin nhắn tham chiếu", "mã tham chiếu", "nội dung chuyển khoản"],
+    },
+    "Full Name": {
+        "en": ["name", "full name", "account name"],
+        "vi": ["tên", "họ tên", "họ và tên", "tên đầy đủ", "tên chủ tài khoản"],
+    },
+    "Bank Card": {
+        "en": ["bank card", "bank card number", "account number", "bank account number"],
+        "vi": ["số tài khoản", "số thẻ", "số thẻ ngân hàng", "số tài khoản/số thẻ"],
+    },
+    "Bank Name": {
+        "en": ["bank name", "bank"],
+        "vi": ["tên ngân hàng", "ngân hàng"],
+    },
+}
+
+# Regex dự phòng (trên nhãn đã chuẩn hóa), kiểm tra theo đúng thứ tự khai báo
+FIELD_PATTERNS = [
+    ("Fiat amount", r"fiat amount|so tien (fiat|phap dinh)"),
+    ("Reference message", r"reference message|(noi dung|tin nhan|ma) tham chieu|noi dung chuyen khoan"),
+    ("Full Name", r"^name$|full name|^ten$|ho (va )?ten|ten day du"),
+    ("Bank Card", r"bank card|account number|so tai khoan|so the"),
+    ("Bank Name", r"bank name|ten ngan hang"),
+]
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_MISS = object()
+
+
+def normalize_label(label: str) -> str:
+    """Chuẩn hóa nhãn: bỏ dấu tiếng Việt, viết thường, bỏ dấu ':' cuối, gộp khoảng trắng"""
+    if not label:
+        return ""
+    text = label.replace("đ", "d").replace("Đ", "D")
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = _WHITESPACE_RE.sub(" ", text.lower()).strip()
+    return text.rstrip(":：").strip()
+
+
+class FieldMapper:
+    def __init__(self, aliases: Dict[str, Dict[str, list]] = None, patterns: list = None,
+                 memo_size: int = 1024):
+        """
+        Khởi tạo FieldMapper
+        Args:
+            aliases: Bảng tên trường chuẩn -> {ngôn ngữ: [alias]}
+            patterns: Danh sách (tên trường, regex) dự phòng
+            memo_size: Số nhãn tối đa được ghi nhớ kết quả regex
+        """
+        aliases = FIELD_ALIASES if aliases is None else aliases
+        patterns = FIELD_PATTERNS if patterns is None else patterns
+
+        self._lookup: Dict[str, str] = {}
+        for field, languages in aliases.items():
+            for names in languages.values():
+                for name in names:
+                    self._lookup.setdefault(normalize_label(name), field)
+        self._patterns = [(field, re.compile(pattern)) for field, pattern in patterns]
+        self._memo: Dict[str, object] = {}
+        self._memo_size = memo_size
+        self._lock = threading.Lock()
+
+        # Thống kê
+        self.lookups = 0
+        self.dict_hits = 0
+        self.regex_hits = 0
+        self.misses = 0
+        self.unknown_labels = Counter()
+
+    def resolve(self, label: str) -> Optional[str]:
+        """Trả về tên trường chuẩn cho nhãn, hoặc None nếu không nhận ra"""
+        key = normalize_label(label)
+        with self._lock:
+            self.lookups += 1
+            field = self._lookup.get(key)
+            if field is not None:
+                self.dict_hits += 1
+                return field
+            memo = self._memo.get(key, None)
+        if memo is None:
+            memo = _MISS
+            for candidate, pattern in self._patterns:
+                if pattern.search(key):
+                    memo = candidate
+                    break
+            with self._lock:
+                if len(self._memo) < self._memo_size:
+                    self._memo[key] = memo
+        with self._lock:
+            if memo is _MISS:
+                self.misses += 1
+                if label not in self.unknown_labels:
+                    logger.debug(f"Nhãn chưa được ánh xạ: '{label}'")
+                self.unknown_labels[label] += 1
+                return None
+            self.regex_hits += 1
+            return memo
+
+    def map_fields(self, data: dict) -> dict:
+        """Ánh xạ dict {nhãn: giá trị} sang {tên trường chuẩn: giá trị}"""
+        result = {}
+        for key, value in data.items():
+            field = self.resolve(key)
+            if field is not None:
+                result[field] = value
+        return result
+
+    def metrics(self) -> dict:
+        """Tỷ lệ khớp và các nhãn chưa biết"""
+        with self._lock:
+            hits = self.dict_hits + self.regex_hits
+            return {
+                "lookups": self.lookups,
+                "dict_hits": self.dict_hits,
+                "regex_hits": self.regex_hits,
+                "misses": self.misses,
+                "hit_rate": hits / self.lookups if self.lookups else None,
+                "unknown_labels": dict(self.unknown_labels.most_common(20)),
+            }
+
+
+# Mapper dùng chung cho extract_info_by_key
+default_mapper = FieldMapper()
@@ -8,6 +8,7 @@ import io
 import logging
 import json
 from rapidfuzz import process,fuzz
+from module import json_codec
 import unicodedata
 import re
 import os
@@ -38,7 +39,7 @@ def generate_vietqr(accountno=ACCOUNTNO, accountname=ACCOUNTNAME, acqid=ACQID, a
 
     logger.info(f"[generate_vietqr] Bắt đầu tạo QR cho account: {accountno}, bank: {acqid}, amount: {amount}")
     response = requests.post(url, json=payload, headers=headers)
-    response_json = response.json()
+    response_json = json_codec.decode_response(response)
     elapsed = (time.time() - start_time) * 1000  # ms
     logger.info(f"[generate_vietqr] Xử lý xong sau {elapsed:.2f} ms, status_code={response.status_code}")
     if response.status_code == 200 and "data" in response_json and "qrDataURL" in response_json["data"]:
@@ -60,7 +61,7 @@ def get_nganhang_api():
     try:
         response = requests.get(url, timeout=10)
         response.raise_for_status()
-        banks_data = response.json()
+        banks_data = json_codec.decode_response(response, schema=dict)
         
         # Chuyển đổi format dữ liệu
         formatted_banks = {}
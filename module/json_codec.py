@@ -0,0 +1,161 @@
+"""
+Lớp mã hóa/giải mã JSON dùng chung (file giao dịch, cache, phản hồi API, thông báo).
+Mục đích: Dùng orjson hoặc msgspec nếu đã cài (nhanh hơn nhiều lần json chuẩn) và ghi dạng gọn;
+không có thì dùng json chuẩn. Đầu ra luôn là bytes UTF-8, giữ nguyên tiếng Việt (không escape).
+Có thể kiểm tra kiểu khi giải mã (schema), ví dụ loads(data, schema=list[dict]).
+
+Chọn backend cố định: biến môi trường JSON_CODEC=orjson|msgspec|json.
+"""
+
+import json
+import os
+import typing
+from typing import Any, Dict, List
+
+try:
+    import orjson
+except ImportError:  # Thư viện tùy chọn
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # Thư viện tùy chọn
+    msgspec = None
+
+
+class CodecError(ValueError):
+    """Dữ liệu không phải JSON hợp lệ hoặc không đúng schema"""
+
+
+class _StdlibCodec:
+    name = "json"
+
+    def dumps(self, obj, pretty: bool = False) -> bytes:
+        if pretty:
+            return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode('utf-8')
+
+    def loads(self, data):
+        return json.loads(data)
+
+
+class _OrjsonCodec:
+    name = "orjson"
+
+    def dumps(self, obj, pretty: bool = False) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+
+class _MsgspecCodec:
+    name = "msgspec"
+
+    def __init__(self):
+        self._encoder = msgspec.json.Encoder()
+        self._decoders = {}  # schema -> Decoder
+
+    def dumps(self, obj, pretty: bool = False) -> bytes:
+        data = self._encoder.encode(obj)
+        return msgspec.json.format(data, indent=2) if pretty else data
+
+    def loads(self, data, schema=Any):
+        decoder = self._decoders.get(schema)
+        if decoder is None:
+            decoder = self._decoders[schema] = msgspec.json.Decoder(schema)
+        try:
+            return decoder.decode(data)
+        except msgspec.ValidationError as e:
+            raise CodecError(str(e)) from e
+        except msgspec.DecodeError as e:
+            raise CodecError(str(e)) from e
+
+
+CODECS: Dict[str, type] = {"json": _StdlibCodec}
+if orjson is not None:
+    CODECS["orjson"] = _OrjsonCodec
+if msgspec is not None:
+    CODECS["msgspec"] = _MsgspecCodec
+
+_instances = {}
+
+
+def available() -> List[str]:
+    """Tên các backend dùng được, nhanh nhất trước"""
+    return [name for name in ("orjson", "msgspec", "json") if name in CODECS]
+
+
+_DEFAULT = os.getenv("JSON_CODEC") or available()[0]
+
+
+def get_codec(name: str = None):
+    """Codec theo tên (None = backend mặc định)"""
+    name = name or _DEFAULT
+    if name not in CODECS:
+        raise ValueError(f"JSON codec không khả dụng: {name} (có: {', '.join(available())})")
+    codec = _instances.get(name)
+    if codec is None:
+        codec = _instances[name] = CODECS[name]()
+    return codec
+
+
+def _validate(obj, schema, path="$"):
+    """Kiểm tra kiểu đơn giản cho backend không tự validate (list, dict, list[dict], dict[str, int]...)"""
+    if schema is Any:
+        return
+    origin = typing.get_origin(schema) or schema
+    if origin is float and isinstance(obj, (int, float)) and not isinstance(obj, bool):
+        return
+    if not isinstance(obj, origin):
+        raise CodecError(f"{path}: cần {getattr(origin, '__name__', origin)}, nhận {type(obj).__name__}")
+    args = typing.get_args(schema)
+    if origin is list and args:
+        for i, item in enumerate(obj):
+            _validate(item, args[0], f"{path}[{i}]")
+    elif origin is dict and len(args) == 2:
+        for key, value in obj.items():
+            _validate(key, args[0], f"{path}.{key}")
+            _validate(value, args[1], f"{path}.{key}")
+
+
+def dumps(obj, pretty: bool = False) -> bytes:
+    """Mã hóa thành bytes UTF-8 (mặc định dạng gọn, pretty=True thụt lề 2)"""
+    return get_codec().dumps(obj, pretty)
+
+
+def loads(data, schema=None):
+    """
+    Giải mã bytes/str
+    Args:
+        schema: Kiểu cần có (ví dụ list[dict]); None = không kiểm tra
+    Raises:
+        CodecError: JSON không hợp lệ hoặc sai schema
+    """
+    codec = get_codec()
+    if isinstance(codec, _MsgspecCodec):
+        return codec.loads(data, schema if schema is not None else Any)
+    try:
+        obj = codec.loads(data)
+    except ValueError as e:
+        raise CodecError(str(e)) from e
+    if schema is not None:
+        _validate(obj, schema)
+    return obj
+
+
+def load_file(path, schema=None):
+    """Đọc và giải mã file JSON"""
+    with open(path, 'rb') as f:
+        return loads(f.read(), schema)
+
+
+def dump_file(obj, path, pretty: bool = False):
+    """Mã hóa và ghi file JSON"""
+    with open(path, 'wb') as f:
+        f.write(dumps(obj, pretty))
+
+
+def decode_response(response, schema=None):
+    """Thân phản hồi của requests dưới dạng JSON (thay cho response.json())"""
+    return loads(response.content, schema)
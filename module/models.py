@@ -0,0 +1,175 @@
+"""
+Kiểu dữ liệu của order (lịch sử C2C từ API Binance) và giao dịch (lưu trong TransactionStorage).
+Mục đích: Trường được khai báo rõ ràng thay cho dict tự do; dataclass slots tốn ít bộ nhớ và
+truy cập thuộc tính nhanh hơn dict.get; loại/trạng thái là enum, số tiền fiat là số nguyên.
+Transaction.to_dict/from_dict chính là schema của bản ghi trong file giao dịch.
+"""
+
+import re
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Optional
+
+
+class _OpenEnum(str, Enum):
+    """Enum chuỗi giữ nguyên giá trị chưa khai báo (API thêm trạng thái mới không làm mất dữ liệu)"""
+
+    @classmethod
+    def _missing_(cls, value):
+        if not isinstance(value, str) or not value:
+            return None
+        member = str.__new__(cls, value)
+        member._name_ = value
+        member._value_ = value
+        return member
+
+
+class OrderSide(_OpenEnum):
+    BUY = "BUY"
+    SELL = "SELL"
+
+    @classmethod
+    def parse(cls, value) -> Optional["OrderSide"]:
+        """'buy'/'BUY'/'mua' -> BUY, 'sell'/'bán' -> SELL; None nếu trống"""
+        if isinstance(value, cls) or not value:
+            return value or None
+        text = str(value).strip().upper()
+        return cls({"MUA": "BUY", "BÁN": "SELL", "BAN": "SELL"}.get(text, text))
+
+
+class OrderStatus(_OpenEnum):
+    PENDING = "PENDING"
+    TRADING = "TRADING"
+    BUYER_PAYED = "BUYER_PAYED"
+    DISTRIBUTING = "DISTRIBUTING"
+    IN_APPEAL = "IN_APPEAL"
+    COMPLETED = "COMPLETED"
+    CANCELLED = "CANCELLED"
+    CANCELLED_BY_SYSTEM = "CANCELLED_BY_SYSTEM"
+    # Trạng thái nội bộ: không tìm được mã ngân hàng để tạo QR
+    ERROR_BANK_NAME = "ERROR_BANK_NAME"
+
+    @property
+    def label(self) -> str:
+        """Tên hiển thị trong thông báo ("BUYER PAYED", "IN APPEAL", ...)"""
+        return self.value.replace("_", " ")
+
+    @classmethod
+    def parse(cls, value) -> Optional["OrderStatus"]:
+        return cls(value) if value else None
+
+
+def parse_fiat(value) -> int:
+    """Số tiền fiat (VND) dạng số nguyên từ số hoặc chuỗi ("1,500,000 ₫"); 0 nếu không đọc được"""
+    if isinstance(value, (int, float)):
+        return int(round(value))
+    text = re.sub(r"[^\d.\-]", "", str(value))
+    if text.count(".") > 1:  # "1.500.000": dấu chấm phân cách hàng nghìn
+        text = text.replace(".", "")
+    try:
+        return int(round(float(text)))
+    except ValueError:
+        return 0
+
+
+@dataclass(slots=True)
+class Order:
+    """Một dòng lịch sử C2C từ API Binance (get_c2c_trade_history)"""
+    order_number: str
+    side: OrderSide
+    status: OrderStatus
+    total_price: float
+    unit_price: str
+    amount: float
+    asset: str
+    fiat: str
+    fiat_symbol: str
+    create_time: int
+
+    @classmethod
+    def from_api(cls, data: dict) -> "Order":
+        return cls(
+            order_number=data["orderNumber"],
+            side=OrderSide(data["tradeType"]),
+            status=OrderStatus(data["orderStatus"]),
+            total_price=float(data["totalPrice"]),
+            unit_price=data.get("unitPrice", ""),
+            amount=float(data.get("amount") or 0),
+            asset=data.get("asset", ""),
+            fiat=data.get("fiat", ""),
+            fiat_symbol=data.get("fiatSymbol", ""),
+            create_time=int(data.get("createTime") or 0),
+        )
+
+    @property
+    def fiat_amount(self) -> int:
+        return parse_fiat(self.total_price)
+
+    def message(self) -> str:
+        """Nội dung thông báo khi order đổi trạng thái"""
+        return (
+            f"Status: {self.status.label}\n"
+            f"Type: {self.side.value}\n"
+            f"Price: {self.fiat_symbol}{self.unit_price}\n"
+            f"Fiat Amount: {self.total_price} {self.fiat}\n"
+            f"Crypto Amount: {self.amount} {self.asset}\n"
+            f"Order No.: {self.order_number}"
+        )
+
+
+@dataclass(slots=True)
+class Transaction:
+    """Một giao dịch trong TransactionStorage"""
+    order_number: Optional[str] = None
+    side: Optional[OrderSide] = None
+    amount: int = 0
+    timestamp: Optional[float] = None
+    order_status: Optional[OrderStatus] = None
+    bank_name: Optional[str] = None
+    account_number: Optional[str] = None
+    account_name: Optional[str] = None
+    reference: Optional[str] = None
+    message: Optional[str] = None
+    crypto_amount: Optional[float] = None
+    qr_hash: Optional[str] = None
+    qr_path: Optional[str] = None
+    qr_error: Optional[str] = None
+    extra: dict = field(default_factory=dict)  # Trường khác của bản ghi (giữ nguyên khi ghi lại)
+
+    _KEYS = ("order_number", "amount", "timestamp", "bank_name", "account_number", "account_name",
+             "reference", "message", "crypto_amount", "qr_hash", "qr_path", "qr_error")
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Transaction":
+        extra = {k: v for k, v in data.items() if k not in cls._KEYS and k not in ("type", "order_status")}
+        return cls(
+            order_number=data.get("order_number"),
+            side=OrderSide.parse(data.get("type")),
+            amount=parse_fiat(data.get("amount")),
+            timestamp=data.get("timestamp"),
+            order_status=OrderStatus.parse(data.get("order_status")),
+            bank_name=data.get("bank_name"),
+            account_number=data.get("account_number"),
+            account_name=data.get("account_name"),
+            reference=data.get("reference"),
+            message=data.get("message"),
+            crypto_amount=data.get("crypto_amount"),
+            qr_hash=data.get("qr_hash"),
+            qr_path=data.get("qr_path"),
+            qr_error=data.get("qr_error"),
+            extra=extra,
+        )
+
+    def to_dict(self) -> dict:
+        """Bản ghi lưu trữ (bỏ trường None; loại lưu dạng 'buy'/'sell')"""
+        data = {}
+        if self.side is not None:
+            data["type"] = self.side.value.lower()
+        for key in self._KEYS:
+            value = getattr(self, key)
+            if value is not None:
+                data[key] = value
+        if self.order_status is not None:
+            data["order_status"] = self.order_status.value
+        data.update(self.extra)
+        return data
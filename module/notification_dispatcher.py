@@ -0,0 +1,322 @@
+"""
+Module gửi thông báo bất đồng bộ (Discord, Telegram).
+Mục đích: Vòng lặp transactions_trading chỉ đưa tin nhắn vào hàng đợi có giới hạn,
+mỗi kênh có một thread gửi riêng với retry + backoff, nên webhook chậm/treo
+không làm chậm việc phát hiện order.
+Khi bị giới hạn tốc độ: tôn trọng Retry-After / X-RateLimit-*, gộp các thay đổi
+trạng thái của cùng một order và đóng gói nhiều tin nhắn vào một lần gửi.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Mã HTTP đáng để thử lại (status None = lỗi mạng/timeout)
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+# Ngăn cách giữa các tin nhắn khi gộp/đóng gói
+SEPARATOR = "\n\n"
+
+
+def is_retryable(result: dict) -> bool:
+    """Kết quả gửi thất bại có nên thử lại không"""
+    if not result or result.get("ok"):
+        return False
+    status = result.get("status")
+    return status is None or status in RETRYABLE_STATUS
+
+
+def _render(item: dict) -> str:
+    """
+    Nội dung tin nhắn text của một item: bản mới nhất của order,
+    kèm dòng đầu (trạng thái) của các bản trước đã được gộp, rồi các tin đóng gói kèm.
+    """
+    texts = item["texts"]
+    text = texts[-1]
+    if len(texts) > 1:
+        history = " → ".join(t.splitlines()[0] for t in texts[:-1] if t)
+        text = f"{text}\n⏱ Trước đó: {history}"
+    if item["packed"]:
+        text = SEPARATOR.join([text] + [_render(p) for p in item["packed"]])
+    return text
+
+
+class NotificationChannel:
+    def __init__(self, name: str, bot, max_queue: int = 100, max_retries: int = 4,
+                 backoff: float = 1.0, max_backoff: float = 30.0, max_length: int = 2000,
+                 coalesce_window: float = 10.0, pack_threshold: int = 3,
+                 max_rate_limit_waits: int = 10):
+        """
+        Một kênh thông báo với hàng đợi và thread gửi riêng
+        Args:
+            name: Tên kênh (dùng cho log/metrics)
+            bot: Đối tượng có send_message(text) và send_photo(image, caption)
+            max_queue: Số tin nhắn tối đa trong hàng đợi
+            max_retries: Số lần thử lại khi gặp lỗi tạm thời
+            backoff: Thời gian chờ ban đầu giữa các lần thử lại (giây), nhân đôi mỗi lần
+            max_backoff: Thời gian chờ tối đa giữa các lần thử lại (giây)
+            max_length: Độ dài tối đa một tin nhắn khi gộp
+            coalesce_window: Tin nhắn cùng key (số order) trong khoảng này được gộp làm một
+            pack_threshold: Khi hàng đợi có từ chừng này tin trở lên thì đóng gói nhiều tin một lần gửi
+            max_rate_limit_waits: Số lần chờ 429 tối đa cho một tin nhắn (không tính vào max_retries)
+        """
+        self.name = name
+        self.bot = bot
+        self.max_queue = max_queue
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_length = max_length
+        self.coalesce_window = coalesce_window
+        self.pack_threshold = pack_threshold
+        self.max_rate_limit_waits = max_rate_limit_waits
+
+        self._queue = deque()
+        self._keyed: Dict[str, dict] = {}
+        self._cond = threading.Condition()
+        self._sending = False
+        self._closed = False
+        # Không gửi trước thời điểm này (theo Retry-After / X-RateLimit-Reset-After)
+        self._not_before = 0.0
+
+        # Thống kê
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+        self.merged = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.packed = 0
+        self.rate_limited = 0
+
+        self._thread = threading.Thread(target=self._run, name=f"Notify-{name}", daemon=True)
+        self._thread.start()
+
+    def submit(self, kind: str, *args, key: str = None) -> bool:
+        """
+        Đưa tin nhắn vào hàng đợi, không bao giờ chờ.
+        Tin text cùng `key` còn chờ gửi (trong coalesce_window) được gộp vào tin cũ.
+        Khi hàng đợi đầy: gộp tin nhắn text vào tin cuối nếu còn đủ độ dài,
+        nếu không thì bỏ tin cũ nhất.
+        Returns:
+            bool: False nếu kênh đã đóng
+        """
+        now = time.time()
+        with self._cond:
+            if self._closed:
+                return False
+            if kind == "text" and key is not None:
+                pending = self._keyed.get(key)
+                if pending is not None and now - pending["enqueued_at"] <= self.coalesce_window \
+                        and len(_render(pending)) + len(args[0]) + 32 <= self.max_length:
+                    pending["texts"].append(args[0])
+                    self.coalesced += 1
+                    return True
+            item = {"kind": kind, "args": args, "key": key, "enqueued_at": now,
+                    "texts": [args[0]] if kind == "text" else [], "packed": []}
+            if len(self._queue) >= self.max_queue:
+                last = self._queue[-1]
+                if kind == "text" and last["kind"] == "text" \
+                        and len(_render(last)) + len(args[0]) + len(SEPARATOR) <= self.max_length:
+                    last["packed"].append(item)
+                    self.merged += 1
+                    return True
+                dropped = self._queue.popleft()
+                self._forget(dropped)
+                self.dropped += 1
+                logger.warning(f"⚠️ Hàng đợi [{self.name}] đầy, bỏ tin nhắn {dropped['kind']} cũ nhất")
+            self._queue.append(item)
+            if key is not None and kind == "text":
+                self._keyed[key] = item
+            self._cond.notify()
+            return True
+
+    def _forget(self, item: dict):
+        """Bỏ item (và các tin đóng gói kèm) khỏi bảng key để không gộp thêm vào"""
+        for entry in [item] + item["packed"]:
+            if entry["key"] is not None and self._keyed.get(entry["key"]) is entry:
+                del self._keyed[entry["key"]]
+
+    def _next_item(self) -> dict:
+        """Lấy tin tiếp theo; nếu hàng đợi sâu thì đóng gói các tin text liền sau vào cùng lần gửi"""
+        item = self._queue.popleft()
+        self._forget(item)
+        if item["kind"] != "text" or len(self._queue) + 1 < self.pack_threshold:
+            return item
+        length = len(_render(item))
+        while self._queue and self._queue[0]["kind"] == "text":
+            candidate_length = len(_render(self._queue[0]))
+            if length + len(SEPARATOR) + candidate_length > self.max_length:
+                break
+            candidate = self._queue.popleft()
+            self._forget(candidate)
+            item["packed"].append(candidate)
+            length += len(SEPARATOR) + candidate_length
+            self.packed += 1
+        return item
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if not self._queue and self._closed:
+                    return
+                item = self._next_item()
+                self._sending = True
+            try:
+                self._deliver(item)
+            finally:
+                with self._cond:
+                    self._sending = False
+                    self._cond.notify_all()
+
+    def _wait_rate_limit(self):
+        delay = self._not_before - time.time()
+        if delay > 0:
+            time.sleep(delay)
+
+    def _apply_rate_limit(self, result: dict):
+        """Cập nhật thời điểm được gửi tiếp theo từ thông tin rate limit của bot"""
+        now = time.time()
+        retry_after = result.get("retry_after")
+        if retry_after:
+            self._not_before = max(self._not_before, now + float(retry_after))
+        rate_limit = result.get("rate_limit") or {}
+        if rate_limit.get("remaining") == 0 and rate_limit.get("reset_after"):
+            self._not_before = max(self._not_before, now + float(rate_limit["reset_after"]))
+
+    def _deliver(self, item: dict):
+        kind = item["kind"]
+        if kind == "text":
+            send, args = self.bot.send_message, (_render(item),)
+        else:
+            send, args = self.bot.send_photo, item["args"]
+        delay = self.backoff
+        attempt = 0
+        rate_limit_waits = 0
+        while True:
+            self._wait_rate_limit()
+            try:
+                result = send(*args)
+            except Exception as e:
+                result = {"ok": False, "error": str(e)}
+            result = result or {"ok": False}
+            self._apply_rate_limit(result)
+            if result.get("ok"):
+                self.sent += 1
+                return
+            if result.get("status") == 429 and rate_limit_waits < self.max_rate_limit_waits:
+                # Bị giới hạn tốc độ: chờ theo Retry-After, không tính là một lần thử lỗi
+                rate_limit_waits += 1
+                self.rate_limited += 1
+                if not result.get("retry_after"):
+                    self._not_before = max(self._not_before, time.time() + delay)
+                    delay = min(delay * 2, self.max_backoff)
+                logger.warning(f"⏳ [{self.name}] bị giới hạn tốc độ, chờ "
+                               f"{max(0.0, self._not_before - time.time()):.1f}s")
+                continue
+            if attempt >= self.max_retries or not is_retryable(result):
+                break
+            attempt += 1
+            self.retries += 1
+            logger.warning(f"🔁 [{self.name}] gửi thất bại ({result.get('status')}), thử lại sau {delay:.1f}s")
+            time.sleep(delay)
+            delay = min(delay * 2, self.max_backoff)
+        self.failed += 1
+        logger.error(f"❌ [{self.name}] bỏ tin nhắn {kind} sau {attempt + rate_limit_waits + 1} lần thử: "
+                     f"{result.get('error') or result.get('description')}")
+
+    def flush(self, timeout: float = None) -> bool:
+        """Chờ gửi hết hàng đợi. Trả về False nếu hết thời gian chờ"""
+        deadline = None if timeout is None else time.time() + timeout
+        with self._cond:
+            while self._queue or self._sending:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout: float = None):
+        """Gửi nốt hàng đợi rồi dừng thread gửi"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def metrics(self) -> dict:
+        with self._cond:
+            pending = len(self._queue)
+        return {
+            "pending": pending,
+            "sent": self.sent,
+            "failed": self.failed,
+            "retries": self.retries,
+            "merged": self.merged,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "packed": self.packed,
+            "rate_limited": self.rate_limited,
+        }
+
+
+class NotificationDispatcher:
+    def __init__(self, max_queue: int = 100):
+        """Phân phối tin nhắn tới các kênh, mỗi kênh gửi độc lập"""
+        self.max_queue = max_queue
+        self.channels: Dict[str, NotificationChannel] = {}
+        self._lock = threading.Lock()
+
+    def add_channel(self, name: str, bot, **kwargs) -> NotificationChannel:
+        """Đăng ký kênh (bỏ qua nếu tên kênh đã có với cùng bot)"""
+        with self._lock:
+            channel = self.channels.get(name)
+            if channel is not None and channel.bot is bot:
+                return channel
+            kwargs.setdefault("max_queue", self.max_queue)
+            new_channel = NotificationChannel(name, bot, **kwargs)
+            self.channels[name] = new_channel
+        if channel is not None:
+            channel.close(timeout=0)
+        return new_channel
+
+    def remove_channel(self, name: str):
+        with self._lock:
+            channel = self.channels.pop(name, None)
+        if channel is not None:
+            channel.close(timeout=0)
+
+    def send_message(self, text: str, key: str = None):
+        """
+        Đưa tin nhắn text vào hàng đợi của mọi kênh
+        Args:
+            text: Nội dung
+            key: Khóa gộp (ví dụ số order): các tin cùng key chưa gửi sẽ được gộp lại
+        """
+        for channel in list(self.channels.values()):
+            channel.submit("text", text, key=key)
+
+    def send_photo(self, image, caption: str = ""):
+        """Đưa ảnh vào hàng đợi của mọi kênh"""
+        for channel in list(self.channels.values()):
+            channel.submit("photo", image, caption)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        deadline = None if timeout is None else time.time() + timeout
+        ok = True
+        for channel in list(self.channels.values()):
+            remaining = None if deadline is None else max(0, deadline - time.time())
+            ok = channel.flush(remaining) and ok
+        return ok
+
+    def close(self, timeout: Optional[float] = None):
+        for channel in list(self.channels.values()):
+            channel.close(timeout)
+
+    def metrics(self) -> dict:
+        return {name: channel.metrics() for name, channel in self.channels.items()}
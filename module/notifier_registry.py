@@ -0,0 +1,164 @@
+"""
+Module đăng ký các kênh thông báo (nhiều Discord webhook, nhiều Telegram chat).
+Mục đích: Cấu hình kênh từ config_env, định tuyến tin nhắn theo loại giao dịch,
+trạng thái và ngưỡng số tiền; mỗi kênh gửi độc lập qua NotificationChannel riêng.
+"""
+
+import logging
+import os
+import re
+import sys
+from typing import Dict, Iterable, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from config_env import DISCORD_WEBHOOK, NOTIFY_CHANNELS, TELEGRAM_CHAT_ID, TELEGRAM_TOKEN
+from module import json_codec
+from module.json_codec import CodecError
+from module.discord_send_message import DiscordBot
+from module.notification_dispatcher import NotificationDispatcher
+from module.telegram_send_message import TelegramBot
+
+logger = logging.getLogger(__name__)
+
+# Độ dài tối đa một tin nhắn theo loại kênh
+MAX_LENGTH = {"discord": 2000, "telegram": 4096}
+
+
+class RoutingRule:
+    def __init__(self, trade_types: Iterable[str] = None, statuses: Iterable[str] = None,
+                 min_amount: float = None, photos: bool = True):
+        """
+        Điều kiện để một kênh nhận tin nhắn (bỏ trống = không lọc)
+        Args:
+            trade_types: Loại giao dịch nhận (BUY/SELL)
+            statuses: Trạng thái order nhận (TRADING, COMPLETED...)
+            min_amount: Chỉ nhận order có số tiền fiat từ ngưỡng này
+            photos: Kênh có nhận ảnh QR không
+        """
+        self.trade_types = {t.upper() for t in trade_types} if trade_types else None
+        self.statuses = {s.upper() for s in statuses} if statuses else None
+        self.min_amount = float(min_amount) if min_amount is not None else None
+        self.photos = photos
+
+    def matches(self, trade_type: str = None, status: str = None, amount: float = None) -> bool:
+        """Tin nhắn hệ thống (không có thông tin order) luôn được gửi tới mọi kênh"""
+        if trade_type is None and status is None and amount is None:
+            return True
+        if self.trade_types is not None and (trade_type or "").upper() not in self.trade_types:
+            return False
+        if self.statuses is not None and (status or "").upper() not in self.statuses:
+            return False
+        if self.min_amount is not None:
+            value = _to_amount(amount)
+            if value is None or value < self.min_amount:
+                return False
+        return True
+
+
+class NotifierRegistry(NotificationDispatcher):
+    def __init__(self, max_queue: int = 100):
+        """Tập các kênh thông báo, mỗi kênh có luật định tuyến riêng"""
+        super().__init__(max_queue=max_queue)
+        self.rules: Dict[str, RoutingRule] = {}
+
+    @classmethod
+    def from_config(cls, spec: str = None) -> "NotifierRegistry":
+        """
+        Tạo registry từ cấu hình NOTIFY_CHANNELS (JSON).
+        Nếu trống: một kênh cho mỗi DISCORD_WEBHOOK và mỗi TELEGRAM_CHAT_ID (phân tách bởi dấu phẩy).
+        """
+        spec = NOTIFY_CHANNELS if spec is None else spec
+        registry = cls()
+        entries = None
+        if spec and spec.strip():
+            try:
+                entries = json_codec.loads(spec, schema=list[dict])
+            except CodecError as e:
+                # Cấu hình gõ sai không được làm bot dừng: dùng kênh từ biến môi trường
+                logger.error(f"❌ NOTIFY_CHANNELS không hợp lệ, dùng DISCORD_WEBHOOK/TELEGRAM_CHAT_ID: {e}")
+        if entries is None:
+            entries = []
+            for i, webhook in enumerate(_split(DISCORD_WEBHOOK)):
+                entries.append({"name": f"discord{i or ''}", "type": "discord", "webhook": webhook})
+            if TELEGRAM_TOKEN:
+                for i, chat_id in enumerate(_split(TELEGRAM_CHAT_ID)):
+                    entries.append({"name": f"telegram{i or ''}", "type": "telegram", "chat_id": chat_id})
+        for entry in entries:
+            try:
+                registry.add_from_spec(entry)
+            except ValueError as e:
+                logger.error(f"❌ Bỏ qua kênh thông báo không hợp lệ {entry.get('name')}: {e}")
+        if not registry.channels:
+            logger.warning("⚠️ Chưa cấu hình kênh thông báo nào (NOTIFY_CHANNELS/DISCORD_WEBHOOK/TELEGRAM_CHAT_ID)")
+        return registry
+
+    def add_from_spec(self, entry: dict):
+        """Tạo bot và đăng ký kênh từ một mục cấu hình"""
+        kind = entry.get("type", "").lower()
+        name = entry.get("name") or f"{kind}{len(self.channels)}"
+        if kind == "discord":
+            bot = DiscordBot(entry.get("webhook"))
+        elif kind == "telegram":
+            bot = TelegramBot(entry.get("token"), chat_id=entry.get("chat_id"),
+                              base_url=entry.get("base_url"))
+        else:
+            raise ValueError(f"Loại kênh thông báo không hợp lệ: '{kind}'")
+        rule = RoutingRule(
+            trade_types=entry.get("trade_types"),
+            statuses=entry.get("statuses"),
+            min_amount=entry.get("min_amount"),
+            photos=entry.get("photos", True),
+        )
+        self.add_channel(name, bot, rule=rule, max_length=MAX_LENGTH[kind])
+        logger.info(f"📣 Đã đăng ký kênh thông báo [{name}] ({kind})")
+
+    def add_channel(self, name: str, bot, rule: RoutingRule = None, **kwargs):
+        self.rules[name] = rule or RoutingRule()
+        return super().add_channel(name, bot, **kwargs)
+
+    def remove_channel(self, name: str):
+        self.rules.pop(name, None)
+        super().remove_channel(name)
+
+    def _targets(self, trade_type, status, amount, photo: bool = False):
+        for name, channel in list(self.channels.items()):
+            rule = self.rules.get(name) or RoutingRule()
+            if photo and not rule.photos:
+                continue
+            if rule.matches(trade_type, status, amount):
+                yield channel
+
+    def send_message(self, text: str, key: str = None, trade_type: str = None,
+                     status: str = None, amount: float = None):
+        """
+        Đưa tin nhắn vào hàng đợi của các kênh có luật khớp
+        Args:
+            text: Nội dung
+            key: Khóa gộp (số order)
+            trade_type, status, amount: Thông tin order dùng để định tuyến
+        """
+        for channel in self._targets(trade_type, status, amount):
+            channel.submit("text", text, key=key)
+
+    def send_photo(self, image, caption: str = "", trade_type: str = None,
+                   status: str = None, amount: float = None):
+        """Đưa ảnh (QR) vào hàng đợi của các kênh có luật khớp và nhận ảnh"""
+        for channel in self._targets(trade_type, status, amount, photo=True):
+            channel.submit("photo", image, caption)
+
+
+def _to_amount(value) -> Optional[float]:
+    """Đổi số tiền (số hoặc chuỗi dạng "₫ 1,000,000.00") sang float"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    digits = re.sub(r"[^\d.]", "", str(value))
+    try:
+        return float(digits)
+    except ValueError:
+        return None
+
+
+def _split(value: Optional[str]):
+    return [part.strip() for part in (value or "").split(",") if part.strip()]
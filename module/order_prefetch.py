@@ -0,0 +1,113 @@
+"""
+Module prefetch thông tin order BUY ngay khi order xuất hiện.
+Mục đích: Scrape trang chi tiết order và tra mã ngân hàng trước khi order
+chuyển sang TRADING, để handle_buy_order đọc từ cache thay vì chờ trình duyệt.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from module.generate_qrcode import get_nganhang_id
+from module.selenium_get_info import extract_info_by_key
+
+logger = logging.getLogger(__name__)
+
+# Các trạng thái trước TRADING: đã có thể đọc thông tin người bán, còn thời gian scrape ở nền.
+# Order xuất hiện thẳng ở TRADING thì handle_buy_order scrape đồng bộ (prefetch lúc đó chỉ thêm
+# một lần chuyển thread mà không nhanh hơn).
+PRE_PAYMENT_STATUSES = {"PENDING"}
+
+
+class OrderPrefetcher:
+    def __init__(self, scrape, ttl: float = 300.0, max_workers: int = 4):
+        """
+        Khởi tạo OrderPrefetcher
+        Args:
+            scrape: Hàm scrape(order_number) -> dict thông tin thô của order
+            ttl: Thời gian sống của kết quả trong cache (giây)
+            max_workers: Số order prefetch song song tối đa
+        """
+        self.scrape = scrape
+        self.ttl = ttl
+        self._entries: Dict[str, Tuple[float, Future]] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="Prefetch")
+
+        # Thống kê
+        self.hits = 0
+        self.misses = 0
+
+    def prefetch(self, order_number: str) -> Future:
+        """Bắt đầu scrape order ở nền nếu chưa có kết quả còn hạn"""
+        now = time.time()
+        with self._lock:
+            self._purge_expired(now)
+            entry = self._entries.get(order_number)
+            if entry is not None:
+                return entry[1]
+            future = self._executor.submit(self._resolve, order_number)
+            self._entries[order_number] = (now + self.ttl, future)
+        logger.info(f"🔮 Prefetch thông tin order {order_number}")
+        return future
+
+    def get(self, order_number: str, timeout: float = 20.0) -> Optional[dict]:
+        """
+        Lấy kết quả prefetch. Nếu đang scrape dở thì chờ tối đa `timeout` giây.
+        Returns:
+            dict gồm raw, info, acqid hoặc None nếu không có/không dùng được
+        """
+        with self._lock:
+            entry = self._entries.get(order_number)
+            if entry is not None and entry[0] < time.time():
+                del self._entries[order_number]
+                entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        try:
+            result = entry[1].result(timeout)
+        except Exception as e:
+            logger.warning(f"⚠️ Prefetch order {order_number} không dùng được: {e}")
+            result = None
+        if not result:
+            self.invalidate(order_number)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return result
+
+    def invalidate(self, order_number: str):
+        with self._lock:
+            self._entries.pop(order_number, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            size = len(self._entries)
+        return {"hits": self.hits, "misses": self.misses, "size": size}
+
+    def _purge_expired(self, now: float):
+        expired = [k for k, (expires_at, _) in self._entries.items() if expires_at < now]
+        for key in expired:
+            del self._entries[key]
+
+    def _resolve(self, order_number: str) -> Optional[dict]:
+        """Scrape order, chuẩn hóa field và tra mã ngân hàng"""
+        start = time.time()
+        raw = self.scrape(order_number)
+        if not raw:
+            return None
+        info = extract_info_by_key(raw)
+        bank_name = info.get("Bank Name")
+        acqid = get_nganhang_id(bank_name) if bank_name else None
+        elapsed = (time.time() - start) * 1000
+        logger.info(f"✅ Prefetch order {order_number} xong sau {elapsed:.2f} ms")
+        return {
+            "raw": raw,
+            "info": info,
+            "bank_name": bank_name,
+            "acqid": acqid,
+            "fetched_at": time.time(),
+        }
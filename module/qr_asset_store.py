@@ -0,0 +1,188 @@
+"""
+Module lưu ảnh QR theo nội dung (content-addressed).
+Mục đích: Ảnh QR được đặt tên theo sha256 nên ảnh trùng chỉ lưu một lần; mỗi ngày đã đóng
+được gộp thành một file pack + index offset (đọc ngẫu nhiên từng ảnh), thay vì hàng chục
+nghìn file PNG nhỏ; pack cũ hơn số ngày giữ lại sẽ bị xóa.
+
+Cấu trúc thư mục:
+    loose/<2 ký tự đầu>/<hash>.png   ảnh của các ngày chưa đóng
+    packs/<YYYY-MM-DD>.pack           ảnh của một ngày đã đóng, nối liền nhau
+    packs/<YYYY-MM-DD>.idx.json       {hash: [offset, length]}
+    extracted/<hash>.png              bản tách từ pack để hiển thị (xóa khi compact)
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+import threading
+from datetime import date as date_type, datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from module import json_codec
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _write_atomic(path: Path, data: bytes):
+    tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class QrAssetStore:
+    def __init__(self, root):
+        """
+        Args:
+            root: Thư mục gốc của kho ảnh QR
+        """
+        self.root = Path(root)
+        self.loose_dir = self.root / "loose"
+        self.pack_dir = self.root / "packs"
+        self.extract_dir = self.root / "extracted"
+        for directory in (self.loose_dir, self.pack_dir, self.extract_dir):
+            directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._packs: Dict[str, Dict[str, list]] = {}  # ngày -> {hash: [offset, length]}
+        self._located: Dict[str, str] = {}  # hash -> ngày của pack chứa ảnh
+        for idx_file in sorted(self.pack_dir.glob("*.idx.json")):
+            self._load_index(idx_file.name[:-len(".idx.json")])
+
+    # --- Ghi / đọc ---
+    def loose_path(self, asset_hash: str) -> Path:
+        return self.loose_dir / asset_hash[:2] / f"{asset_hash}.png"
+
+    def put(self, data: bytes) -> str:
+        """Lưu ảnh (bỏ qua nếu đã có ảnh cùng nội dung), trả về hash"""
+        asset_hash = content_hash(data)
+        path = self.loose_path(asset_hash)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            _write_atomic(path, data)
+        return asset_hash
+
+    def get(self, asset_hash: str) -> Optional[bytes]:
+        """Nội dung ảnh theo hash (None nếu không còn, ví dụ pack đã hết hạn lưu trữ)"""
+        path = self.loose_path(asset_hash)
+        try:
+            return path.read_bytes()
+        except FileNotFoundError:
+            pass
+        with self._lock:
+            day = self._located.get(asset_hash)
+            entry = self._packs.get(day, {}).get(asset_hash) if day else None
+        if entry is None:
+            return None
+        offset, length = entry
+        try:
+            with open(self.pack_dir / f"{day}.pack", 'rb') as f:
+                f.seek(offset)
+                data = f.read(length)
+        except FileNotFoundError:
+            return None
+        return data if len(data) == length else None
+
+    def path_for(self, asset_hash: str) -> Optional[str]:
+        """
+        Đường dẫn file ảnh để hiển thị: file loose nếu có, nếu đã đóng gói thì tách ra
+        thư mục extracted/. None nếu ảnh không còn.
+        """
+        if not asset_hash:
+            return None
+        path = self.loose_path(asset_hash)
+        if path.exists():
+            return str(path)
+        extracted = self.extract_dir / f"{asset_hash}.png"
+        if extracted.exists():
+            return str(extracted)
+        data = self.get(asset_hash)
+        if data is None:
+            return None
+        _write_atomic(extracted, data)
+        return str(extracted)
+
+    # --- Đóng gói ---
+    def _load_index(self, day: str):
+        index = json_codec.load_file(self.pack_dir / f"{day}.idx.json", schema=dict)
+        with self._lock:
+            self._packs[day] = index
+            for asset_hash in index:
+                self._located[asset_hash] = day
+
+    def packed_at(self, day: date_type) -> Optional[int]:
+        """mtime_ns của index pack của ngày (None nếu ngày chưa được đóng gói)"""
+        try:
+            return (self.pack_dir / f"{day.strftime('%Y-%m-%d')}.idx.json").stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def pack_day(self, day: date_type, hashes: Iterable[str]) -> int:
+        """
+        Gộp ảnh của một ngày đã đóng vào một pack (mỗi pack tự chứa đủ ảnh của ngày đó,
+        để xóa theo hạn lưu trữ không ảnh hưởng ngày khác). Trả về số ảnh đã gộp.
+        File loose chưa bị xóa ở đây (xem remove_loose).
+        """
+        key = day.strftime("%Y-%m-%d")
+        index = {}
+        chunks = []
+        offset = 0
+        for asset_hash in dict.fromkeys(hashes):  # bỏ trùng, giữ thứ tự
+            data = self.get(asset_hash)
+            if data is None:
+                logger.warning(f"⚠️ Không tìm thấy ảnh QR {asset_hash} khi đóng gói ngày {key}")
+                continue
+            index[asset_hash] = [offset, len(data)]
+            chunks.append(data)
+            offset += len(data)
+        # Pack ghi trước, index ghi sau cùng: có index nghĩa là pack đã hoàn chỉnh
+        _write_atomic(self.pack_dir / f"{key}.pack", b"".join(chunks))
+        _write_atomic(self.pack_dir / f"{key}.idx.json",
+                      json_codec.dumps(index))
+        self._load_index(key)
+        return len(index)
+
+    def remove_loose(self, hashes: Iterable[str]) -> int:
+        """Xóa file loose đã nằm trong pack; trả về số file đã xóa"""
+        removed = 0
+        for asset_hash in hashes:
+            with self._lock:
+                packed = asset_hash in self._located
+            if not packed:
+                continue
+            try:
+                self.loose_path(asset_hash).unlink()
+                removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+    def apply_retention(self, keep_days: int, today: date_type = None) -> int:
+        """Xóa pack của các ngày cũ hơn keep_days ngày (0 = giữ vĩnh viễn); trả về số pack đã xóa"""
+        if not keep_days:
+            return 0
+        cutoff = (today or datetime.now().date()) - timedelta(days=keep_days)
+        removed = 0
+        for day in list(self._packs):
+            if datetime.strptime(day, "%Y-%m-%d").date() >= cutoff:
+                continue
+            with self._lock:
+                self._packs.pop(day)
+                # Ảnh có thể nằm trong pack của nhiều ngày: dựng lại vị trí từ các pack còn lại
+                self._located = {h: d for d, index in self._packs.items() for h in index}
+            for suffix in (".idx.json", ".pack"):
+                try:
+                    (self.pack_dir / f"{day}{suffix}").unlink()
+                except FileNotFoundError:
+                    pass
+            removed += 1
+        return removed
+
+    def clear_extracted(self):
+        shutil.rmtree(self.extract_dir, ignore_errors=True)
+        self.extract_dir.mkdir(parents=True, exist_ok=True)
@@ -0,0 +1,154 @@
+"""
+Module cache kết quả scrape trang chi tiết order (Selenium).
+Mục đích: Order BUY đã scrape đủ trường không phải mở lại Chrome khi bot khởi động lại hoặc xử lý
+lại; kết quả thiếu trường chỉ giữ ngắn hạn để lần sau scrape bổ sung. HTML trang được lưu kèm để
+debug_order.py --replay phân tích offline. Entry hết hạn được xóa trong lần bảo trì định kỳ.
+
+Cấu trúc thư mục:
+    <số order>.json   entry (raw, normalized, complete, missing_fields, expires_at...)
+    <số order>.html   HTML trang chi tiết order lần scrape gần nhất
+"""
+
+import os
+import time
+import logging
+import threading
+from pathlib import Path
+from typing import Optional
+
+from module import json_codec
+from module.selenium_get_info import extract_info_by_key
+
+logger = logging.getLogger(__name__)
+
+# Các trường bắt buộc để tạo QR cho order BUY
+REQUIRED_FIELDS = ["Fiat amount", "Full Name", "Bank Card", "Bank Name", "Reference message"]
+
+
+def _write_atomic(path: Path, data: bytes):
+    # Ghi file tạm rồi thay thế: reader không bao giờ thấy entry ghi dở
+    tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class ScrapeCache:
+    def __init__(self, base_dir: str = "transactions/scrape_cache", ttl: float = 86400,
+                 incomplete_ttl: float = 600):
+        """
+        Cache bền vững kết quả scrape theo số order
+        Args:
+            base_dir: Thư mục lưu cache
+            ttl: Thời gian sống của kết quả đầy đủ (giây)
+            incomplete_ttl: Thời gian sống của kết quả còn thiếu trường (giây)
+        """
+        self.base_dir = Path(base_dir)
+        self.ttl = ttl
+        self.incomplete_ttl = incomplete_ttl
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+
+    def _entry_path(self, order_number: str) -> Path:
+        return self.base_dir / f"{order_number}.json"
+
+    def _html_path(self, order_number: str) -> Path:
+        return self.base_dir / f"{order_number}.html"
+
+    def get(self, order_number: str, allow_expired: bool = False) -> Optional[dict]:
+        """
+        Lấy kết quả đã cache
+        Args:
+            order_number: Số order
+            allow_expired: Trả về cả kết quả đã hết hạn (dùng cho chẩn đoán)
+        Returns:
+            dict: Entry gồm raw, normalized, complete, missing_fields... hoặc None
+        """
+        path = self._entry_path(order_number)
+        try:
+            if not path.exists():
+                return None
+            entry = json_codec.load_file(path, schema=dict)
+            if not allow_expired and entry.get('expires_at', 0) < time.time():
+                return None
+            return entry
+        except Exception as e:
+            self.logger.error(f"Lỗi khi đọc scrape cache cho order {order_number}: {e}")
+            return None
+
+    def put(self, order_number: str, raw: dict, html: str = None) -> dict:
+        """
+        Lưu kết quả scrape mới, gộp với kết quả cũ còn hạn: trường đã có giữ nguyên,
+        trường mới lấy được sẽ bổ sung vào.
+        Returns:
+            dict: Entry sau khi gộp
+        """
+        with self._lock:
+            now = time.time()
+            previous = self.get(order_number) or {}
+            merged = dict(previous.get('raw', {}))
+            for key, value in (raw or {}).items():
+                if value not in (None, ""):
+                    merged[key] = value
+
+            normalized = extract_info_by_key(merged)
+            missing = [field for field in REQUIRED_FIELDS if not normalized.get(field)]
+            complete = not missing
+            entry = {
+                'order_number': order_number,
+                'raw': merged,
+                'normalized': normalized,
+                'complete': complete,
+                'missing_fields': missing,
+                'scraped_at': previous.get('scraped_at', now),
+                'updated_at': now,
+                'expires_at': now + (self.ttl if complete else self.incomplete_ttl),
+                'scrape_count': previous.get('scrape_count', 0) + 1,
+                'has_html': previous.get('has_html', False) or bool(html),
+            }
+            try:
+                if html:
+                    _write_atomic(self._html_path(order_number), html.encode('utf-8'))
+                _write_atomic(self._entry_path(order_number), json_codec.dumps(entry))
+            except Exception as e:
+                self.logger.error(f"Lỗi khi ghi scrape cache cho order {order_number}: {e}")
+            status = "đầy đủ" if complete else f"thiếu {missing}"
+            self.logger.info(f"💾 Scrape cache order {order_number}: {status}")
+            return entry
+
+    def load_html(self, order_number: str) -> Optional[str]:
+        """Đọc HTML đã lưu để replay offline"""
+        path = self._html_path(order_number)
+        if not path.exists():
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def invalidate(self, order_number: str):
+        """Xóa cache của một order"""
+        for path in (self._entry_path(order_number), self._html_path(order_number)):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def purge_expired(self) -> int:
+        """Xóa các entry đã hết hạn (kèm HTML, và HTML không còn entry), trả về số entry đã xóa"""
+        removed = 0
+        now = time.time()
+        with self._lock:
+            for path in self.base_dir.glob("*.json"):
+                try:
+                    entry = json_codec.load_file(path, schema=dict)
+                    if entry.get('expires_at', 0) < now:
+                        self.invalidate(path.stem)
+                        removed += 1
+                except Exception as e:
+                    self.logger.warning(f"Bỏ qua file cache lỗi {path}: {e}")
+            for path in self.base_dir.glob("*.html"):
+                if not self._entry_path(path.stem).exists():
+                    path.unlink(missing_ok=True)
+        if removed:
+            self.logger.info(f"🧹 Đã xóa {removed} entry scrape cache hết hạn")
+        return removed
@@ -12,7 +12,6 @@ from selenium.webdriver.common.by import By
 from bs4 import BeautifulSoup
 import os
 import time
-import re
 import subprocess
 import sys
 import logging
@@ -22,6 +21,8 @@ sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from config_env import CHROME_DRIVE, CHROME_PATH
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium.common.exceptions import TimeoutException
+from module.driver_supervisor import DriverSupervisor
+from module.field_mapping import default_mapper
 
 # Thiết lập logging
 logging.basicConfig(level=logging.INFO)
@@ -33,14 +34,19 @@ PROFILE_PATH = BASE_DIR / "SeleniumProfile"
 
 # Biến global để lưu driver
 _login_driver = None
-_cached_driver = None  # Cache driver để tái sử dụng
+_driver_supervisor = None  # Supervisor giữ driver sống cho extract_order_info
+_driver_path = None  # Cache đường dẫn ChromeDriver để reconnect nhanh
 
-def update_chromedriver():
-    """Cập nhật ChromeDriver lên version mới nhất"""
+def update_chromedriver(force: bool = False):
+    """Cập nhật ChromeDriver lên version mới nhất (dùng lại đường dẫn đã cache nếu có)"""
+    global _driver_path
+    if _driver_path and not force and os.path.exists(_driver_path):
+        return _driver_path
     try:
         logger.info("Đang kiểm tra và cập nhật ChromeDriver...")
         driver_path = ChromeDriverManager().install()
         logger.info(f"ChromeDriver đã được cập nhật: {driver_path}")
+        _driver_path = driver_path
         return driver_path
     except Exception as e:
         logger.error(f"Lỗi khi cập nhật ChromeDriver: {e}")
@@ -56,29 +62,15 @@ def kill_chrome_processes():
         logger.warning(f"Không thể đóng Chrome processes: {e}")
 
 def extract_info_by_key(data):
-    """Trích xuất thông tin từ dữ liệu giao dịch"""
-    result = {}
-    for key, value in data.items():
-        key_lower = key.lower()
-        # Map các trường dữ liệu
-        if re.search(r'fiat amount', key_lower):
-            result['Fiat amount'] = value
-        elif re.search(r'reference message', key_lower):
-            result['Reference message'] = value
-        elif re.search(r'^name$|full name', key_lower):
-            result['Full Name'] = value
-        elif re.search(r'bank card|account number', key_lower):
-            result['Bank Card'] = value
-        elif re.search(r'bank name', key_lower):
-            result['Bank Name'] = value
-    return result
+    """Trích xuất thông tin từ dữ liệu giao dịch (ánh xạ nhãn qua bảng trong field_mapping)"""
+    return default_mapper.map_fields(data)
 
-def create_options_new_chrome(headless: bool = True) -> Options:
+def create_options_new_chrome(headless: bool = True, profile_path: Path = None) -> Options:
     """Tạo Chrome options cho Chrome instance mới (không remote debugging)"""
     chrome_options = Options()
     
     # Các tùy chọn cơ bản và bảo mật
-    chrome_options.add_argument(f'user-data-dir={str(PROFILE_PATH)}')
+    chrome_options.add_argument(f'user-data-dir={str(profile_path or PROFILE_PATH)}')
     chrome_options.add_argument('--disable-extensions')
     chrome_options.add_argument('--disable-dev-shm-usage')
     chrome_options.add_argument('--no-sandbox')
@@ -122,7 +114,7 @@ def create_options_new_chrome(headless: bool = True) -> Options:
     
     return chrome_options
 
-def create_options(headless: bool = True, port: int = 9222) -> Options:
+def create_options(headless: bool = True, port: int = 9222, profile_path: Path = None) -> Options:
     """Tạo Chrome options với các cài đặt an toàn"""
     chrome_options = Options()
     
@@ -130,7 +122,7 @@ def create_options(headless: bool = True, port: int = 9222) -> Options:
     chrome_options.debugger_address = f"127.0.0.1:{port}"
     
     # Các tùy chọn cơ bản và bảo mật
-    chrome_options.add_argument(f'user-data-dir={str(PROFILE_PATH)}')
+    chrome_options.add_argument(f'user-data-dir={str(profile_path or PROFILE_PATH)}')
     chrome_options.add_argument('--disable-extensions')
     chrome_options.add_argument('--disable-dev-shm-usage')
     chrome_options.add_argument('--no-sandbox')
@@ -172,7 +164,8 @@ def create_options(headless: bool = True, port: int = 9222) -> Options:
     
     return chrome_options
 
-def create_driver(headless: bool = True, use_existing_chrome: bool = True) -> webdriver.Chrome:
+def create_driver(headless: bool = True, use_existing_chrome: bool = True, port: int = 9222,
+                  profile_path: Path = None) -> webdriver.Chrome:
     """Tạo Chrome driver với các cài đặt an toàn"""
     max_retries = 3
     for attempt in range(max_retries):
@@ -181,13 +174,13 @@ def create_driver(headless: bool = True, use_existing_chrome: bool = True) -> we
             
             if use_existing_chrome:
                 # Kết nối đến Chrome đã mở sẵn
-                options = create_options(headless=headless)
+                options = create_options(headless=headless, port=port, profile_path=profile_path)
             else:
                 # Tạo Chrome mới
-                options = create_options_new_chrome(headless=headless)
+                options = create_options_new_chrome(headless=headless, profile_path=profile_path)
             
-            # Cập nhật ChromeDriver lên version mới nhất
-            driver_path = update_chromedriver()
+            # Cập nhật ChromeDriver lên version mới nhất (lần retry thì bắt buộc tải lại)
+            driver_path = update_chromedriver(force=attempt > 0)
             
             driver = webdriver.Chrome(
                 options=options,
@@ -214,7 +207,51 @@ def create_driver(headless: bool = True, use_existing_chrome: bool = True) -> we
                 logger.error("Đã thử tối đa số lần, không thể tạo driver")
                 raise
 
-def extract_order_info(order_no: str) -> dict:
+def get_driver_supervisor(port: int = 9222) -> DriverSupervisor:
+    """Lấy supervisor dùng chung cho driver gắn vào Chrome remote debugging"""
+    global _driver_supervisor
+    if _driver_supervisor is None:
+        _driver_supervisor = DriverSupervisor(
+            lambda: create_driver(False, use_existing_chrome=True, port=port),
+            port=port,
+        )
+    return _driver_supervisor
+
+def start_driver_supervisor(port: int = 9222) -> DriverSupervisor:
+    """Khởi động giám sát driver ở nền để order tiếp theo luôn có driver sống"""
+    supervisor = get_driver_supervisor(port)
+    supervisor.start()
+    return supervisor
+
+def extract_order_info(order_no: str, supervisor: DriverSupervisor = None, on_html=None) -> dict:
+    """
+    Trích xuất thông tin order bằng driver do supervisor quản lý
+    Args:
+        order_no: Số order
+        supervisor: DriverSupervisor cung cấp driver (mặc định: supervisor dùng chung)
+        on_html: Callback nhận HTML trang order (để lưu cache/replay)
+    """
+    supervisor = supervisor or get_driver_supervisor()
+    bank_info = {}
+    try:
+        logger.info(f"🚀 Bắt đầu trích xuất thông tin cho order: {order_no}")
+        with supervisor.lease() as driver:
+            bank_info = _scrape_order_page(driver, order_no, on_html)
+    except TimeoutException:
+        # Trang không load được: kết nối lại driver ở nền cho order sau
+        supervisor.mark_dead(f"timeout khi load order {order_no}")
+    except Exception as e:
+        logger.error(f"💥 Lỗi khi trích xuất dữ liệu cho order {order_no}: {str(e)}", exc_info=True)
+        # Driver lỗi: supervisor sẽ kết nối lại ở nền thay vì order sau phải tự tạo
+        supervisor.mark_dead(str(e))
+    return bank_info
+
+def parse_order_html(html: str):
+    """
+    Parse HTML trang chi tiết order (dùng được cả với HTML đã lưu để replay offline)
+    Returns:
+        tuple: (bank_info, số field tìm thấy)
+    """
     def parse_currency(vnd_str):
         try:
             return float(vnd_str.replace("₫", "").replace(",", "").strip())
@@ -222,124 +259,109 @@ def extract_order_info(order_no: str) -> dict:
             logger.error(f"[LỖI] parse_currency: {e}")
             return None
 
-    global _cached_driver
     bank_info = {}
     label,value = None, None
-    try:
-        logger.info(f"🚀 Bắt đầu trích xuất thông tin cho order: {order_no}")
-        
-        # Sử dụng cached driver nếu có, nếu không thì tạo mới
-        if _cached_driver is None:
-            logger.info("Tạo driver mới...")
-            _cached_driver = create_driver(False, use_existing_chrome=True)
-        else:
-            logger.info("Sử dụng cached driver...")
-        
-        driver = _cached_driver
-        
-        # Lưu lại handle tab gốc
-        original_tab = driver.current_window_handle
-        # Mở tab mới trong Chrome hiện tại
-        driver.execute_script("window.open('');")
-        tabs = driver.window_handles
-        new_tab = tabs[-1]
-        driver.switch_to.window(new_tab)
-        
-        url = f"https://p2p.binance.com/en/fiatOrderDetail?orderNo={order_no}"
-        logger.info(f"🌐 Đang truy cập URL: {url}")
-        driver.get(url)
-        
-        # Giảm thời gian chờ xuống 0.5 giây cho realtime tracking
-        time.sleep(0.5)
-        
-        logger.info("⏳ Đang chờ trang load...")
-        # Tối ưu cho realtime: 6 giây cho lần đầu, 3 giây cho lần retry
-        try:
-            WebDriverWait(driver, 6).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, 'div.subtitle6.text-textBuy'))
-                    )
-            logger.info("✅ Trang đã load thành công (lần 1)")
-        except TimeoutException:
-            # Fallback: thử lại với timeout 3 giây
-            logger.info("⚠️ Timeout lần 1, thử lại với 3 giây...")
-            try:
-                WebDriverWait(driver, 3).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, 'div.subtitle6.text-textBuy'))
-                        )
-                logger.info("✅ Trang đã load thành công (lần 2)")
-            except TimeoutException:
-                logger.error("❌ Không thể load trang sau 3 lần thử")
-                # Reset cached driver nếu có lỗi nghiêm trọng
-                _cached_driver = None
-                return bank_info
-        
-        # Giảm xuống 0.2 giây cho realtime
-        time.sleep(1)
-        
-        soup = BeautifulSoup(driver.page_source, "html.parser")
-        logger.info("📄 Đã parse HTML thành công")
-        
-        # Tìm fiat amount
-        fiat_block = soup.select_one("div.subtitle6.text-textBuy")
-        if fiat_block:
-            fiat_amount = fiat_block.get_text(strip=True)
-            bank_info["Fiat amount"] = parse_currency(fiat_amount)
-            logger.info(f"💰 Tìm thấy Fiat Amount: {fiat_amount} -> {bank_info['Fiat amount']}")
-        else:
-            logger.warning("⚠️ Không tìm thấy Fiat Amount block")
+    soup = BeautifulSoup(html, "html.parser")
+    logger.info("📄 Đã parse HTML thành công")
+    
+    # Tìm fiat amount
+    fiat_block = soup.select_one("div.subtitle6.text-textBuy")
+    if fiat_block:
+        fiat_amount = fiat_block.get_text(strip=True)
+        bank_info["Fiat amount"] = parse_currency(fiat_amount)
+        logger.info(f"💰 Tìm thấy Fiat Amount: {fiat_amount} -> {bank_info['Fiat amount']}")
+    else:
+        logger.warning("⚠️ Không tìm thấy Fiat Amount block")
 
-          # Tìm các thông tin khác
-        sections = soup.find('div',class_='relative w-full')
-        if not sections:
-            logger.warning("⚠️ Không tìm thấy section chính")
-            return bank_info
-            
-        label_tag,value_tag = None, None
-        found_fields = 0
+      # Tìm các thông tin khác
+    sections = soup.find('div',class_='relative w-full')
+    if not sections:
+        logger.warning("⚠️ Không tìm thấy section chính")
+        return bank_info, 0
         
-        for section in sections:
-            all_divs = section.find_all("div")  
-            for div in all_divs:
-                if div.get("class") and "body2" in div.get("class") and "text-tertiaryText" in div.get("class"):
-                    label_tag = div
-                if div.get("class") and "body2" in div.get("class") and "text-right" in div.get("class") and "break-words" in div.get("class"):
-                    value_tag = div
+    label_tag,value_tag = None, None
+    found_fields = 0
+    
+    for section in sections:
+        all_divs = section.find_all("div")  
+        for div in all_divs:
+            if div.get("class") and "body2" in div.get("class") and "text-tertiaryText" in div.get("class"):
+                label_tag = div
+            if div.get("class") and "body2" in div.get("class") and "text-right" in div.get("class") and "break-words" in div.get("class"):
+                value_tag = div
 
-                if label_tag and value_tag:
-                    label = label_tag.text.strip()
-                    value = value_tag.text.strip()
-                    bank_info[label] = value
-                    found_fields += 1
-                    logger.info(f"📋 Tìm thấy field: {label} = {value}")
-                    label,value = None, None
+            if label_tag and value_tag:
+                label = label_tag.text.strip()
+                value = value_tag.text.strip()
+                bank_info[label] = value
+                found_fields += 1
+                logger.info(f"📋 Tìm thấy field: {label} = {value}")
+                label,value = None, None
 
-        logger.info(f"📊 Tổng số fields tìm thấy: {found_fields}")
-        logger.info(f"🎯 Thông tin cuối cùng: {bank_info}")
-        
-        # Đảm bảo mọi thao tác đã hoàn tất trước khi đóng tab
-        time.sleep(1)  # Đảm bảo mọi thao tác đã xong
-        # Chỉ đóng tab nếu đã lấy được ít nhất 1 trường dữ liệu
-        if found_fields > 0 or bank_info.get("Fiat amount") is not None:
-            # Chỉ đóng tab nếu đang ở tab mới script mở ra
-            if driver.current_window_handle == new_tab:
-                driver.close()
-                # Chuyển về tab gốc
-                driver.switch_to.window(original_tab)
-            logger.info("✅ Hoàn thành trích xuất thông tin và đã đóng tab (nếu cần)")
-        else:
-            logger.warning("⚠️ Không đóng tab vì chưa lấy được dữ liệu")
-        
-    except Exception as e:
-        logger.error(f"💥 Lỗi khi trích xuất dữ liệu cho order {order_no}: {str(e)}", exc_info=True)
-        # Reset cached driver nếu có lỗi
-        _cached_driver = None
+    logger.info(f"📊 Tổng số fields tìm thấy: {found_fields}")
+    logger.info(f"🎯 Thông tin cuối cùng: {bank_info}")
+    return bank_info, found_fields
 
-    finally:
-        # Không đóng driver để giữ Chrome mở
-        pass
+def _scrape_order_page(driver, order_no: str, on_html=None) -> dict:
+    """Mở trang chi tiết order trong tab mới và parse thông tin người bán"""
+    # Lưu lại handle tab gốc
+    original_tab = driver.current_window_handle
+    # Mở tab mới bằng lệnh WebDriver: trả về đúng handle của tab vừa tạo. Không dùng
+    # window_handles[-1] vì nhiều session (concurrency > 1) dùng chung danh sách tab của Chrome,
+    # session khác có thể vừa mở tab của order khác.
+    driver.switch_to.new_window('tab')
+    new_tab = driver.current_window_handle
+    
+    url = f"https://p2p.binance.com/en/fiatOrderDetail?orderNo={order_no}"
+    logger.info(f"🌐 Đang truy cập URL: {url}")
+    driver.get(url)
+    
+    # Giảm thời gian chờ xuống 0.5 giây cho realtime tracking
+    time.sleep(0.5)
+    
+    logger.info("⏳ Đang chờ trang load...")
+    # Tối ưu cho realtime: 6 giây cho lần đầu, 3 giây cho lần retry
+    try:
+        WebDriverWait(driver, 6).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, 'div.subtitle6.text-textBuy'))
+                )
+        logger.info("✅ Trang đã load thành công (lần 1)")
+    except TimeoutException:
+        # Fallback: thử lại với timeout 3 giây
+        logger.info("⚠️ Timeout lần 1, thử lại với 3 giây...")
+        try:
+            WebDriverWait(driver, 3).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, 'div.subtitle6.text-textBuy'))
+                    )
+            logger.info("✅ Trang đã load thành công (lần 2)")
+        except TimeoutException:
+            logger.error("❌ Không thể load trang sau 3 lần thử")
+            raise
+    
+    # Giảm xuống 0.2 giây cho realtime
+    time.sleep(1)
+    
+    html = driver.page_source
+    if on_html is not None:
+        on_html(html)
+    bank_info, found_fields = parse_order_html(html)
+    
+    # Đảm bảo mọi thao tác đã hoàn tất trước khi đóng tab
+    time.sleep(1)  # Đảm bảo mọi thao tác đã xong
+    # Chỉ đóng tab nếu đã lấy được ít nhất 1 trường dữ liệu
+    if found_fields > 0 or bank_info.get("Fiat amount") is not None:
+        # Chỉ đóng tab nếu đang ở tab mới script mở ra
+        if driver.current_window_handle == new_tab:
+            driver.close()
+            # Chuyển về tab gốc
+            driver.switch_to.window(original_tab)
+        logger.info("✅ Hoàn thành trích xuất thông tin và đã đóng tab (nếu cần)")
+    else:
+        logger.warning("⚠️ Không đóng tab vì chưa lấy được dữ liệu")
+    # Không đóng driver để giữ Chrome mở
     return bank_info
 
-def launch_chrome_remote_debugging(port: int = 9222) -> None:
+def launch_chrome_remote_debugging(port: int = 9222, profile_path: Path = None) -> None:
     """Khởi chạy Chrome với chế độ remote debugging"""
     chrome_path = Path(CHROME_PATH)
     if not chrome_path.exists():
@@ -349,7 +371,7 @@ def launch_chrome_remote_debugging(port: int = 9222) -> None:
     command = [
         str(chrome_path),
         f"--remote-debugging-port={port}",
-        f'--user-data-dir={str(PROFILE_PATH)}',
+        f'--user-data-dir={str(profile_path or PROFILE_PATH)}',
         "--no-first-run",
         "--no-default-browser-check",
         "--new-window",
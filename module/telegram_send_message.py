@@ -4,13 +4,21 @@ sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 import requests
 import logging
 from config_env import TELEGRAM_TOKEN, TELEGRAM_CHAT_ID, TELEGRAM_URL
+from module import json_codec
 logger = logging.getLogger(__name__)
 
+# (connect timeout, read timeout) cho mọi request tới Telegram
+DEFAULT_TIMEOUT = (5, 15)
+
+
 class TelegramBot:
-    def __init__(self, token):
+    def __init__(self, token, chat_id=None, base_url=None, timeout=DEFAULT_TIMEOUT):
         self.token = TELEGRAM_TOKEN if token is None else token
-        self.chat_id = TELEGRAM_CHAT_ID
-        self.base_url = f"{TELEGRAM_URL}/bot{self.token}"
+        self.chat_id = TELEGRAM_CHAT_ID if chat_id is None else chat_id
+        self.base_url = f"{base_url or TELEGRAM_URL or 'https://api.telegram.org'}/bot{self.token}"
+        self.timeout = timeout
+        # Session giữ kết nối keep-alive tới Telegram giữa các lần gửi
+        self.session = requests.Session()
 
     def send_message(self, text, parse_mode="html", disable_web_page_preview=True):
         url = f"{self.base_url}/sendMessage"
@@ -21,13 +29,17 @@ class TelegramBot:
             "disable_web_page_preview": disable_web_page_preview
         }
         try:
-            print(url, data)
-            response = requests.post(url, data=data)
-            result = response.json()
+            response = self.session.post(url, data=data, timeout=self.timeout)
+            result = json_codec.decode_response(response, schema=dict)
+            result["status"] = response.status_code
+            # Telegram trả về thời gian chờ trong parameters.retry_after khi bị 429
+            retry_after = (result.get("parameters") or {}).get("retry_after")
+            if retry_after is not None:
+                result["retry_after"] = float(retry_after)
             logger.debug(f"SendMessage Result: {result}")
         except Exception as e:
             logger.exception(f"Exception while sending message: {e}")
-            return {"ok": False, "error": str(e)}
+            return {"ok": False, "status": None, "error": str(e)}
 
         if result.get("ok"):
             message_id = result.get("result", {}).get("message_id", "unknown")
@@ -48,12 +60,17 @@ class TelegramBot:
             "photo": ("image.png", photo_data)
         }
         try:
-            response = requests.post(url, data=data, files=files)
-            result = response.json()
+            response = self.session.post(url, data=data, files=files, timeout=self.timeout)
+            result = json_codec.decode_response(response, schema=dict)
+            result["status"] = response.status_code
+            # Telegram trả về thời gian chờ trong parameters.retry_after khi bị 429
+            retry_after = (result.get("parameters") or {}).get("retry_after")
+            if retry_after is not None:
+                result["retry_after"] = float(retry_after)
             logger.debug(f"SendPhoto Result: {result}")
         except Exception as e:
             logger.exception(f"Exception while sending photo: {e}")
-            return {"ok": False, "error": str(e)}
+            return {"ok": False, "status": None, "error": str(e)}
 
         if result.get("ok"):
             message_id = result.get("result", {}).get("message_id", "unknown")
@@ -0,0 +1,222 @@
+"""
+Module lưu trữ dạng cột cho các ngày giao dịch đã đóng.
+Mục đích: File JSON của ngày đã qua được chuyển sang mảng NumPy theo cột (đọc bằng mmap),
+để truy vấn lịch sử chỉ đọc các cột cần lọc rồi giải mã đúng những giao dịch khớp, thay vì
+parse lại toàn bộ JSON định dạng đẹp của từng ngày.
+
+Cấu trúc thư mục của một ngày (archive/<YYYY-MM-DD>/):
+    timestamp.npy      float64
+    amount.npy         float64 (NaN nếu không có/không đọc được)
+    type.npy           int32, mã trỏ vào strings.json["type"] (giá trị viết thường)
+    order_status.npy   int32, mã trỏ vào strings.json["order_status"]
+    records.bin        JSON gọn của từng giao dịch, nối liền nhau
+    offsets.npy        int64 (số dòng + 1), vị trí bắt đầu từng bản ghi trong records.bin
+    strings.json       bảng chuỗi của các cột mã hóa
+    meta.json          {"rows", "version"}; ghi sau cùng, có meta nghĩa là ngày đã đầy đủ
+
+Khôi phục về file JSON:
+    python -m module.transaction_archive [thư mục giao dịch] --restore YYYY-MM-DD|all
+"""
+
+import logging
+import mmap
+import os
+import shutil
+import threading
+from datetime import date as date_type, datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from module import json_codec
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+CODED_COLUMNS = ("type", "order_status")
+
+
+def _amount(transaction: dict) -> float:
+    try:
+        return float(transaction.get('amount'))
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def _coded_value(name: str, transaction: dict) -> str:
+    value = transaction.get(name) or ""
+    return value.lower() if name == "type" else value
+
+
+class ArchivedDay:
+    """Một ngày đã lưu trữ; các cột được mmap khi dùng tới lần đầu"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.meta = json_codec.load_file(path / "meta.json", schema=dict)
+        self.strings: Dict[str, List[str]] = json_codec.load_file(path / "strings.json", schema=dict)
+        self.rows = self.meta["rows"]
+        self._columns = {}
+
+    def column(self, name: str) -> np.ndarray:
+        array = self._columns.get(name)
+        if array is None:
+            array = self._columns[name] = np.load(self.path / f"{name}.npy", mmap_mode='r')
+        return array
+
+    def _code_of(self, name: str, value: str) -> int:
+        try:
+            return self.strings[name].index(value)
+        except ValueError:
+            return -1
+
+    def mask(self, trade_type: str = None, order_status: str = None,
+             min_amount: float = None, max_amount: float = None) -> np.ndarray:
+        """Mảng bool các dòng khớp bộ lọc (chỉ đọc các cột được lọc)"""
+        mask = np.ones(self.rows, dtype=bool)
+        if trade_type:
+            mask &= self.column("type") == self._code_of("type", trade_type.lower())
+        if order_status:
+            mask &= self.column("order_status") == self._code_of("order_status", order_status)
+        if min_amount is not None:
+            mask &= self.column("amount") >= min_amount  # NaN luôn bị loại
+        if max_amount is not None:
+            mask &= self.column("amount") <= max_amount
+        return mask
+
+    def select(self, trade_type: str = None, order_status: str = None,
+               min_amount: float = None, max_amount: float = None) -> List[dict]:
+        """Giao dịch khớp bộ lọc, theo thứ tự dòng"""
+        return self.records(np.flatnonzero(self.mask(trade_type, order_status, min_amount, max_amount)))
+
+    def records(self, rows=None) -> List[dict]:
+        """Giải mã giao dịch ở các dòng `rows` (None = tất cả), theo thứ tự dòng"""
+        offsets = self.column("offsets")
+        rows = range(self.rows) if rows is None else rows
+        if not self.rows:
+            return []
+        with open(self.path / "records.bin", 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return [json_codec.loads(data[offsets[row]:offsets[row + 1]]) for row in rows]
+
+
+class TransactionArchive:
+    def __init__(self, root):
+        """
+        Args:
+            root: Thư mục chứa các ngày đã lưu trữ
+        """
+        self.root = Path(root)
+        self._lock = threading.Lock()
+        self._open: Dict[str, tuple] = {}  # ngày -> (mtime_ns của meta, ArchivedDay)
+
+    def day_path(self, day: date_type) -> Path:
+        return self.root / day.strftime("%Y-%m-%d")
+
+    def stamp(self, day: date_type) -> Optional[int]:
+        """mtime_ns của meta.json của ngày (None nếu ngày chưa được lưu trữ)"""
+        try:
+            return (self.day_path(day) / "meta.json").stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def days(self) -> List[date_type]:
+        """Các ngày đã lưu trữ (tăng dần)"""
+        result = []
+        if not self.root.exists():
+            return result
+        for path in self.root.iterdir():
+            if not (path / "meta.json").exists():
+                continue
+            try:
+                result.append(datetime.strptime(path.name, "%Y-%m-%d").date())
+            except ValueError:
+                continue
+        return sorted(result)
+
+    def open(self, day: date_type) -> Optional[ArchivedDay]:
+        """ArchivedDay của ngày (None nếu chưa lưu trữ); dùng lại bản đã mở nếu không đổi"""
+        stamp = self.stamp(day)
+        if stamp is None:
+            return None
+        key = day.strftime("%Y-%m-%d")
+        with self._lock:
+            cached = self._open.get(key)
+            if cached is not None and cached[0] == stamp:
+                return cached[1]
+        archived = ArchivedDay(self.day_path(day))
+        with self._lock:
+            self._open[key] = (stamp, archived)
+        return archived
+
+    def load(self, day: date_type) -> list:
+        """Toàn bộ giao dịch của ngày đã lưu trữ ([] nếu chưa lưu trữ)"""
+        archived = self.open(day)
+        return archived.records() if archived is not None else []
+
+    def write_day(self, day: date_type, transactions: list) -> int:
+        """Lưu trữ giao dịch của một ngày (ghi đè bản cũ nếu có); trả về số dòng"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        target = self.day_path(day)
+        tmp = target.with_name(f"{target.name}.{threading.get_ident()}.tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir()
+
+        strings = {name: [] for name in CODED_COLUMNS}
+        codes = {name: {} for name in CODED_COLUMNS}
+        columns = {name: np.empty(len(transactions), dtype=np.int32) for name in CODED_COLUMNS}
+        offsets = np.zeros(len(transactions) + 1, dtype=np.int64)
+        with open(tmp / "records.bin", 'wb') as f:
+            for row, transaction in enumerate(transactions):
+                for name in CODED_COLUMNS:
+                    value = _coded_value(name, transaction)
+                    code = codes[name].get(value)
+                    if code is None:
+                        code = codes[name][value] = len(strings[name])
+                        strings[name].append(value)
+                    columns[name][row] = code
+                data = json_codec.dumps(transaction)
+                f.write(data)
+                offsets[row + 1] = offsets[row] + len(data)
+        np.save(tmp / "timestamp.npy",
+                np.array([float(t.get('timestamp', 0) or 0) for t in transactions], dtype=np.float64))
+        np.save(tmp / "amount.npy", np.array([_amount(t) for t in transactions], dtype=np.float64))
+        for name, array in columns.items():
+            np.save(tmp / f"{name}.npy", array)
+        np.save(tmp / "offsets.npy", offsets)
+        json_codec.dump_file(strings, tmp / "strings.json")
+        json_codec.dump_file({"rows": len(transactions), "version": FORMAT_VERSION}, tmp / "meta.json")
+
+        # Thay thư mục cũ (nếu có) bằng thư mục mới; bỏ bản đã mở để đóng các file đang mmap
+        with self._lock:
+            self._open.pop(target.name, None)
+        old = None
+        if target.exists():
+            old = target.with_name(f"{target.name}.{threading.get_ident()}.old")
+            shutil.rmtree(old, ignore_errors=True)
+            os.replace(target, old)
+        os.replace(tmp, target)
+        if old is not None:
+            shutil.rmtree(old, ignore_errors=True)
+        return len(transactions)
+
+    def remove_day(self, day: date_type):
+        shutil.rmtree(self.day_path(day), ignore_errors=True)
+        with self._lock:
+            self._open.pop(day.strftime("%Y-%m-%d"), None)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from module.transaction_storage import TransactionStorage
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Khôi phục ngày đã lưu trữ về file JSON")
+    parser.add_argument("directory", nargs="?", default="transactions")
+    parser.add_argument("--restore", required=True, metavar="YYYY-MM-DD|all")
+    args = parser.parse_args()
+    storage = TransactionStorage(args.directory)
+    days = None if args.restore == "all" else [datetime.strptime(args.restore, "%Y-%m-%d").date()]
+    print(f"Đã khôi phục {storage.restore_archived_days(days)} giao dịch về JSON")
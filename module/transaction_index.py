@@ -0,0 +1,89 @@
+"""
+Module chỉ mục tìm kiếm giao dịch trong bộ nhớ.
+Mục đích: Dựng một lần cho mỗi lần đọc file ngày, sau đó lọc theo đuôi số order,
+loại và trạng thái bằng phép AND trên bitmap (int) thay vì duyệt cả danh sách;
+thứ tự thời gian đã sắp sẵn nên phân trang chỉ là lấy các bit trong khoảng.
+"""
+
+from collections import defaultdict
+from typing import Dict, List
+
+
+def _popcount(mask: int) -> int:
+    return bin(mask).count("1")
+
+
+class TransactionIndex:
+    def __init__(self, transactions):
+        """
+        Args:
+            transactions: Danh sách giao dịch (dict) của một ngày
+        Vị trí i trong mọi bitmap = giao dịch thứ i theo thời gian mới nhất trước.
+        """
+        self.order: List[dict] = sorted(transactions, key=lambda x: x.get('timestamp', 0), reverse=True)
+        self.all = (1 << len(self.order)) - 1
+
+        # Đuôi số order -> danh sách vị trí (tăng dần), tương đương trie trên số order đảo ngược;
+        # bitmap của từng đuôi chỉ dựng khi được tra lần đầu
+        self._suffixes: Dict[str, List[int]] = defaultdict(list)
+        types: Dict[str, int] = defaultdict(int)
+        statuses: Dict[str, int] = defaultdict(int)
+        for pos, trans in enumerate(self.order):
+            bit = 1 << pos
+            types[(trans.get('type') or '').lower()] |= bit
+            statuses[trans.get('order_status', '')] |= bit
+            number = str(trans.get('order_number', ''))
+            for i in range(len(number)):
+                self._suffixes[number[i:]].append(pos)
+        self._types = dict(types)
+        self._statuses = dict(statuses)
+        self._suffix_masks: Dict[str, int] = {}
+
+    def __len__(self):
+        return len(self.order)
+
+    def _suffix_mask(self, suffix: str) -> int:
+        mask = self._suffix_masks.get(suffix)
+        if mask is None:
+            mask = 0
+            for pos in self._suffixes.get(suffix, ()):
+                mask |= 1 << pos
+            self._suffix_masks[suffix] = mask
+        return mask
+
+    def query(self, order_suffix: str = "", trade_type: str = None, order_status: str = None) -> int:
+        """
+        Bitmap các giao dịch khớp mọi điều kiện (bỏ trống = không lọc)
+        Args:
+            order_suffix: Đuôi số order
+            trade_type: 'buy'/'sell'
+            order_status: Trạng thái order (so khớp chính xác)
+        """
+        mask = self.all
+        if order_suffix:
+            mask &= self._suffix_mask(order_suffix)
+        if trade_type:
+            mask &= self._types.get(trade_type.lower(), 0)
+        if order_status:
+            mask &= self._statuses.get(order_status, 0)
+        return mask
+
+    def count(self, mask: int) -> int:
+        return _popcount(mask)
+
+    def page(self, mask: int, page: int, rows_per_page: int) -> List[dict]:
+        """Các giao dịch của trang `page` trong bitmap, theo thứ tự mới nhất trước"""
+        start = page * rows_per_page
+        if mask == self.all:
+            return self.order[start:start + rows_per_page]
+        # Bỏ qua `start` bit thấp nhất rồi lấy tối đa rows_per_page bit tiếp theo
+        result = []
+        skipped = 0
+        while mask and len(result) < rows_per_page:
+            low = mask & -mask
+            if skipped < start:
+                skipped += 1
+            else:
+                result.append(self.order[low.bit_length() - 1])
+            mask ^= low
+        return result
@@ -0,0 +1,150 @@
+"""
+Module tổng hợp giao dịch theo giờ (rollup).
+Mục đích: Giữ sẵn số lượng, khối lượng fiat và khối lượng crypto theo (ngày, giờ, loại, trạng thái),
+được cập nhật tăng dần mỗi khi TransactionStorage ghi giao dịch hoặc đổi trạng thái, để thống kê
+chỉ cần đọc bảng tổng hợp thay vì duyệt lại toàn bộ giao dịch.
+
+File rollups.json:
+    {"YYYY-MM-DD": {"HH|loại|trạng thái": [số lượng, khối lượng fiat, khối lượng crypto]}}
+
+Dựng lại từ lịch sử:
+    python -m module.transaction_rollup [thư mục giao dịch]
+"""
+
+import logging
+import os
+import threading
+from datetime import date as date_type, datetime
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+from module import json_codec
+
+logger = logging.getLogger(__name__)
+
+
+def _number(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def bucket_of(transaction: dict) -> tuple:
+    """(ngày, khóa "HH|loại|trạng thái") của giao dịch"""
+    moment = datetime.fromtimestamp(transaction.get('timestamp', 0) or 0)
+    side = (transaction.get('type') or '').lower()
+    status = transaction.get('order_status') or 'UNKNOWN'
+    return moment.strftime("%Y-%m-%d"), f"{moment.hour:02d}|{side}|{status}"
+
+
+class TransactionRollup:
+    def __init__(self, path):
+        """
+        Args:
+            path: File JSON lưu bảng tổng hợp
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._data: Dict[str, Dict[str, list]] = {}
+        self._stat = None
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def _file_stat(self):
+        try:
+            st = self.path.stat()
+            return st.st_mtime_ns, st.st_size
+        except FileNotFoundError:
+            return None
+
+    def _refresh(self):
+        # Process khác có thể đã cập nhật file: chỉ đọc lại khi mtime/size đổi
+        stat = self._file_stat()
+        if stat == self._stat:
+            return
+        data = {}
+        if stat is not None:
+            data = json_codec.load_file(self.path, schema=dict)
+        self._data, self._stat = data, stat
+
+    def _save(self):
+        tmp = self.path.with_name(f"{self.path.name}.{threading.get_ident()}.tmp")
+        json_codec.dump_file(self._data, tmp)
+        os.replace(tmp, self.path)
+        self._stat = self._file_stat()
+
+    def _add(self, transaction: dict, sign: int):
+        day, key = bucket_of(transaction)
+        buckets = self._data.setdefault(day, {})
+        count, fiat, crypto = buckets.get(key, [0, 0.0, 0.0])
+        count += sign
+        if count <= 0:
+            buckets.pop(key, None)
+            if not buckets:
+                self._data.pop(day, None)
+            return
+        buckets[key] = [count,
+                        fiat + sign * _number(transaction.get('amount')),
+                        crypto + sign * _number(transaction.get('crypto_amount'))]
+
+    def apply(self, removed: Iterable[dict] = (), added: Iterable[dict] = ()):
+        """Trừ các bản ghi cũ, cộng các bản ghi mới rồi lưu (gọi trong khóa ghi của storage)"""
+        with self._lock:
+            self._refresh()
+            for transaction in removed:
+                self._add(transaction, -1)
+            for transaction in added:
+                self._add(transaction, 1)
+            self._save()
+
+    def replace(self, transactions: Iterable[dict]):
+        """Tính lại toàn bộ bảng tổng hợp từ danh sách giao dịch"""
+        with self._lock:
+            self._data = {}
+            for transaction in transactions:
+                self._add(transaction, 1)
+            self._save()
+
+    def rows(self, start_date: date_type, end_date: date_type = None, by_hour: bool = False) -> List[dict]:
+        """
+        Các dòng tổng hợp từ start_date đến end_date (tính cả hai ngày)
+        Args:
+            by_hour: True = một dòng cho mỗi giờ, False = gộp theo ngày
+        Returns:
+            list: dict gồm day, (hour), side, status, count, fiat_volume, crypto_volume
+        """
+        start = start_date.strftime("%Y-%m-%d")
+        end = (end_date or start_date).strftime("%Y-%m-%d")
+        with self._lock:
+            self._refresh()
+            days = {day: dict(buckets) for day, buckets in self._data.items() if start <= day <= end}
+        result = {}
+        for day, buckets in days.items():
+            for key, (count, fiat, crypto) in buckets.items():
+                hour, side, status = key.split("|", 2)
+                group = (day, int(hour), side, status) if by_hour else (day, side, status)
+                total = result.setdefault(group, [0, 0.0, 0.0])
+                total[0] += count
+                total[1] += fiat
+                total[2] += crypto
+        rows = []
+        for group, (count, fiat, crypto) in sorted(result.items()):
+            row = {"day": group[0]}
+            if by_hour:
+                row["hour"] = group[1]
+            row.update(side=group[-2], status=group[-1], count=count,
+                       fiat_volume=fiat, crypto_volume=crypto)
+            rows.append(row)
+        return rows
+
+
+if __name__ == "__main__":
+    import sys
+
+    from module.transaction_storage import TransactionStorage
+
+    logging.basicConfig(level=logging.INFO)
+    storage = TransactionStorage(sys.argv[1] if len(sys.argv) > 1 else "transactions")
+    print(f"Đã dựng lại rollup từ {storage.rebuild_rollups()} giao dịch")
@@ -1,56 +1,480 @@
 import os
-import json
+import heapq
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from io import BytesIO
 import logging
 from typing import Optional, Dict, Any
 from pathlib import Path
+import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from module import json_codec
+from module.models import Transaction
+from module.qr_asset_store import QrAssetStore
+from module.transaction_archive import TransactionArchive
+from module.transaction_rollup import TransactionRollup
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
 
 logger = logging.getLogger(__name__)
 
+
+def _day_of_file(date_file: Path):
+    """Ngày của file transactions_YYYY-MM-DD.json (None nếu tên không đúng định dạng)"""
+    try:
+        return datetime.strptime(date_file.stem[len("transactions_"):], "%Y-%m-%d").date()
+    except ValueError:
+        return None
+
+
+def _fsync_directory(directory: Path):
+    """fsync entry của thư mục (tạo/rename file); Windows không fsync được thư mục"""
+    if os.name == "nt":
+        return
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    except OSError as e:
+        logger.warning(f"⚠️ Không fsync được thư mục {directory}: {e}")
+
+
+class _CommitBatch:
+    """Các lần ghi được commit chung một lần fsync"""
+    __slots__ = ("files", "rollup", "done", "error")
+
+    def __init__(self):
+        self.files: Dict[Path, Path] = {}  # file ngày -> file tạm
+        self.rollup: Dict[Path, list] = {}  # file ngày -> [(bản ghi bị thay, bản ghi mới)]
+        self.done = threading.Event()
+        self.error: Optional[OSError] = None
+
+
+class _StorageEngine:
+    """
+    Điều phối ghi/đọc cho một thư mục lưu trữ, dùng chung bởi mọi TransactionStorage cùng
+    thư mục trong process (màn hình, TransactionViewer, P2PBinance).
+    - Một writer tại một thời điểm: RLock trong process + khóa file .storage.lock giữa các process.
+    - Reader dùng snapshot đã parse của file ngày, chỉ parse lại khi mtime/size thay đổi.
+    - Ngày đã đóng có thể nằm trong archive/ (dạng cột) thay cho file JSON; file JSON nếu có
+      luôn được ưu tiên (ngày được mở lại để ghi).
+    - Ghi nguyên tử theo lô (group commit): write() chỉ ghi file tạm; luồng commit gom các lần ghi
+      trong GROUP_COMMIT_WINDOW giây, fsync rồi rename đè file ngày, nên file không bao giờ bị ghi dở
+      và một đợt ghi dồn dập chỉ tốn một lần fsync. Writer chờ lô của mình bền vững khi nhả khóa.
+    - Bảng tổng hợp (rollups.json) chỉ được cộng/trừ sau khi file ngày của lô đã rename; file đánh
+      dấu rollups.dirty tồn tại trong lúc đó, nếu process chết giữa chừng thì lần mở sau dựng lại.
+    """
+
+    READ_RETRIES = 5
+    GROUP_COMMIT_WINDOW = 0.005
+
+    def __init__(self, base_dir: Path):
+        self.base_dir = base_dir
+        self.lock = threading.RLock()
+        self.listeners = []
+        self._lock_path = base_dir / ".storage.lock"
+        self._lock_file = None
+        self._depth = 0
+        self._snapshots: Dict[Path, tuple] = {}  # file ngày -> (phiên bản, danh sách)
+        self.archive = TransactionArchive(base_dir / "archive")
+        self.rollup = TransactionRollup(base_dir / "rollups.json")
+        self._rollup_marker = base_dir / "rollups.dirty"
+        self.stats = {"snapshot_hits": 0, "parses": 0, "writes": 0, "commits": 0}
+        self._pending: Dict[Path, tuple] = {}  # file ngày -> (lô, danh sách) đã ghi file tạm, chưa rename
+        self._batch: Optional[_CommitBatch] = None  # lô đang nhận thêm lần ghi
+        self._last_batch: Optional[_CommitBatch] = None
+        self._written: Optional[_CommitBatch] = None  # lô writer đang giữ khóa cần chờ
+        self._commit_lock = threading.Lock()  # các lô commit lần lượt theo thứ tự mở
+        self._tmp_seq = 0
+        if self._rollup_marker.exists():
+            # Đánh dấu còn sót (chỉ thấy được khi không process nào đang commit): rollup có thể lệch
+            with self.locked():
+                if self._rollup_marker.exists():
+                    logger.warning("⚠️ Lần commit trước bị ngắt, bảng tổng hợp sẽ được dựng lại")
+                    self.rollup.path.unlink(missing_ok=True)
+                    self._rollup_marker.unlink(missing_ok=True)
+
+    @contextmanager
+    def locked(self):
+        """Giữ quyền ghi (lồng nhau được trong cùng thread); khi nhả khóa thì chờ các lần ghi được commit"""
+        batch = None
+        with self.lock:
+            if self._depth == 0 and self._lock_file is None:
+                self._acquire_file_lock()
+            self._depth += 1
+            try:
+                yield
+            finally:
+                self._depth -= 1
+                if self._depth == 0:
+                    batch, self._written = self._written, None
+                    if not self._pending:
+                        # Còn lô chưa rename thì giữ khóa file để process khác không đọc bản cũ
+                        self._release_file_lock()
+        if batch is not None:
+            self._wait_committed(batch)
+
+    def _acquire_file_lock(self):
+        self._lock_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock_file = open(self._lock_path, "a+b")
+        if os.name == "nt":
+            self._lock_file.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(self._lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+                    return
+                except OSError:
+                    time.sleep(0.01)
+        fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX)
+
+    def _release_file_lock(self):
+        try:
+            if os.name == "nt":
+                self._lock_file.seek(0)
+                msvcrt.locking(self._lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+        finally:
+            self._lock_file.close()
+            self._lock_file = None
+
+    @staticmethod
+    def _stat(date_file: Path):
+        try:
+            st = date_file.stat()
+            return st.st_mtime_ns, st.st_size
+        except FileNotFoundError:
+            return None
+
+    def _version(self, date_file: Path):
+        """(mtime_ns, size) của file JSON, ("archive", mtime) nếu ngày đã lưu trữ, None nếu không có"""
+        stat = self._stat(date_file)
+        if stat is not None:
+            return stat
+        day = _day_of_file(date_file)
+        stamp = self.archive.stamp(day) if day else None
+        return ("archive", stamp) if stamp is not None else None
+
+    def modified_ns(self, date_file: Path) -> Optional[int]:
+        """Thời điểm dữ liệu của ngày thay đổi lần cuối (JSON hoặc archive)"""
+        version = self._version(date_file)
+        if version is None:
+            return None
+        return version[1] if version[0] == "archive" else version[0]
+
+    def read(self, date_file: Path) -> list:
+        """
+        Snapshot của file ngày (danh sách dùng chung, KHÔNG được sửa trực tiếp).
+        File không tồn tại -> [].
+        Parse ngoài khóa (nhiều reader song song được); nếu file đổi trong lúc parse thì đọc lại.
+        """
+        for _ in range(self.READ_RETRIES):
+            with self.lock:
+                pending = self._pending.get(date_file)
+                if pending is not None:
+                    return pending[1]
+                stat = self._version(date_file)
+                cached = self._snapshots.get(date_file)
+                if cached is not None and cached[0] == stat:
+                    self.stats["snapshot_hits"] += 1
+                    return cached[1]
+                if stat is None or self._depth:
+                    # Không có file, hoặc thread này đang giữ quyền ghi: đọc luôn trong khóa
+                    return self._parse_and_store(date_file, stat)
+            try:
+                transactions = self._parse(date_file)
+            except (ValueError, OSError):
+                transactions = None  # File đang được ghi dở
+            with self.lock:
+                if transactions is not None and self._version(date_file) == stat:
+                    self._snapshots[date_file] = (stat, transactions)
+                    self.stats["parses"] += 1
+                    return transactions
+            time.sleep(0.01)
+        # File bị ghi liên tục: chờ quyền ghi rồi đọc
+        with self.locked():
+            pending = self._pending.get(date_file)
+            if pending is not None:
+                return pending[1]
+            return self._parse_and_store(date_file, self._version(date_file))
+
+    def _parse(self, date_file: Path) -> list:
+        try:
+            return json_codec.load_file(date_file, schema=list[dict])
+        except FileNotFoundError:
+            day = _day_of_file(date_file)
+            return self.archive.load(day) if day else []
+
+    def _parse_and_store(self, date_file: Path, stat) -> list:
+        transactions = self._parse(date_file) if stat is not None else []
+        if stat is not None:
+            self.stats["parses"] += 1
+        self._snapshots[date_file] = (stat, transactions)
+        return transactions
+
+    def write(self, date_file: Path, transactions: list, removed: list = (), added: list = ()):
+        """
+        Ghi file ngày (gọi trong locked()): dữ liệu vào file tạm của lô đang mở, read() thấy ngay;
+        file ngày được thay khi lô commit, trước khi locked() ngoài cùng trả về.
+        Args:
+            removed, added: Bản ghi bị thay/được thêm, áp vào bảng tổng hợp khi file ngày đã commit
+        """
+        with self.locked():
+            batch = self._batch
+            if batch is None:
+                batch = self._batch = self._last_batch = _CommitBatch()
+                threading.Thread(target=self._commit, args=(batch,), daemon=True,
+                                 name="storage-commit").start()
+            self._tmp_seq += 1
+            tmp = date_file.with_name(f"{date_file.name}.{os.getpid()}.{self._tmp_seq}.tmp")
+            try:
+                json_codec.dump_file(transactions, tmp)
+            except Exception:
+                self._remove_tmp(tmp)
+                raise
+            # Ghi lại trong cùng lô: chỉ phiên bản cuối cùng được commit
+            previous = batch.files.get(date_file)
+            if previous is not None:
+                self._remove_tmp(previous)
+            batch.files[date_file] = tmp
+            if removed or added:
+                batch.rollup.setdefault(date_file, []).append((list(removed), list(added)))
+            self._pending[date_file] = (batch, transactions)
+            self._written = batch
+            self.stats["writes"] += 1
+
+    def _commit(self, batch):
+        """Luồng commit của một lô: chờ gom, fsync các file tạm, rename, fsync thư mục"""
+        time.sleep(self.GROUP_COMMIT_WINDOW)
+        with self._commit_lock:
+            with self.lock:
+                if self._batch is batch:
+                    self._batch = None  # Lần ghi sau mở lô mới
+            try:
+                if batch.rollup:
+                    self._rollup_marker.touch()
+                for tmp in batch.files.values():
+                    with open(tmp, 'rb+') as f:
+                        os.fsync(f.fileno())
+                if batch.rollup:
+                    _fsync_directory(self.base_dir)  # Đánh dấu xuống đĩa trước khi rename
+            except OSError as e:
+                batch.error = e
+            with self.lock:
+                directories = set()
+                committed = []
+                for date_file, tmp in batch.files.items():
+                    try:
+                        if batch.error is not None:
+                            raise batch.error
+                        os.replace(tmp, date_file)
+                        directories.add(date_file.parent)
+                        committed.append(date_file)
+                    except OSError as e:
+                        batch.error = batch.error or e
+                        self._remove_tmp(tmp)
+                    pending = self._pending.get(date_file)
+                    if pending is not None and pending[0] is batch:
+                        del self._pending[date_file]
+                        if batch.error is None:
+                            self._snapshots[date_file] = (self._stat(date_file), pending[1])
+                        else:
+                            self._snapshots.pop(date_file, None)
+                if batch.rollup:
+                    # Trong cùng khóa với rename: không ai dựng lại rollup giữa hai bước
+                    self._apply_rollup(batch, committed)
+                if self._depth == 0 and not self._pending and self._lock_file is not None:
+                    self._release_file_lock()
+                self.stats["commits"] += 1
+            # Rename chỉ bền vững khi entry thư mục đã xuống đĩa
+            for directory in directories:
+                _fsync_directory(directory)
+        if batch.error is not None:
+            logger.error(f"❌ Lỗi khi commit {len(batch.files)} file giao dịch: {batch.error}")
+        batch.done.set()
+
+    def _apply_rollup(self, batch, committed: list):
+        """Áp thay đổi của các file ngày đã commit vào bảng tổng hợp (gọi trong self.lock)"""
+        try:
+            if self.rollup.exists():
+                removed = [t for f in committed for r, _ in batch.rollup.get(f, ()) for t in r]
+                added = [t for f in committed for _, a in batch.rollup.get(f, ()) for t in a]
+                self.rollup.apply(removed, added)
+            else:
+                self._rebuild_rollup()
+            self._rollup_marker.unlink(missing_ok=True)
+        except Exception as e:
+            # Bỏ bảng tổng hợp đã lệch: lần ghi/đọc sau dựng lại từ lịch sử
+            logger.error(f"❌ Lỗi khi cập nhật bảng tổng hợp, sẽ dựng lại: {e}")
+            self.rollup.path.unlink(missing_ok=True)
+
+    def _committed_files(self) -> list:
+        """File ngày đã commit (JSON trên đĩa và ngày chỉ còn trong archive)"""
+        days = {_day_of_file(p) for p in self.base_dir.glob("transactions_*.json")}
+        days.update(self.archive.days())
+        days.discard(None)
+        return [self.base_dir / f"transactions_{day.strftime('%Y-%m-%d')}.json" for day in sorted(days)]
+
+    def _rebuild_rollup(self) -> int:
+        # Chỉ dữ liệu đã commit: thay đổi của lô đang chờ sẽ được áp sau khi lô commit
+        transactions = [t for date_file in self._committed_files() for t in self._parse(date_file)]
+        self.rollup.replace(transactions)
+        return len(transactions)
+
+    def rebuild_rollup(self) -> int:
+        """Tính lại bảng tổng hợp từ toàn bộ lịch sử đã commit; trả về số giao dịch đã duyệt"""
+        self.flush()
+        with self.locked():
+            return self._rebuild_rollup()
+
+    @staticmethod
+    def _remove_tmp(tmp: Path):
+        try:
+            os.remove(tmp)
+        except FileNotFoundError:
+            pass
+
+    def _wait_committed(self, batch):
+        batch.done.wait()
+        if batch.error is not None:
+            raise OSError(f"Không commit được file giao dịch: {batch.error}") from batch.error
+
+    def pending_files(self) -> list:
+        """File ngày đã ghi nhưng chưa commit (có thể chưa tồn tại trên đĩa)"""
+        with self.lock:
+            return list(self._pending)
+
+    def flush(self):
+        """Chờ mọi lần ghi đã nhận được commit xuống đĩa"""
+        with self.lock:
+            batch = self._last_batch
+        if batch is not None:
+            batch.done.wait()
+
+    def restore_day(self, date_file: Path) -> int:
+        """Ghi lại file JSON của ngày từ archive rồi xóa bản lưu trữ; trả về số giao dịch"""
+        day = _day_of_file(date_file)
+        with self.locked():
+            if self.archive.stamp(day) is None:
+                return 0
+            transactions = self.read(date_file)  # File JSON nếu có luôn được ưu tiên
+            if self._stat(date_file) is None:
+                self.write(date_file, transactions)
+        # locked() đã chờ file JSON commit xong: lúc này mới bỏ bản lưu trữ
+        with self.locked():
+            self.archive.remove_day(day)
+            self._snapshots.pop(date_file, None)
+        return len(transactions)
+
+    def archive_day(self, date_file: Path) -> int:
+        """Chuyển file JSON của ngày sang archive rồi xóa file JSON; trả về số giao dịch"""
+        self.flush()
+        with self.locked():
+            if date_file in self._pending:
+                return 0  # Ngày vừa được ghi lại: để lần bảo trì sau
+            transactions = self.read(date_file)
+            rows = self.archive.write_day(_day_of_file(date_file), transactions)
+            os.remove(date_file)
+            self._snapshots[date_file] = (self._version(date_file), transactions)
+            return rows
+
+
+# Engine theo thư mục lưu trữ: mọi TransactionStorage cùng thư mục trong process dùng chung
+# (khóa ghi, snapshot, listener), để màn hình nhận được thay đổi do P2PBinance ghi
+_engines: Dict[Path, _StorageEngine] = {}
+_engines_lock = threading.Lock()
+
+
+def _get_engine(base_dir: Path) -> _StorageEngine:
+    key = base_dir.resolve()
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            engine = _engines[key] = _StorageEngine(key)
+        return engine
+
+
+def _amount(transaction: dict) -> Optional[float]:
+    """Số tiền của giao dịch (lưu dạng số hoặc chuỗi); None nếu không đọc được"""
+    try:
+        return float(transaction.get('amount'))
+    except (TypeError, ValueError):
+        return None
+
+
+def _copy(transactions: list) -> list:
+    # Giao dịch là dict phẳng: sao chép từng dict là đủ để người gọi sửa thoải mái
+    return [dict(t) for t in transactions]
+
 class TransactionStorage:
     def __init__(self, base_dir: str = "transactions"):
         """Khởi tạo TransactionStorage với thư mục cơ sở"""
         self.base_dir = Path(base_dir)
-        self.qr_dir = self.base_dir / "qr_codes"
+        self.qr_dir = self.base_dir / "qr_codes"  # QR dạng file riêng (bản ghi cũ có qr_path)
         self.logger = logging.getLogger(__name__)
         
         # Tạo thư mục nếu chưa tồn tại
         self.base_dir.mkdir(parents=True, exist_ok=True)
         self.qr_dir.mkdir(parents=True, exist_ok=True)
+        self._engine = _get_engine(self.base_dir)
+        self.qr_assets = QrAssetStore(self.base_dir / "qr_assets")
+
+    def add_listener(self, callback):
+        """
+        Đăng ký callback(date_file: Path, order_number: str) được gọi sau mỗi lần ghi.
+        Callback chạy trên thread đã ghi, cần tự chuyển sang thread UI nếu cần.
+        """
+        with self._engine.lock:
+            self._engine.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        with self._engine.lock:
+            if callback in self._engine.listeners:
+                self._engine.listeners.remove(callback)
+
+    def _notify(self, date_file: Path, order_number: str = None):
+        with self._engine.lock:
+            callbacks = list(self._engine.listeners)
+        for callback in callbacks:
+            try:
+                callback(date_file, order_number)
+            except Exception as e:
+                self.logger.error(f"Lỗi trong listener của storage: {e}")
         
     def _get_date_file_path(self, date: datetime) -> Path:
         """Lấy đường dẫn file JSON cho một ngày cụ thể"""
         date_str = date.strftime("%Y-%m-%d")
         return self.base_dir / f"transactions_{date_str}.json"
+
+    def date_file_path(self, day: datetime) -> Path:
+        """Đường dẫn file JSON của một ngày, cho nơi cần theo dõi/stat file (watcher, loader)"""
+        return self._get_date_file_path(day)
         
-    def _get_qr_filename(self, transaction_type: str, order_number: str, timestamp: datetime) -> str:
-        """Tạo tên file cho mã QR"""
-        date_str = timestamp.strftime("%Y%m%d_%H%M%S")
-        return f"{transaction_type}_{date_str}_{order_number}.png"
-        
-    def save_transaction(self, transaction_info: dict, qr_image: bytes = None, order_status: str = None) -> dict:
+    def save_transaction(self, transaction_info, qr_image: bytes = None, order_status: str = None) -> dict:
         """
         Lưu thông tin giao dịch và mã QR
         Args:
-            transaction_info: Thông tin giao dịch
+            transaction_info: Thông tin giao dịch (Transaction hoặc dict)
             qr_image: Dữ liệu QR code (bytes)
             order_status: Trạng thái của order (optional)
         Returns:
             dict: Thông tin giao dịch đã lưu
         """
         try:
+            if isinstance(transaction_info, Transaction):
+                transaction_info = transaction_info.to_dict()
             # Lấy timestamp từ transaction_info hoặc sử dụng thời gian hiện tại
             timestamp = datetime.fromtimestamp(transaction_info.get('timestamp', datetime.now().timestamp()))
             date_file = self._get_date_file_path(timestamp)
             
-            # Đọc dữ liệu hiện có hoặc tạo mới
-            transactions = []
-            if date_file.exists():
-                with open(date_file, 'r', encoding='utf-8') as f:
-                    transactions = json.load(f)
-            
             # Thêm thông tin giao dịch mới
             transaction_info['timestamp'] = timestamp.timestamp()
             
@@ -59,43 +483,47 @@ class TransactionStorage:
                 transaction_info['order_status'] = order_status
                 self.logger.info(f"📊 Đã thêm order_status: {order_status} cho order {transaction_info.get('order_number', 'N/A')}")
             
-            # Lưu mã QR nếu có
+            # Lưu mã QR nếu có: bản ghi tham chiếu ảnh theo hash nội dung,
+            # qr_path chỉ trả về cho người gọi (không lưu vào file)
+            record = Transaction.from_dict(transaction_info).to_dict()  # chuẩn hóa theo schema
             if qr_image:
-                qr_filename = self._get_qr_filename(
-                    transaction_info['type'],
-                    transaction_info['order_number'],
-                    timestamp
-                )
-                qr_path = self.qr_dir / qr_filename
-                with open(qr_path, 'wb') as f:
-                    f.write(qr_image)
-                transaction_info['qr_path'] = str(qr_path)
+                qr_hash = self.qr_assets.put(qr_image)
+                record['qr_hash'] = qr_hash
+                record.pop('qr_path', None)
+                transaction_info['qr_hash'] = qr_hash
+                transaction_info['qr_path'] = self.qr_assets.path_for(qr_hash)
             
-            # Kiểm tra xem order_number đã tồn tại chưa
+            # Đọc - sửa - ghi trong cùng một lần giữ khóa để không mất cập nhật của writer khác
             order_number = transaction_info.get('order_number')
-            existing_index = None
-            
-            if order_number:
-                for i, existing_transaction in enumerate(transactions):
-                    if existing_transaction.get('order_number') == order_number:
-                        existing_index = i
-                        break
-            
-            if existing_index is not None:
-                # Cập nhật transaction hiện có
-                self.logger.info(f"🔄 Cập nhật transaction hiện có cho order {order_number}")
-                transactions[existing_index] = transaction_info
-            else:
-                # Thêm transaction mới
-                self.logger.info(f"➕ Thêm transaction mới cho order {order_number}")
-                transactions.append(transaction_info)
-            
-            # Lưu lại file
-            with open(date_file, 'w', encoding='utf-8') as f:
-                json.dump(transactions, f, ensure_ascii=False, indent=2)
+            with self._engine.locked():
+                # Đọc dữ liệu hiện có (snapshot) hoặc tạo mới
+                transactions = list(self._engine.read(date_file))
+                
+                # Kiểm tra xem order_number đã tồn tại chưa
+                existing_index = None
+                if order_number:
+                    for i, existing_transaction in enumerate(transactions):
+                        if existing_transaction.get('order_number') == order_number:
+                            existing_index = i
+                            break
+                
+                previous = []
+                if existing_index is not None:
+                    # Cập nhật transaction hiện có
+                    self.logger.info(f"🔄 Cập nhật transaction hiện có cho order {order_number}")
+                    previous.append(transactions[existing_index])
+                    transactions[existing_index] = record
+                else:
+                    # Thêm transaction mới
+                    self.logger.info(f"➕ Thêm transaction mới cho order {order_number}")
+                    transactions.append(record)
+                
+                # Lưu lại file
+                self._engine.write(date_file, transactions, removed=previous, added=[record])
             
             action = "cập nhật" if existing_index is not None else "lưu"
             self.logger.info(f"Đã {action} giao dịch {order_number} vào file {date_file}")
+            self._notify(date_file, order_number)
             return transaction_info
             
         except Exception as e:
@@ -106,32 +534,82 @@ class TransactionStorage:
         """Lấy danh sách giao dịch theo ngày"""
         try:
             date_file = self._get_date_file_path(date)
-            if not date_file.exists():
-                return []
-                
-            with open(date_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return _copy(self._engine.read(date_file))
                 
         except Exception as e:
             self.logger.error(f"Lỗi khi đọc giao dịch ngày {date}: {e}")
             return []
             
-    def get_transactions_by_date_range(self, start_date: datetime, end_date: datetime) -> list:
-        """Lấy danh sách giao dịch trong khoảng thời gian"""
+    def get_transactions_by_date_range(self, start_date: datetime, end_date: datetime, **filters) -> list:
+        """Lấy danh sách giao dịch trong khoảng thời gian (bộ lọc như iter_transactions_by_date_range)"""
         try:
-            all_transactions = []
-            current_date = start_date
-            
-            while current_date <= end_date:
-                transactions = self.get_transactions_by_date(current_date)
-                all_transactions.extend(transactions)
-                current_date = current_date.replace(day=current_date.day + 1)
-                
-            return all_transactions
+            return list(self.iter_transactions_by_date_range(start_date, end_date, **filters))
             
         except Exception as e:
             self.logger.error(f"Lỗi khi đọc giao dịch từ {start_date} đến {end_date}: {e}")
             return []
+
+    def iter_transactions_by_date_range(self, start_date, end_date, trade_type: str = None,
+                                        order_status: str = None, min_amount: float = None,
+                                        max_amount: float = None, predicate=None, max_workers: int = 4):
+        """
+        Duyệt giao dịch từ start_date đến end_date (tính cả hai ngày), từng ngày một theo thứ tự ngày
+        Args:
+            trade_type: Chỉ lấy loại 'buy'/'sell'
+            order_status: Chỉ lấy trạng thái này
+            min_amount, max_amount: Khoảng số tiền (tính cả hai đầu)
+            predicate: Hàm lọc thêm (transaction -> bool)
+            max_workers: Số ngày được đọc song song
+        Lọc ngay khi đọc từng ngày; cùng lúc chỉ giữ tối đa max_workers ngày đã lọc trong bộ nhớ.
+        """
+        if isinstance(start_date, datetime):
+            start_date = start_date.date()
+        if isinstance(end_date, datetime):
+            end_date = end_date.date()
+        days = (start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1))
+        trade_type = trade_type.lower() if trade_type else None
+
+        def matches(transaction):
+            if trade_type and transaction.get('type', '').lower() != trade_type:
+                return False
+            if order_status and transaction.get('order_status') != order_status:
+                return False
+            if min_amount is not None or max_amount is not None:
+                amount = _amount(transaction)
+                if amount is None:
+                    return False
+                if min_amount is not None and amount < min_amount:
+                    return False
+                if max_amount is not None and amount > max_amount:
+                    return False
+            return predicate is None or predicate(transaction)
+
+        def read_day(day):
+            date_file = self._get_date_file_path(day)
+            archived = None if date_file.exists() else self._engine.archive.open(day)
+            if archived is not None:
+                # Ngày đã lưu trữ: lọc trên cột, chỉ giải mã các giao dịch khớp
+                return [t for t in archived.select(trade_type, order_status, min_amount, max_amount)
+                        if predicate is None or predicate(t)]
+            return [dict(t) for t in self._engine.read(date_file) if matches(t)]
+
+        if max_workers <= 1:
+            for day in days:
+                yield from read_day(day)
+            return
+        # Cửa sổ trượt: luôn có tối đa max_workers ngày đang đọc, trả kết quả theo thứ tự ngày
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="RangeRead") as executor:
+            window = deque()
+            try:
+                for day in days:
+                    window.append(executor.submit(read_day, day))
+                    if len(window) >= max_workers:
+                        yield from window.popleft().result()
+                while window:
+                    yield from window.popleft().result()
+            finally:
+                for future in window:
+                    future.cancel()
             
     def get_transaction_by_order(self, order_number: str) -> dict:
         """
@@ -143,36 +621,218 @@ class TransactionStorage:
             if not date_file.exists():
                 return None
             start_time = time.time()
-            with open(date_file, 'r', encoding='utf-8') as f:
-                transactions = json.load(f)
+            transactions = self._engine.read(date_file)
             elapsed = (time.time() - start_time) * 1000  # ms
             self.logger.info(f"[get_transaction_by_order] Đọc file {date_file} mất {elapsed:.2f} ms")
             for transaction in transactions:
                 if transaction.get('order_number') == order_number:
-                    return transaction
+                    return dict(transaction)
             return None
         except Exception as e:
             self.logger.error(f"Lỗi khi tìm giao dịch {order_number}: {e}")
             return None
             
-    def get_recent_transactions(self, limit: int = 10) -> list:
-        """Lấy danh sách giao dịch gần đây nhất"""
+    def get_recent_transactions(self, limit: int = 10, offset: int = 0, trade_type: str = None,
+                                order_status: str = None, predicate=None) -> list:
+        """
+        Lấy danh sách giao dịch gần đây nhất (mới nhất trước)
+        Args:
+            limit: Số giao dịch cần lấy
+            offset: Bỏ qua số giao dịch mới nhất này (phân trang)
+            trade_type: Chỉ lấy loại 'buy'/'sell'
+            order_status: Chỉ lấy trạng thái này
+            predicate: Hàm lọc thêm (transaction -> bool)
+        Duyệt file ngày từ mới đến cũ với heap giới hạn offset + limit phần tử, dừng ngay khi
+        giao dịch của các ngày cũ hơn không thể lọt vào kết quả.
+        """
         try:
-            all_transactions = []
-            
-            # Đọc tất cả các file JSON
-            for date_file in sorted(self.base_dir.glob("transactions_*.json"), reverse=True):
-                with open(date_file, 'r', encoding='utf-8') as f:
-                    transactions = json.load(f)
-                    all_transactions.extend(transactions)
+            need = offset + limit
+            if limit <= 0:
+                return []
+            # Min-heap theo (timestamp, -thứ tự duyệt): phần tử đầu là phần tử "kém" nhất
+            heap = []
+            seq = 0
+            for date_file in self._day_files(reverse=True):
+                if len(heap) >= need:
+                    day = self._date_of_file(date_file)
+                    if day is not None:
+                        day_end = datetime.combine(day + timedelta(days=1), datetime.min.time()).timestamp()
+                        if day_end <= heap[0][0]:
+                            break
+                for transaction in self._engine.read(date_file):
+                    if trade_type and transaction.get('type', '').lower() != trade_type.lower():
+                        continue
+                    if order_status and transaction.get('order_status') != order_status:
+                        continue
+                    if predicate is not None and not predicate(transaction):
+                        continue
+                    item = (transaction.get('timestamp', 0), -seq, transaction)
+                    seq += 1
+                    if len(heap) < need:
+                        heapq.heappush(heap, item)
+                    elif item[:2] > heap[0][:2]:
+                        heapq.heapreplace(heap, item)
                     
             # Sắp xếp theo thời gian và lấy limit giao dịch gần nhất
-            all_transactions.sort(key=lambda x: x.get('timestamp', 0), reverse=True)
-            return all_transactions[:limit]
+            ordered = sorted(heap, key=lambda x: x[:2], reverse=True)
+            return _copy([t for _, _, t in ordered[offset:need]])
             
         except Exception as e:
             self.logger.error(f"Lỗi khi lấy giao dịch gần đây: {e}")
             return []
+
+    @staticmethod
+    def _date_of_file(date_file: Path):
+        """Ngày của file transactions_YYYY-MM-DD.json (None nếu tên không đúng định dạng)"""
+        return _day_of_file(date_file)
+
+    def _day_files(self, reverse: bool = False) -> list:
+        """Đường dẫn file JSON của mọi ngày có dữ liệu (kể cả ngày chỉ còn trong archive)"""
+        days = {self._date_of_file(p) for p in self.base_dir.glob("transactions_*.json")}
+        days.update(self._engine.archive.days())
+        days.update(self._date_of_file(p) for p in self._engine.pending_files())
+        days.discard(None)
+        return [self._get_date_file_path(day) for day in sorted(days, reverse=reverse)]
+
+    def qr_path_for(self, transaction: dict) -> Optional[str]:
+        """Đường dẫn file ảnh QR của giao dịch để hiển thị (None nếu không có/không còn)"""
+        if not transaction:
+            return None
+        if transaction.get('qr_hash'):
+            return self.qr_assets.path_for(transaction['qr_hash'])
+        qr_path = transaction.get('qr_path')
+        return qr_path if qr_path and os.path.exists(qr_path) else None
+
+    def compact_qr_assets(self, retention_days: int = 0, today=None) -> dict:
+        """
+        Đóng gói ảnh QR của các ngày đã qua (mỗi ngày một pack), chuyển bản ghi cũ dùng qr_path
+        sang qr_hash, xóa file lẻ không còn ngày mở nào dùng, và áp dụng hạn lưu trữ.
+        Args:
+            retention_days: Giữ pack trong số ngày này (0 = giữ vĩnh viễn)
+            today: Ngày hiện tại (để test)
+        Returns:
+            dict: Số ngày đã đóng gói, số file lẻ đã xóa, số pack đã xóa
+        """
+        today = today or datetime.now().date()
+        result = {"packed_days": 0, "removed_files": 0, "expired_packs": 0}
+        try:
+            open_refs = set()
+            packed = set()
+            for date_file in self._day_files():
+                day = self._date_of_file(date_file)
+                if day is None:
+                    continue
+                if day >= today:
+                    open_refs.update(t['qr_hash'] for t in self._engine.read(date_file) if t.get('qr_hash'))
+                    continue
+                packed_at = self.qr_assets.packed_at(day)
+                if packed_at is not None and self._engine.modified_ns(date_file) <= packed_at:
+                    continue  # Ngày đã đóng gói và không đổi từ đó
+                hashes, legacy_files = self._migrate_legacy_qr(date_file)
+                self.qr_assets.pack_day(day, hashes)
+                packed.update(hashes)
+                result["packed_days"] += 1
+                for legacy in legacy_files:
+                    try:
+                        legacy.unlink()
+                        result["removed_files"] += 1
+                    except FileNotFoundError:
+                        pass
+            result["removed_files"] += self.qr_assets.remove_loose(packed - open_refs)
+            result["expired_packs"] = self.qr_assets.apply_retention(retention_days, today)
+            self.qr_assets.clear_extracted()
+            if result["packed_days"] or result["expired_packs"]:
+                self.logger.info(f"🗜️ Đã đóng gói QR: {result}")
+        except Exception as e:
+            self.logger.error(f"Lỗi khi đóng gói ảnh QR: {e}")
+        return result
+
+    def compact_closed_days(self, keep_days: int = 1, today=None) -> dict:
+        """
+        Chuyển file JSON của các ngày đã đóng sang archive dạng cột (xem module.transaction_archive)
+        Args:
+            keep_days: Số ngày gần nhất (tính cả hôm nay) giữ nguyên JSON; 0 = không lưu trữ
+            today: Ngày hiện tại (để test)
+        Returns:
+            dict: Số ngày và số giao dịch đã lưu trữ
+        """
+        result = {"archived_days": 0, "rows": 0}
+        if keep_days <= 0:
+            return result
+        cutoff = (today or datetime.now().date()) - timedelta(days=keep_days - 1)
+        try:
+            # File tạm còn sót lại khi process bị tắt giữa chừng lúc ghi
+            for tmp in self.base_dir.glob("transactions_*.json.*.tmp"):
+                if time.time() - tmp.stat().st_mtime > 3600:
+                    tmp.unlink(missing_ok=True)
+            for date_file in sorted(self.base_dir.glob("transactions_*.json")):
+                day = self._date_of_file(date_file)
+                if day is None or day >= cutoff:
+                    continue
+                result["rows"] += self._engine.archive_day(date_file)
+                result["archived_days"] += 1
+            if result["archived_days"]:
+                self.logger.info(f"🗄️ Đã lưu trữ các ngày đã đóng: {result}")
+        except Exception as e:
+            self.logger.error(f"Lỗi khi lưu trữ các ngày đã đóng: {e}")
+        return result
+
+    def restore_archived_days(self, days=None) -> int:
+        """
+        Chuyển các ngày đã lưu trữ về lại file JSON (ngược với compact_closed_days)
+        Args:
+            days: Danh sách ngày cần khôi phục (None = tất cả)
+        Returns:
+            int: Số giao dịch đã khôi phục
+        """
+        rows = 0
+        for day in (self._engine.archive.days() if days is None else days):
+            rows += self._engine.restore_day(self._get_date_file_path(day))
+        if rows:
+            self.logger.info(f"📂 Đã khôi phục {rows} giao dịch từ archive về JSON")
+        return rows
+
+    def rebuild_rollups(self) -> int:
+        """Tính lại bảng tổng hợp từ toàn bộ lịch sử; trả về số giao dịch đã duyệt"""
+        rows = self._engine.rebuild_rollup()
+        self.logger.info(f"📊 Đã dựng lại bảng tổng hợp từ {rows} giao dịch")
+        return rows
+
+    def get_rollups(self, start_date, end_date=None, by_hour: bool = False) -> list:
+        """
+        Số lượng, khối lượng fiat và crypto theo ngày (hoặc giờ), loại, trạng thái
+        Args:
+            start_date, end_date: Khoảng ngày (tính cả hai ngày; end_date mặc định = start_date)
+            by_hour: True = chia theo giờ
+        Returns:
+            list: dict gồm day, (hour), side, status, count, fiat_volume, crypto_volume
+        """
+        try:
+            if not self._engine.rollup.exists():
+                self.rebuild_rollups()
+            return self._engine.rollup.rows(start_date, end_date, by_hour)
+        except Exception as e:
+            self.logger.error(f"Lỗi khi đọc bảng tổng hợp: {e}")
+            return []
+
+    def _migrate_legacy_qr(self, date_file: Path):
+        """Chuyển bản ghi có qr_path (file riêng) sang qr_hash; trả về (các hash, các file cũ)"""
+        with self._engine.locked():
+            transactions = list(self._engine.read(date_file))
+            legacy_files = []
+            for i, transaction in enumerate(transactions):
+                qr_path = transaction.get('qr_path')
+                if transaction.get('qr_hash') or not qr_path or not os.path.exists(qr_path):
+                    continue
+                with open(qr_path, 'rb') as f:
+                    qr_hash = self.qr_assets.put(f.read())
+                record = dict(transaction, qr_hash=qr_hash)
+                record.pop('qr_path')
+                transactions[i] = record
+                legacy_files.append(Path(qr_path))
+            if legacy_files:
+                self._engine.write(date_file, transactions)
+        return [t['qr_hash'] for t in transactions if t.get('qr_hash')], legacy_files
     
     def load_used_orders(self, start_timestamp: int = None, end_timestamp: int = None) -> dict:
         """
@@ -181,30 +841,19 @@ class TransactionStorage:
         try:
             used_orders = {}
             if start_timestamp is not None and end_timestamp is not None:
-                # Tính các ngày liên quan
-                start_date = datetime.fromtimestamp(start_timestamp / 1000)
-                end_date = datetime.fromtimestamp(end_timestamp / 1000)
-                current_date = start_date
-                while current_date <= end_date:
-                    date_file = self._get_date_file_path(current_date)
-                    if date_file.exists():
-                        with open(date_file, 'r', encoding='utf-8') as f:
-                            transactions = json.load(f)
-                        for transaction in transactions:
-                            order_number = transaction.get('order_number')
-                            order_status = transaction.get('order_status', 'UNKNOWN')
-                            transaction_timestamp = transaction.get('timestamp', 0) * 1000
-                            if start_timestamp <= transaction_timestamp <= end_timestamp:
-                                if order_number:
-                                    used_orders[order_number] = order_status
-                    current_date += timedelta(days=1)
+                # Chỉ duyệt các ngày liên quan (tính cả ngày cuối)
+                transactions = self.iter_transactions_by_date_range(
+                    datetime.fromtimestamp(start_timestamp / 1000),
+                    datetime.fromtimestamp(end_timestamp / 1000),
+                    predicate=lambda t: start_timestamp <= t.get('timestamp', 0) * 1000 <= end_timestamp)
+                for transaction in transactions:
+                    order_number = transaction.get('order_number')
+                    if order_number:
+                        used_orders[order_number] = transaction.get('order_status', 'UNKNOWN')
             else:
                 # Nếu không có filter thời gian, duyệt toàn bộ như cũ
-                for date_file in sorted(self.base_dir.glob("transactions_*.json"), reverse=True):
-                    if not date_file.exists():
-                        continue
-                    with open(date_file, 'r', encoding='utf-8') as f:
-                        transactions = json.load(f)
+                for date_file in self._day_files(reverse=True):
+                    transactions = self._engine.read(date_file)
                     for transaction in transactions:
                         order_number = transaction.get('order_number')
                         order_status = transaction.get('order_status', 'UNKNOWN')
@@ -226,27 +875,27 @@ class TransactionStorage:
         """
         try:
             # Tìm transaction trong tất cả các file
-            for date_file in self.base_dir.glob("transactions_*.json"):
-                if not date_file.exists():
-                    continue
+            for date_file in self._day_files(reverse=True):
+                with self._engine.locked():
+                    transactions = self._engine.read(date_file)
                     
-                with open(date_file, 'r', encoding='utf-8') as f:
-                    transactions = json.load(f)
-                
-                # Tìm và cập nhật transaction
-                updated = False
-                for transaction in transactions:
-                    if transaction.get('order_number') == order_number:
-                        transaction['order_status'] = order_status
-                        updated = True
-                        break
+                    # Tìm và cập nhật transaction (trên bản sao, snapshot dùng chung không bị sửa)
+                    updated = False
+                    for i, transaction in enumerate(transactions):
+                        if transaction.get('order_number') == order_number:
+                            transactions = list(transactions)
+                            transactions[i] = dict(transaction, order_status=order_status)
+                            updated = True
+                            break
+                    
+                    # Lưu lại nếu có cập nhật
+                    if updated:
+                        self._engine.write(date_file, transactions, removed=[transaction],
+                                           added=[transactions[i]])
                 
-                # Lưu lại nếu có cập nhật
                 if updated:
-                    with open(date_file, 'w', encoding='utf-8') as f:
-                        json.dump(transactions, f, ensure_ascii=False, indent=2)
-                    
                     self.logger.debug(f"Đã cập nhật order {order_number} -> {order_status} trong {date_file}")
+                    self._notify(date_file, order_number)
                     return True
             
             # self.logger.warning(f"Không tìm thấy order {order_number} trong transactions để cập nhật")
@@ -0,0 +1,128 @@
+"""
+HTTP server giả lập Discord webhook và Telegram Bot API, chạy local để test thông báo.
+Ghi lại mọi request nhận được và có thể giả lập lỗi 429 (rate limit).
+Chỉ dùng cho test (test_notifier_registry.py), không thuộc package module/.
+"""
+
+import json
+import threading
+from email import message_from_bytes
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        stub = self.server.stub
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length)
+        path = urlparse(self.path).path
+        record = {"path": path, "fields": _parse_body(self.headers.get("Content-Type", ""), body)}
+        with stub.lock:
+            stub.requests.append(record)
+            failure = stub.failures.pop(0) if stub.failures else None
+        if path.startswith("/api/webhooks/"):
+            self._reply_discord(failure)
+        elif path.startswith("/bot"):
+            self._reply_telegram(failure, len(stub.requests))
+        else:
+            self._send(404, {"message": "Not Found"})
+
+    def _reply_discord(self, failure):
+        if failure:
+            status, retry_after = failure
+            headers = {"X-RateLimit-Remaining": "0"}
+            if retry_after is not None:
+                headers["Retry-After"] = str(retry_after)
+                headers["X-RateLimit-Reset-After"] = str(retry_after)
+            self._send(status, {"message": "stub failure", "retry_after": retry_after}, headers)
+        else:
+            self._send(204, None, {"X-RateLimit-Remaining": "4", "X-RateLimit-Reset-After": "1"})
+
+    def _reply_telegram(self, failure, message_id):
+        if failure:
+            status, retry_after = failure
+            payload = {"ok": False, "error_code": status, "description": "stub failure"}
+            if retry_after is not None:
+                payload["parameters"] = {"retry_after": retry_after}
+            self._send(status, payload)
+        else:
+            self._send(200, {"ok": True, "result": {"message_id": message_id}})
+
+    def _send(self, status, payload, headers=None):
+        data = b"" if payload is None else json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        if payload is not None:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def _parse_body(content_type: str, body: bytes) -> dict:
+    """Đọc JSON, form urlencoded hoặc multipart thành dict (file chỉ ghi số byte)"""
+    if content_type.startswith("application/json"):
+        return json.loads(body or b"{}")
+    if content_type.startswith("multipart/form-data"):
+        message = message_from_bytes(
+            f"Content-Type: {content_type}\r\n\r\n".encode("utf-8") + body, policy=HTTP
+        )
+        fields = {}
+        for part in message.iter_parts():
+            name = part.get_param("name", header="content-disposition")
+            payload = part.get_payload(decode=True) or b""
+            if part.get_filename():
+                fields[name] = len(payload)
+            else:
+                fields[name] = payload.decode("utf-8")
+        return fields
+    return {k: v[0] for k, v in parse_qs(body.decode("utf-8")).items()}
+
+
+class NotificationStubServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        """Server giả lập; port=0 để hệ điều hành chọn cổng trống"""
+        self.requests = []
+        self.failures = []
+        self.lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _StubHandler)
+        self._server.stub = self
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def discord_webhook(self, name: str = "test") -> str:
+        return f"{self.url}/api/webhooks/{name}"
+
+    def fail_next(self, status: int = 429, retry_after: float = None, count: int = 1):
+        """Các request kế tiếp sẽ nhận lỗi `status` (kèm retry_after nếu có)"""
+        with self.lock:
+            self.failures.extend([(status, retry_after)] * count)
+
+    def requests_to(self, prefix: str) -> list:
+        with self.lock:
+            return [r for r in self.requests if r["path"].startswith(prefix)]
+
+    def start(self) -> "NotificationStubServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
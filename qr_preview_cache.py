@@ -0,0 +1,136 @@
+"""
+Cache ảnh xem trước mã QR (bảng giao dịch và TransactionViewer).
+Mục đích: Giữ QPixmap đã giải mã và thu nhỏ sẵn theo (đường dẫn, mtime) trong LRU, để
+bấm xem QR không phải đọc file và scale lại trên thread UI; các QR của trang đang xem
+được giải mã trước ở thread nền.
+"""
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import QObject, Qt, pyqtSignal
+from PyQt5.QtGui import QImage, QPixmap
+
+logger = logging.getLogger(__name__)
+
+
+def _mtime(path: str):
+    try:
+        return os.stat(path).st_mtime_ns
+    except (OSError, TypeError):
+        return None
+
+
+class QrPreviewCache(QObject):
+    # Ảnh xem trước của đường dẫn đã sẵn sàng (phát trên thread UI)
+    preview_ready = pyqtSignal(str)
+    # Nội bộ: chuyển ảnh đã giải mã từ thread nền về thread UI
+    _decoded = pyqtSignal(str, object, QImage)
+
+    def __init__(self, size: int = 300, max_items: int = 64, max_workers: int = 2, parent=None):
+        """
+        Args:
+            size: Cạnh lớn nhất (px) của ảnh xem trước
+            max_items: Số ảnh tối đa giữ trong bộ nhớ
+            max_workers: Số thread giải mã nền
+        """
+        super().__init__(parent)
+        self.size = size
+        self.max_items = max_items
+        self._pixmaps = OrderedDict()  # path -> (mtime_ns, QPixmap), chỉ truy cập trên thread UI
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="QrPreview")
+        self._decoded.connect(self._on_decoded)
+        self.stats = {"hits": 0, "sync_loads": 0, "prefetched": 0}
+
+    def _decode(self, path: str):
+        image = QImage(path)
+        if image.isNull():
+            return None
+        return image.scaled(self.size, self.size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+
+    def _store(self, path: str, mtime, pixmap: QPixmap):
+        self._pixmaps[path] = (mtime, pixmap)
+        self._pixmaps.move_to_end(path)
+        while len(self._pixmaps) > self.max_items:
+            self._pixmaps.popitem(last=False)
+
+    def cached(self, path: str):
+        """QPixmap đã có và còn đúng với file hiện tại (None nếu chưa có)"""
+        entry = self._pixmaps.get(path)
+        if entry is None or entry[0] != _mtime(path):
+            return None
+        self._pixmaps.move_to_end(path)
+        return entry[1]
+
+    def get(self, path: str):
+        """
+        Ảnh xem trước của file QR (gọi trên thread UI). Chưa có trong cache thì giải mã ngay.
+        Trả về None nếu file không tồn tại hoặc không đọc được.
+        """
+        pixmap = self.cached(path)
+        if pixmap is not None:
+            self.stats["hits"] += 1
+            return pixmap
+        mtime = _mtime(path)
+        if mtime is None:
+            return None
+        image = self._decode(path)
+        if image is None:
+            return None
+        self.stats["sync_loads"] += 1
+        pixmap = QPixmap.fromImage(image)
+        self._store(path, mtime, pixmap)
+        return pixmap
+
+    def prefetch(self, paths):
+        """Giải mã trước (ở thread nền) các QR chưa có trong cache"""
+        for path in paths:
+            if not path or self.cached(path) is not None:
+                continue
+            with self._lock:
+                if path in self._pending:
+                    continue
+                self._pending.add(path)
+            self._executor.submit(self._load, path)
+
+    def _load(self, path: str):
+        try:
+            mtime = _mtime(path)
+            image = self._decode(path) if mtime is not None else None
+        except Exception as e:
+            logger.warning(f"⚠️ Không giải mã được QR {path}: {e}")
+            image = None
+        if image is None:
+            with self._lock:
+                self._pending.discard(path)
+            return
+        self._decoded.emit(path, mtime, image)
+
+    def _on_decoded(self, path: str, mtime, image: QImage):
+        with self._lock:
+            self._pending.discard(path)
+        entry = self._pixmaps.get(path)
+        if entry is not None and entry[0] == mtime:
+            return  # Đã được nạp đồng bộ trong lúc chờ
+        self._store(path, mtime, QPixmap.fromImage(image))
+        self.stats["prefetched"] += 1
+        self.preview_ready.emit(path)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_preview_cache = None
+
+
+def get_preview_cache() -> QrPreviewCache:
+    """Cache dùng chung cho màn hình chính và TransactionViewer (tạo sau QApplication)"""
+    global _preview_cache
+    if _preview_cache is None:
+        _preview_cache = QrPreviewCache()
+    return _preview_cache
@@ -0,0 +1,152 @@
+import shutil
+import sys
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Thêm thư mục gốc vào PYTHONPATH
+root_dir = str(Path(__file__).parent)
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+
+from PyQt5.QtCore import QBuffer, QByteArray, QIODevice, Qt
+from PyQt5.QtGui import QColor, QImage
+from PyQt5.QtWidgets import QApplication
+
+from bank_logo_cache import BankLogoCache
+from bank_table_model import COL_LOGO, BankTableModel
+
+
+def png_bytes(width=64, height=32) -> bytes:
+    image = QImage(width, height, QImage.Format_ARGB32)
+    image.fill(QColor("red"))
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.WriteOnly)
+    image.save(buffer, "PNG")
+    return bytes(data)
+
+
+class _LogoHandler(BaseHTTPRequestHandler):
+    hits = []
+
+    def do_GET(self):
+        self.hits.append(self.path)
+        if self.path.endswith(".png"):
+            body = png_bytes()
+            self.send_response(200)
+            self.send_header("Content-Type", "image/png")
+        else:
+            body = b"not found"
+            self.send_response(404)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestBankLogoCache(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _LogoHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.cache_dir = Path("test_bank_logos")
+        _LogoHandler.hits = []
+        self.cache = self.make_cache()
+        self.ready = []
+        self.cache.logo_ready.connect(self.ready.append)
+
+    def tearDown(self):
+        self.cache.shutdown()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def make_cache(self, **kwargs):
+        return BankLogoCache(str(self.cache_dir), **kwargs)
+
+    def wait(self, predicate, timeout=3.0):
+        deadline = time.time() + timeout
+        while time.time() < deadline and not predicate():
+            self.app.processEvents()
+            time.sleep(0.01)
+        return predicate()
+
+    def test_lazy_download_then_memory_hit(self):
+        url = f"{self.base}/img/VCB.png"
+        self.assertIsNone(self.cache.pixmap(url))
+        self.assertIsNone(self.cache.pixmap(url))  # Đang tải: không gửi request thứ hai
+        self.assertTrue(self.wait(lambda: self.ready == [url]))
+        pixmap = self.cache.pixmap(url)
+        self.assertFalse(pixmap.isNull())
+        self.assertEqual((pixmap.width(), pixmap.height()), (24, 12))
+        self.assertEqual(_LogoHandler.hits, ["/img/VCB.png"])
+        self.assertTrue(self.cache.path_for(url).exists())
+
+    def test_disk_cache_survives_restart(self):
+        url = f"{self.base}/img/ICB.png"
+        self.cache.pixmap(url)
+        self.assertTrue(self.wait(lambda: self.ready))
+        other = self.make_cache()
+        try:
+            other.pixmap(url)
+            self.assertTrue(self.wait(lambda: other.pixmap(url) is not None))
+            self.assertEqual(other.stats["downloads"], 0)
+            self.assertEqual(other.stats["disk_loads"], 1)
+            self.assertEqual(len(_LogoHandler.hits), 1)
+        finally:
+            other.shutdown()
+
+    def test_seed_offline(self):
+        url = "http://offline.invalid/img/TCB.png"
+        self.cache.seed(url, png_bytes(24, 24))
+        self.cache.pixmap(url)
+        self.assertTrue(self.wait(lambda: self.ready == [url]))
+        self.assertEqual(self.cache.stats["downloads"], 0)
+
+    def test_failure_not_retried_immediately(self):
+        url = f"{self.base}/img/missing"
+        self.cache.pixmap(url)
+        self.assertTrue(self.wait(lambda: self.cache.stats["failures"] == 1))
+        self.assertIsNone(self.cache.pixmap(url))
+        time.sleep(0.1)
+        self.assertEqual(_LogoHandler.hits, ["/img/missing"])
+
+    def test_memory_lru(self):
+        cache = self.make_cache(max_items=1)
+        try:
+            urls = [f"{self.base}/img/A.png", f"{self.base}/img/B.png"]
+            for url in urls:
+                cache.pixmap(url)
+                self.assertTrue(self.wait(lambda: cache.pixmap(url) is not None))
+            self.assertEqual(list(cache._pixmaps), [urls[1]])
+        finally:
+            cache.shutdown()
+
+    def test_model_refreshes_logo_cell(self):
+        url = f"{self.base}/img/BIDV.png"
+        model = BankTableModel(logo_cache=self.cache)
+        model.set_banks({"BIDV": {"name": "BIDV", "code": "BIDV", "bin": "970418", "logo": url}})
+        changed = []
+        model.dataChanged.connect(lambda tl, br, roles: changed.append((tl.row(), tl.column(), roles)))
+        index = model.index(0, COL_LOGO)
+        self.assertIsNone(index.data(Qt.DecorationRole))
+        self.assertEqual(index.data(Qt.ToolTipRole), url)
+        self.assertTrue(self.wait(lambda: changed))
+        self.assertEqual(changed, [(0, COL_LOGO, [Qt.DecorationRole])])
+        self.assertIsNotNone(index.data(Qt.DecorationRole))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import json
+import sys
+import unittest
+from pathlib import Path
+
+# Thêm thư mục gốc vào PYTHONPATH
+root_dir = str(Path(__file__).parent)
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+
+from PyQt5.QtCore import QCoreApplication, Qt
+
+from bank_table_model import BankFilterProxyModel, BankTableModel, search_key
+from module.field_mapping import normalize_label
+
+
+class TestBankTableModel(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+        with open(Path(root_dir) / 'bank_list.json', 'r', encoding='utf-8') as f:
+            cls.banks = json.load(f)
+
+    def setUp(self):
+        self.model = BankTableModel()
+        self.proxy = BankFilterProxyModel()
+        self.proxy.setSourceModel(self.model)
+        self.model.set_banks(self.banks)
+
+    def visible_codes(self):
+        return [self.proxy.index(r, 0).data() for r in range(self.proxy.rowCount())]
+
+    def brute_force(self, text):
+        """Duyệt lại toàn bộ danh sách cho mỗi từ khóa (như cách lọc cũ, nhưng bỏ dấu)"""
+        text = normalize_label(text)
+        return [code for code, info in self.banks.items()
+                if any(text in normalize_label(v) for v in (code, info['name'], info['code'], info['bin']))]
+
+    def test_display(self):
+        self.assertEqual(self.proxy.rowCount(), len(self.banks))
+        code, info = next(iter(self.banks.items()))
+        self.assertEqual(self.model.index(0, 0).data(), code)
+        self.assertEqual(self.model.index(0, 3).data(), info['bin'])
+        self.assertEqual(self.model.index(0, 0).data(Qt.TextAlignmentRole), Qt.AlignCenter)
+
+    def test_search_ignores_case_and_diacritics(self):
+        self.assertIn("ngan hang tmcp cong thuong", search_key("VietinBank", self.banks["VietinBank"]))
+        self.proxy.set_query("CÔNG THƯƠNG")
+        with_accents = self.visible_codes()
+        self.proxy.set_query("cong thuong")
+        self.assertEqual(self.visible_codes(), with_accents)
+        self.assertIn("VietinBank", with_accents)
+
+    def test_incremental_typing_matches_full_scan(self):
+        for text in ["", "v", "vi", "vie", "viet", "vi", "9704", "970436", "xyz", ""]:
+            self.proxy.set_query(text)
+            self.assertEqual(self.visible_codes(), self.brute_force(text), text)
+
+    def test_reload_keeps_query(self):
+        self.proxy.set_query("970415")
+        self.model.set_banks(self.banks)
+        self.assertEqual(self.visible_codes(), ["VietinBank"])
+
+
+if __name__ == '__main__':
+    unittest.main()
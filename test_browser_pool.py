@@ -0,0 +1,172 @@
+import sys
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Thêm thư mục gốc vào PYTHONPATH
+root_dir = str(Path(__file__).parent)
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+
+from module.binance_p2p import P2PBinance
+from module.browser_pool import DEFAULT_ACCOUNT, DEFAULT_PORT, BrowserInstance, BrowserPool
+from module.selenium_get_info import BASE_DIR, PROFILE_PATH, _scrape_order_page
+
+
+class FakeChrome:
+    """Một Chrome, danh sách tab dùng chung cho mọi session WebDriver gắn vào"""
+
+    def __init__(self):
+        self.handles = ["main"]
+        self.urls = {"main": "about:blank"}
+        self.on_open = None
+
+    def open_tab(self):
+        handle = f"tab{len(self.handles)}"
+        self.handles.append(handle)
+        self.urls[handle] = "about:blank"
+        if self.on_open is not None:
+            callback, self.on_open = self.on_open, None
+            callback()  # Session khác mở tab ngay sau đó
+        return handle
+
+
+class FakeSession:
+    def __init__(self, chrome):
+        self.chrome = chrome
+        self.current_window_handle = "main"
+        self.switch_to = self
+
+    @property
+    def window_handles(self):
+        return list(self.chrome.handles)
+
+    def window(self, handle):
+        self.current_window_handle = handle
+
+    def new_window(self, type_hint=None):
+        self.current_window_handle = self.chrome.open_tab()
+
+    def execute_script(self, script):
+        self.chrome.open_tab()
+
+    def get(self, url):
+        self.chrome.urls[self.current_window_handle] = url
+
+    def find_element(self, *locator):
+        return object()
+
+    @property
+    def page_source(self):
+        order_no = self.chrome.urls[self.current_window_handle].rsplit("=", 1)[-1]
+        return ('<div class="subtitle6 text-textBuy">₫1,000</div><div class="relative w-full">'
+                '<div><div class="body2 text-tertiaryText">Full Name</div>'
+                f'<div class="body2 text-right break-words">SELLER {order_no}</div></div></div>')
+
+    def close(self):
+        self.chrome.handles.remove(self.current_window_handle)
+
+
+class TestBrowserPool(unittest.TestCase):
+    def test_from_config_parsing(self):
+        pool = BrowserPool.from_config("main:9230:ProfileMain, acc2:9231:/tmp/profile_acc2:2")
+        self.assertEqual(list(pool.instances), ["main", "acc2"])
+        main, acc2 = pool.instances["main"], pool.instances["acc2"]
+        self.assertEqual((main.port, main.profile_path, main.max_concurrency),
+                         (9230, BASE_DIR / "ProfileMain", 1))
+        self.assertEqual((acc2.port, acc2.profile_path, acc2.max_concurrency),
+                         (9231, Path("/tmp/profile_acc2"), 2))
+        self.assertEqual(len(acc2.sessions), 2)
+        self.assertEqual(pool.default_account, "main")
+
+    def test_from_config_default_and_invalid(self):
+        pool = BrowserPool.from_config("")
+        instance = pool.instance_for()
+        self.assertEqual((instance.account, instance.port, instance.profile_path),
+                         (DEFAULT_ACCOUNT, DEFAULT_PORT, PROFILE_PATH))
+        for spec in ("main:9230", "main:abc:Profile"):
+            with self.assertRaises(ValueError):
+                BrowserPool.from_config(spec)
+
+    def test_duplicate_account_rejected(self):
+        with self.assertRaises(ValueError):
+            BrowserPool.from_config("main:9230:A,main:9231:B")
+        with self.assertRaises(ValueError):
+            BrowserPool([])
+
+    def test_instance_for_fallback(self):
+        pool = BrowserPool.from_config("main:9230:A,acc2:9231:B")
+        self.assertIs(pool.instance_for("acc2"), pool.instances["acc2"])
+        self.assertIs(pool.instance_for(None), pool.instances["main"])
+        with self.assertLogs("module.browser_pool", level="WARNING"):
+            self.assertIs(pool.instance_for("khong-co"), pool.instances["main"])
+
+    def test_submit_runs_slots_in_parallel(self):
+        instance = BrowserInstance("acc", 9240, Path("/tmp/profile_acc"), max_concurrency=2)
+        both_running = threading.Barrier(2, timeout=2)
+        used = []
+
+        def fake_extract(order_no, supervisor=None, on_html=None):
+            used.append(supervisor)
+            both_running.wait()  # Chỉ qua được khi hai order chạy cùng lúc
+            return {"order": order_no}
+
+        with mock.patch("module.browser_pool.extract_order_info", fake_extract):
+            futures = [BrowserPool([instance]).submit(n) for n in ("1", "2")]
+            self.assertEqual([f.result(3) for f in futures], [{"order": "1"}, {"order": "2"}])
+        self.assertEqual(set(used), set(instance.sessions))
+        self.assertEqual(instance.metrics()["pending"], 0)
+
+    def test_stop_all_stops_supervisors_and_queue(self):
+        instance = BrowserInstance("acc", 9240, Path("/tmp/profile_acc"))
+        started, release = threading.Event(), threading.Event()
+
+        def slow_extract(order_no, supervisor=None, on_html=None):
+            started.set()
+            return release.wait(2)
+
+        with mock.patch("module.browser_pool.extract_order_info", slow_extract), \
+                mock.patch("module.driver_supervisor.DriverSupervisor.stop") as stop:
+            pool = BrowserPool([instance])
+            running, queued = pool.submit("1"), pool.submit("2")
+            self.assertTrue(started.wait(2))
+            pool.stop_all()
+            release.set()
+            self.assertTrue(queued.cancelled())  # Order còn chờ bị hủy khi thoát
+            self.assertTrue(running.result(3))
+        stop.assert_called_once_with()
+        with self.assertRaises(RuntimeError):
+            pool.submit("3")
+
+    def test_trading_loop_exit_stops_supervisors(self):
+        """Vòng lặp trading thoát (kể cả do lỗi) thì supervisor của tài khoản phải dừng"""
+        p2p = P2PBinance.__new__(P2PBinance)
+        p2p.account = "acc"
+        p2p.browser_pool = mock.Mock()
+        p2p._trading_loop = mock.Mock(side_effect=RuntimeError("mất kết nối"))
+        with self.assertRaises(RuntimeError):
+            p2p.transactions_trading()
+        browser = p2p.browser_pool.instance_for.return_value
+        browser.start.assert_called_once_with()
+        browser.stop.assert_called_once_with()
+
+
+class TestSharedChromeTabs(unittest.TestCase):
+    def test_sessions_do_not_switch_into_each_others_tab(self):
+        """Hai session cùng Chrome mở tab xen kẽ: mỗi session chỉ đọc tab của mình"""
+        chrome = FakeChrome()
+        session_a, session_b = FakeSession(chrome), FakeSession(chrome)
+        results = {}
+        # Session B mở tab của order khác ngay sau khi A mở tab
+        chrome.on_open = lambda: (session_b.new_window("tab"),
+                                  session_b.get("https://p2p.binance.com/en/fiatOrderDetail?orderNo=B"))
+        with mock.patch("module.selenium_get_info.time"):
+            results["A"] = _scrape_order_page(session_a, "A")
+        self.assertEqual(results["A"]["Full Name"], "SELLER A")
+        self.assertEqual(session_a.current_window_handle, "main")
+        self.assertIn(session_b.current_window_handle, chrome.handles)  # Tab của B không bị đóng nhầm
+
+
+if __name__ == '__main__':
+    unittest.main()
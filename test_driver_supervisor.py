@@ -0,0 +1,112 @@
+import sys
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Thêm thư mục gốc vào PYTHONPATH
+root_dir = str(Path(__file__).parent)
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+
+from module.driver_supervisor import DriverSupervisor, DriverUnavailableError
+
+
+class FakeDriver:
+    def __init__(self):
+        self.alive = True
+        self.probes = 0
+        self.quit_calls = 0
+
+    @property
+    def window_handles(self):
+        self.probes += 1
+        if not self.alive:
+            raise RuntimeError("invalid session id")
+        return ["tab"]
+
+    def quit(self):
+        self.quit_calls += 1
+        raise RuntimeError("session đã chết")  # quit lỗi vẫn phải được bỏ qua
+
+
+class TestDriverSupervisor(unittest.TestCase):
+    def setUp(self):
+        self.drivers = []
+        self.fail_factory = False
+        self.devtools = True
+        self.supervisor = DriverSupervisor(self.factory, interval=0.05, name="test")
+        patcher = mock.patch.object(self.supervisor, "_ping_devtools", lambda: self.devtools)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.supervisor.stop)
+
+    def factory(self):
+        if self.fail_factory:
+            raise RuntimeError("Chrome chưa mở")
+        driver = FakeDriver()
+        self.drivers.append(driver)
+        return driver
+
+    def test_reconnect_dead_session(self):
+        self.supervisor._check_once()
+        self.assertTrue(self.supervisor.is_ready())
+        first = self.drivers[0]
+        first.alive = False
+        self.supervisor._check_once()
+        self.assertEqual(len(self.drivers), 2)
+        self.assertEqual(first.quit_calls, 1)
+        self.assertIs(self.supervisor.get_driver(), self.drivers[1])
+        metrics = self.supervisor.metrics()
+        self.assertEqual(metrics["reconnect_count"], 2)
+        self.assertEqual(metrics["dead_sessions"], 1)
+        self.assertTrue(metrics["devtools_alive"])
+        self.assertIsNotNone(metrics["avg_reconnect_ms"])
+
+    def test_devtools_down_quits_driver(self):
+        self.supervisor._check_once()
+        self.devtools = False
+        self.supervisor._check_once()
+        self.assertFalse(self.supervisor.is_ready())
+        self.assertEqual(self.drivers[0].quit_calls, 1)
+        self.assertFalse(self.supervisor.metrics()["devtools_alive"])
+        # Chrome mở lại: kết nối lại ở chu kỳ sau
+        self.devtools = True
+        self.supervisor._check_once()
+        self.assertEqual(self.supervisor.metrics()["reconnect_count"], 2)
+
+    def test_no_probe_during_lease(self):
+        self.supervisor._check_once()
+        driver = self.drivers[0]
+        with self.supervisor.lease() as leased:
+            self.assertIs(leased, driver)
+            probes = driver.probes
+            driver.alive = False
+            checker = threading.Thread(target=self.supervisor._check_once)
+            checker.start()
+            checker.join(2)
+            self.assertEqual(driver.probes, probes)
+            self.assertTrue(self.supervisor.is_ready())
+        self.supervisor._check_once()
+        self.assertEqual(driver.quit_calls, 1)
+        self.assertEqual(len(self.drivers), 2)
+
+    def test_background_reconnect_after_mark_dead(self):
+        self.supervisor.start()
+        self.assertTrue(self.supervisor.wait_ready(2))
+        self.supervisor.mark_dead("test")
+        self.assertIs(self.supervisor.get_driver(timeout=2), self.drivers[-1])
+        self.assertEqual(len(self.drivers), 2)
+        self.assertEqual(self.drivers[0].quit_calls, 1)
+
+    def test_failed_reconnect(self):
+        self.fail_factory = True
+        self.supervisor._check_once()
+        self.assertEqual(self.supervisor.metrics()["failed_reconnects"], 1)
+        self.supervisor.start()
+        with self.assertRaises(DriverUnavailableError):
+            self.supervisor.get_driver(timeout=0.2)
+
+
+if __name__ == '__main__':
+    unittest.main()
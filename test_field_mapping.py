@@ -0,0 +1,72 @@
+import unittest
+import sys
+from pathlib import Path
+
+# Thêm thư mục gốc vào PYTHONPATH
+root_dir = str(Path(__file__).parent)
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+
+from module.field_mapping import FieldMapper, normalize_label
+
+
+class TestFieldMapping(unittest.TestCase):
+    def setUp(self):
+        self.mapper = FieldMapper()
+
+    def test_normalize_label(self):
+        """Chuẩn hóa bỏ dấu, viết thường, bỏ dấu ':'"""
+        self.assertEqual(normalize_label("  Số  tài khoản: "), "so tai khoan")
+        self.assertEqual(normalize_label("Tên ngân hàng"), "ten ngan hang")
+        self.assertEqual(normalize_label("Đơn"), "don")
+
+    def test_english_labels(self):
+        """Nhãn tiếng Anh giữ nguyên kết quả như regex cũ"""
+        data = {
+            "Fiat amount": "1.000.000",
+            "Reference message": "ABC123",
+            "Name": "NGUYEN VAN A",
+            "Bank Card/Account Number": "0123456789",
+            "Bank name": "Vietcombank",
+            "Price": "25.000",
+        }
+        result = self.mapper.map_fields(data)
+        self.assertEqual(result, {
+            "Fiat amount": "1.000.000",
+            "Reference message": "ABC123",
+            "Full Name": "NGUYEN VAN A",
+            "Bank Card": "0123456789",
+            "Bank Name": "Vietcombank",
+        })
+
+    def test_vietnamese_labels(self):
+        """Nhãn giao diện tiếng Việt"""
+        data = {
+            "Số tiền pháp định": "500.000",
+            "Nội dung tham chiếu": "XYZ",
+            "Họ và tên": "TRAN THI B",
+            "Số tài khoản": "987654321",
+            "Tên ngân hàng": "MB Bank",
+        }
+        result = self.mapper.map_fields(data)
+        self.assertEqual(set(result), {"Fiat amount", "Reference message", "Full Name",
+                                       "Bank Card", "Bank Name"})
+        self.assertEqual(self.mapper.misses, 0)
+
+    def test_metrics(self):
+        """Nhãn không nhận ra được thống kê trong metrics"""
+        self.mapper.resolve("Fiat amount")
+        self.mapper.resolve("Bank Card Number (IBAN)")
+        self.mapper.resolve("Bank Card Number (IBAN)")
+        self.mapper.resolve("Order time")
+        metrics = self.mapper.metrics()
+        self.assertEqual(metrics["lookups"], 4)
+        self.assertEqual(metrics["dict_hits"], 1)
+        self.assertEqual(metrics["regex_hits"], 2)
+        self.assertEqual(metrics["misses"], 1)
+        self.assertEqual(metrics["unknown_labels"], {"Order time": 1})
+        self.assertAlmostEqual(metrics["hit_rate"], 0.75)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Thêm thư mục gốc vào PYTHONPATH
+root_dir = str(Path(__file__).parent)
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+
+from module import json_codec
+from module.json_codec import CodecError
+
+SAMPLE = [{"type": "buy", "order_number": "1", "amount": 1500000, "timestamp": 1718000000.5,
+           "account_name": "NGUYỄN VĂN A", "qr_hash": None, "ok": True}]
+
+
+class TestJsonCodec(unittest.TestCase):
+    def test_backends_round_trip(self):
+        self.assertIn("json", json_codec.available())
+        for name in json_codec.available():
+            codec = json_codec.get_codec(name)
+            data = codec.dumps(SAMPLE)
+            self.assertIsInstance(data, bytes)
+            self.assertIn("NGUYỄN".encode("utf-8"), data)  # không escape tiếng Việt
+            self.assertNotIn(b"\n", data)  # dạng gọn
+            self.assertEqual(codec.loads(data), SAMPLE, name)
+            self.assertIn(b"\n", codec.dumps(SAMPLE, pretty=True))
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            json_codec.get_codec("khong-co")
+
+    def test_schema_validation(self):
+        data = json_codec.dumps(SAMPLE)
+        self.assertEqual(json_codec.loads(data, schema=list[dict]), SAMPLE)
+        with self.assertRaises(CodecError):
+            json_codec.loads(data, schema=dict)
+        with self.assertRaises(CodecError):
+            json_codec.loads(b'[1, 2]', schema=list[dict])
+        self.assertEqual(json_codec.loads(b'{"a": 1}', schema=dict[str, float]), {"a": 1})
+
+    def test_invalid_json(self):
+        for data in (b'[{"a": 1', b'', "không phải json"):
+            with self.assertRaises(CodecError):
+                json_codec.loads(data)
+        # CodecError là ValueError: code cũ bắt ValueError vẫn hoạt động
+        self.assertTrue(issubclass(CodecError, ValueError))
+
+    def test_decode_response(self):
+        response = mock.Mock(content='{"ok": true, "result": {"text": "Chào"}}'.encode("utf-8"))
+        self.assertEqual(json_codec.decode_response(response, schema=dict)["result"]["text"], "Chào")
+
+
+if __name__ == '__main__':
+    unittest.main()
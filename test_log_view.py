@@ -0,0 +1,76 @@
+import logging
+import sys
+import threading
+import unittest
+from pathlib import Path
+
+# Thêm thư mục gốc vào PYTHONPATH
+root_dir = str(Path(__file__).parent)
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+
+from PyQt5.QtWidgets import QApplication
+
+from log_view import LogView, RingLogHandler
+
+
+class TestLogView(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.handler = RingLogHandler(max_lines=5)
+        self.handler.setFormatter(logging.Formatter('%(message)s'))
+        self.logger = logging.getLogger("test_log_view")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        self.logger.addHandler(self.handler)
+        self.view = LogView(self.handler, max_lines=10, interval_ms=1000)
+
+    def tearDown(self):
+        self.view.stop()
+        self.logger.removeHandler(self.handler)
+
+    def test_batched_flush(self):
+        """Dòng log chỉ xuất hiện khi flush, và cả lô được thêm một lần"""
+        for i in range(3):
+            self.logger.info(f"dòng {i}")
+        self.assertEqual(self.view.toPlainText(), "")
+        self.view.flush()
+        self.assertEqual(self.view.toPlainText().splitlines(), ["dòng 0", "dòng 1", "dòng 2"])
+
+    def test_ring_buffer_drops_oldest(self):
+        for i in range(8):
+            self.logger.info(f"dòng {i}")
+        self.view.flush()
+        lines = self.view.toPlainText().splitlines()
+        self.assertEqual(lines[-5:], [f"dòng {i}" for i in range(3, 8)])
+        self.assertIn("bỏ qua 3", lines[0])
+
+    def test_view_line_limit(self):
+        """Khung log không vượt quá số dòng tối đa"""
+        for _ in range(4):
+            for i in range(5):
+                self.logger.info(f"dòng {i}")
+            self.view.flush()
+        self.assertEqual(self.view.blockCount(), 10)
+
+    def test_debug_disabled_not_formatted(self):
+        """Log DEBUG bị tắt thì không format và không vào buffer"""
+        class Boom:
+            def __str__(self):
+                raise AssertionError("không được format")
+        self.logger.debug("giá trị %s", Boom())
+        self.assertEqual(self.handler.drain(), ([], 0))
+
+    def test_emit_from_other_thread(self):
+        thread = threading.Thread(target=lambda: self.logger.info("từ thread khác"))
+        thread.start()
+        thread.join()
+        self.view.flush()
+        self.assertEqual(self.view.toPlainText(), "từ thread khác")
+
+
+if __name__ == '__main__':
+    unittest.main()
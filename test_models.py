@@ -0,0 +1,86 @@
+import shutil
+import sys
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+# Thêm thư mục gốc vào PYTHONPATH
+root_dir = str(Path(__file__).parent)
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+
+from module.models import Order, OrderSide, OrderStatus, Transaction, parse_fiat
+from module.transaction_storage import TransactionStorage
+
+API_ROW = {
+    "orderNumber": "22712345", "tradeType": "BUY", "orderStatus": "BUYER_PAYED",
+    "totalPrice": "1500000.00", "unitPrice": "25950", "amount": "57.80346820",
+    "asset": "USDT", "fiat": "VND", "fiatSymbol": "₫", "createTime": 1718000000000,
+}
+
+
+class TestModels(unittest.TestCase):
+    def test_order_from_api(self):
+        order = Order.from_api(API_ROW)
+        self.assertIs(order.side, OrderSide.BUY)
+        self.assertIs(order.status, OrderStatus.BUYER_PAYED)
+        self.assertEqual(order.fiat_amount, 1500000)
+        self.assertEqual(order.message(),
+                         "Status: BUYER PAYED\nType: BUY\nPrice: ₫25950\n"
+                         "Fiat Amount: 1500000.0 VND\nCrypto Amount: 57.8034682 USDT\nOrder No.: 22712345")
+        self.assertFalse(hasattr(order, "__dict__"))
+
+    def test_unknown_status_is_kept(self):
+        order = Order.from_api(dict(API_ROW, orderStatus="NEW_STATUS"))
+        self.assertEqual(order.status.value, "NEW_STATUS")
+        self.assertEqual(order.status, "NEW_STATUS")
+        self.assertEqual(order.status.label, "NEW STATUS")
+
+    def test_parse_fiat(self):
+        self.assertEqual(parse_fiat("1,500,000 ₫"), 1500000)
+        self.assertEqual(parse_fiat("1.500.000"), 1500000)
+        self.assertEqual(parse_fiat(2500000.4), 2500000)
+        self.assertEqual(parse_fiat(None), 0)
+
+    def test_transaction_round_trip(self):
+        data = {"type": "SELL", "order_number": "1", "amount": "2,000,000", "order_status": "TRADING",
+                "timestamp": 1718000000.5, "qr_hash": "abc", "legacy_field": 1}
+        transaction = Transaction.from_dict(data)
+        self.assertIs(transaction.side, OrderSide.SELL)
+        self.assertIs(transaction.order_status, OrderStatus.TRADING)
+        self.assertEqual(transaction.amount, 2000000)
+        self.assertEqual(transaction.extra, {"legacy_field": 1})
+        self.assertEqual(transaction.to_dict(), {
+            "type": "sell", "order_number": "1", "amount": 2000000, "timestamp": 1718000000.5,
+            "qr_hash": "abc", "order_status": "TRADING", "legacy_field": 1,
+        })
+        self.assertEqual(Transaction.from_dict(transaction.to_dict()), transaction)
+        self.assertIs(OrderSide.parse("bán"), OrderSide.SELL)
+
+
+class TestStorageSchema(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = "test_models_storage"
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+        self.storage = TransactionStorage(self.test_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_save_transaction_normalizes(self):
+        transaction = Transaction(order_number="9", side=OrderSide.BUY, amount=750000,
+                                  bank_name="VCB", timestamp=1718000000)
+        saved = self.storage.save_transaction(transaction, b"qr", OrderStatus.TRADING.value)
+        self.assertTrue(saved["qr_path"])
+        # Dict cũ vẫn được chấp nhận và được chuẩn hóa theo schema
+        self.storage.save_transaction({"type": "SELL", "order_number": "10", "amount": "1,000",
+                                       "timestamp": 1718000001})
+        day = datetime.fromtimestamp(1718000000)
+        stored = self.storage.get_transactions_by_date_range(day, day)
+        self.assertEqual([(t["type"], t["amount"]) for t in stored], [("buy", 750000), ("sell", 1000)])
+        self.assertNotIn("qr_path", stored[0])
+        self.assertEqual(Transaction.from_dict(stored[0]).order_status, OrderStatus.TRADING)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+import unittest
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Thêm thư mục gốc vào PYTHONPATH
+root_dir = str(Path(__file__).parent)
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+
+from module.notification_dispatcher import NotificationChannel, NotificationDispatcher
+
+
+class FakeBot:
+    """Bot giả lập: ghi lại tin nhắn, có thể chặn hoặc trả lỗi"""
+    def __init__(self, results=None, gate=None):
+        self.messages = []
+        self.results = list(results or [])
+        self.gate = gate
+
+    def send_message(self, text):
+        if self.gate is not None:
+            self.gate.wait()
+        self.messages.append(text)
+        if self.results:
+            return self.results.pop(0)
+        return {"ok": True, "status": 204}
+
+    def send_photo(self, image, caption=""):
+        self.messages.append(("photo", caption))
+        return {"ok": True, "status": 204}
+
+
+class TestNotificationDispatcher(unittest.TestCase):
+    def test_send_does_not_block_on_slow_channel(self):
+        """Webhook treo không làm chậm người gửi"""
+        gate = threading.Event()
+        dispatcher = NotificationDispatcher()
+        bot = FakeBot(gate=gate)
+        dispatcher.add_channel("slow", bot)
+        start = time.time()
+        for i in range(20):
+            dispatcher.send_message(f"msg {i}")
+        self.assertLess(time.time() - start, 0.5)
+        gate.set()
+        self.assertTrue(dispatcher.flush(timeout=5))
+        delivered = "\n\n".join(bot.messages).split("\n\n")
+        self.assertEqual(delivered, [f"msg {i}" for i in range(20)])
+        dispatcher.close(timeout=1)
+
+    def test_merge_when_queue_full(self):
+        """Hàng đợi đầy thì gộp tin nhắn text thay vì chặn"""
+        gate = threading.Event()
+        bot = FakeBot(gate=gate)
+        channel = NotificationChannel("full", bot, max_queue=2, max_length=100)
+        for i in range(6):
+            channel.submit("text", f"m{i}")
+        gate.set()
+        self.assertTrue(channel.flush(timeout=5))
+        delivered = "\n\n".join(bot.messages)
+        for i in range(6):
+            self.assertIn(f"m{i}", delivered)
+        self.assertGreater(channel.metrics()["merged"], 0)
+        channel.close(timeout=1)
+
+    def test_retry_with_backoff(self):
+        """Lỗi tạm thời (503) được thử lại, lỗi 400 thì không"""
+        bot = FakeBot(results=[{"ok": False, "status": 503}, {"ok": True, "status": 204}])
+        channel = NotificationChannel("retry", bot, backoff=0.01)
+        channel.submit("text", "hello")
+        self.assertTrue(channel.flush(timeout=5))
+        self.assertEqual(channel.metrics()["retries"], 1)
+        self.assertEqual(channel.metrics()["sent"], 1)
+
+        bot.results = [{"ok": False, "status": 400, "error": "bad request"}]
+        channel.submit("text", "bad")
+        self.assertTrue(channel.flush(timeout=5))
+        self.assertEqual(channel.metrics()["failed"], 1)
+        self.assertEqual(channel.metrics()["retries"], 1)
+        channel.close(timeout=1)
+
+    def test_coalesce_same_order(self):
+        """Các thay đổi trạng thái của cùng order chưa gửi được gộp, không mất trạng thái"""
+        gate = threading.Event()
+        bot = FakeBot(gate=gate)
+        channel = NotificationChannel("coalesce", bot)
+        channel.submit("text", "blocker")
+        time.sleep(0.05)
+        channel.submit("text", "Status: TRADING\nOrder No.: 1", key="1")
+        channel.submit("text", "Status: BUYER_PAYED\nOrder No.: 1", key="1")
+        channel.submit("text", "Status: COMPLETED\nOrder No.: 1", key="1")
+        gate.set()
+        self.assertTrue(channel.flush(timeout=5))
+        self.assertEqual(len(bot.messages), 2)
+        self.assertTrue(bot.messages[1].startswith("Status: COMPLETED"))
+        self.assertIn("Status: TRADING → Status: BUYER_PAYED", bot.messages[1])
+        self.assertEqual(channel.metrics()["coalesced"], 2)
+        channel.close(timeout=1)
+
+    def test_pack_when_queue_deep(self):
+        """Hàng đợi sâu thì đóng gói nhiều order vào một lần gửi"""
+        gate = threading.Event()
+        bot = FakeBot(gate=gate)
+        channel = NotificationChannel("pack", bot, pack_threshold=3)
+        channel.submit("text", "blocker")
+        time.sleep(0.05)
+        for i in range(5):
+            channel.submit("text", f"order {i}", key=str(i))
+        gate.set()
+        self.assertTrue(channel.flush(timeout=5))
+        self.assertEqual(len(bot.messages), 2)
+        self.assertEqual(bot.messages[1], "\n\n".join(f"order {i}" for i in range(5)))
+        channel.close(timeout=1)
+
+    def test_respect_retry_after(self):
+        """429 chờ theo retry_after và không tính vào số lần thử lỗi"""
+        bot = FakeBot(results=[{"ok": False, "status": 429, "retry_after": 0.2}] * 2)
+        channel = NotificationChannel("limit", bot, max_retries=0)
+        start = time.time()
+        channel.submit("text", "hello")
+        self.assertTrue(channel.flush(timeout=5))
+        self.assertGreaterEqual(time.time() - start, 0.4)
+        self.assertEqual(channel.metrics()["sent"], 1)
+        self.assertEqual(channel.metrics()["rate_limited"], 2)
+        channel.close(timeout=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import json
+import unittest
+import sys
+from pathlib import Path
+from unittest import mock
+
+# Thêm thư mục gốc vào PYTHONPATH
+root_dir = str(Path(__file__).parent)
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+
+from notification_stub import NotificationStubServer
+from module.notifier_registry import NotifierRegistry, RoutingRule
+
+
+class TestRoutingRule(unittest.TestCase):
+    def test_matches(self):
+        rule = RoutingRule(trade_types=["BUY"], statuses=["TRADING"], min_amount=1000000)
+        self.assertTrue(rule.matches("BUY", "TRADING", 2000000))
+        self.assertTrue(rule.matches("buy", "trading", "₫ 1,500,000.00"))
+        self.assertFalse(rule.matches("SELL", "TRADING", 2000000))
+        self.assertFalse(rule.matches("BUY", "COMPLETED", 2000000))
+        self.assertFalse(rule.matches("BUY", "TRADING", 500000))
+        # Tin nhắn hệ thống luôn được gửi
+        self.assertTrue(rule.matches())
+
+
+class TestNotifierRegistry(unittest.TestCase):
+    def setUp(self):
+        self.stub = NotificationStubServer().start()
+        spec = [
+            {"name": "big-buy", "type": "discord", "webhook": self.stub.discord_webhook("big"),
+             "trade_types": ["BUY"], "min_amount": 1000000},
+            {"name": "ops", "type": "telegram", "token": "T", "chat_id": "42",
+             "base_url": self.stub.url, "statuses": ["TRADING"], "photos": False},
+        ]
+        self.registry = NotifierRegistry.from_config(json.dumps(spec))
+
+    def tearDown(self):
+        self.registry.close(timeout=1)
+        self.stub.stop()
+
+    def test_routing(self):
+        """Tin nhắn chỉ tới các kênh có luật khớp"""
+        self.registry.send_message("big buy", trade_type="BUY", status="TRADING", amount=5000000)
+        self.registry.send_message("small sell", trade_type="SELL", status="COMPLETED", amount=100)
+        self.registry.send_message("bot stopped")
+        self.assertTrue(self.registry.flush(timeout=5))
+
+        discord = [r["fields"]["content"] for r in self.stub.requests_to("/api/webhooks/big")]
+        telegram = [r["fields"]["text"] for r in self.stub.requests_to("/botT/sendMessage")]
+        self.assertEqual(sorted(discord), ["big buy", "bot stopped"])
+        self.assertEqual(sorted(telegram), ["big buy", "bot stopped"])
+        self.assertTrue(all(r["fields"]["chat_id"] == "42"
+                            for r in self.stub.requests_to("/botT/sendMessage")))
+
+    def test_send_photo(self):
+        """Ảnh QR chỉ tới kênh nhận ảnh"""
+        self.registry.send_photo(b"\x89PNG fake", "QR", trade_type="BUY", status="TRADING",
+                                 amount=2000000)
+        self.assertTrue(self.registry.flush(timeout=5))
+        photos = self.stub.requests_to("/api/webhooks/big")
+        self.assertEqual(len(photos), 1)
+        self.assertEqual(photos[0]["fields"]["file"], len(b"\x89PNG fake"))
+        self.assertEqual(self.stub.requests_to("/botT/sendPhoto"), [])
+
+    def test_rate_limited_channel_retries(self):
+        """429 từ webhook được chờ và gửi lại, không mất tin"""
+        self.stub.fail_next(429, retry_after=0.1)
+        self.registry.send_message("after limit", trade_type="BUY", status="TRADING", amount=2000000)
+        self.assertTrue(self.registry.flush(timeout=5))
+        metrics = self.registry.metrics()
+        self.assertEqual(metrics["big-buy"]["sent"] + metrics["ops"]["sent"], 2)
+        self.assertEqual(metrics["big-buy"]["rate_limited"] + metrics["ops"]["rate_limited"], 1)
+
+
+class TestFromConfig(unittest.TestCase):
+    @mock.patch("module.notifier_registry.TELEGRAM_TOKEN", None)
+    @mock.patch("module.notifier_registry.DISCORD_WEBHOOK", "http://127.0.0.1:9/api/webhooks/env")
+    def test_malformed_spec_falls_back_to_env(self):
+        for spec in ('[{"name": "x", "type": "discord"', '{"type": "discord"}'):
+            with self.assertLogs("module.notifier_registry", level="ERROR"):
+                registry = NotifierRegistry.from_config(spec)
+            self.assertEqual(list(registry.channels), ["discord"])
+            registry.close(timeout=1)
+
+    def test_invalid_entry_skipped(self):
+        spec = [{"name": "bad", "type": "fax"},
+                {"name": "ok", "type": "discord", "webhook": "http://127.0.0.1:9/api/webhooks/ok"}]
+        with self.assertLogs("module.notifier_registry", level="ERROR"):
+            registry = NotifierRegistry.from_config(json.dumps(spec))
+        self.assertEqual(list(registry.channels), ["ok"])
+        registry.close(timeout=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
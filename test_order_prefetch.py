@@ -0,0 +1,115 @@
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Thêm thư mục gốc vào PYTHONPATH
+root_dir = str(Path(__file__).parent)
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+
+from module.binance_p2p import P2PBinance
+from module.order_prefetch import PRE_PAYMENT_STATUSES, OrderPrefetcher
+
+RAW = {"Fiat amount": 1500000.0, "Full Name": "NGUYỄN VĂN A", "Bank Card": "0071000123",
+       "Bank Name": "Vietcombank", "Reference message": "P2P 1"}
+
+
+class TestOrderPrefetcher(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+        self.result = RAW
+        self.bank = mock.patch("module.order_prefetch.get_nganhang_id", return_value="970436")
+        self.bank.start()
+        self.addCleanup(self.bank.stop)
+
+    def scrape(self, order_number):
+        self.calls.append(order_number)
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+    def test_hit_skips_scrape(self):
+        prefetcher = OrderPrefetcher(self.scrape)
+        prefetcher.prefetch("1").result(2)
+        prefetcher.prefetch("1")  # Đã có kết quả còn hạn: không scrape lại
+        result = prefetcher.get("1")
+        self.assertEqual(result["raw"], RAW)
+        self.assertEqual(result["acqid"], "970436")
+        self.assertEqual(self.calls, ["1"])
+        self.assertEqual(prefetcher.stats()["hits"], 1)
+
+    def test_miss_without_prefetch(self):
+        prefetcher = OrderPrefetcher(self.scrape)
+        self.assertIsNone(prefetcher.get("2"))
+        self.assertEqual(self.calls, [])  # get không tự scrape: người gọi scrape đồng bộ
+        self.assertEqual(prefetcher.stats()["misses"], 1)
+
+    def test_ttl_expiry(self):
+        prefetcher = OrderPrefetcher(self.scrape, ttl=10)
+        prefetcher.prefetch("3").result(2)
+        with mock.patch("module.order_prefetch.time.time", return_value=time.time() + 11):
+            self.assertIsNone(prefetcher.get("3"))
+        self.assertEqual(prefetcher.stats()["size"], 0)
+
+    def test_failed_prefetch_falls_back(self):
+        prefetcher = OrderPrefetcher(self.scrape)
+        self.result = RuntimeError("Chrome không phản hồi")
+        prefetcher.prefetch("4")
+        with self.assertLogs("module.order_prefetch", level="WARNING"):
+            self.assertIsNone(prefetcher.get("4"))
+        self.assertEqual(prefetcher.stats()["size"], 0)
+        # Scrape rỗng cũng không được dùng; lần prefetch sau scrape lại
+        self.result = {}
+        prefetcher.prefetch("4")
+        self.assertIsNone(prefetcher.get("4"))
+        self.assertEqual(self.calls, ["4", "4"])
+
+    def test_get_waits_for_running_prefetch(self):
+        started, release = threading.Event(), threading.Event()
+
+        def slow_scrape(order_number):
+            started.set()
+            release.wait(2)
+            return RAW
+
+        prefetcher = OrderPrefetcher(slow_scrape)
+        prefetcher.prefetch("5")
+        started.wait(2)
+        threading.Timer(0.05, release.set).start()
+        self.assertEqual(prefetcher.get("5")["raw"], RAW)
+
+    def test_prefetch_only_before_trading(self):
+        self.assertIn("PENDING", PRE_PAYMENT_STATUSES)
+        self.assertNotIn("TRADING", PRE_PAYMENT_STATUSES)
+
+
+class TestHandleBuyOrderPrefetch(unittest.TestCase):
+    def setUp(self):
+        self.bank = mock.patch("module.order_prefetch.get_nganhang_id", return_value="970436")
+        self.bank.start()
+        self.addCleanup(self.bank.stop)
+
+    def test_partial_prefetch_scrapes_again(self):
+        """Prefetch lúc PENDING thiếu trường: handle_buy_order scrape lại thay vì bỏ order"""
+        partial = {k: v for k, v in RAW.items() if k not in ("Bank Card", "Reference message")}
+        p2p = P2PBinance.__new__(P2PBinance)
+        p2p.logger = mock.Mock()
+        p2p.storage = mock.Mock(**{"get_transaction_by_order.return_value": None,
+                                   "save_transaction.return_value": None})
+        p2p.prefetcher = OrderPrefetcher(lambda order_number: partial)
+        p2p.scrape_order = mock.Mock(return_value=RAW)
+        p2p.prefetcher.prefetch("6").result(2)
+        with mock.patch("module.binance_p2p.get_nganhang_id", return_value=None), \
+                mock.patch("module.binance_p2p.generate_vietqr"):
+            p2p.handle_buy_order("6", "")
+        p2p.scrape_order.assert_called_once_with("6")
+        saved = p2p.storage.save_transaction.call_args[0][0]
+        self.assertEqual((saved.account_number, saved.reference), ("0071000123", "P2P 1"))
+        self.assertEqual(p2p.prefetcher.stats()["size"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
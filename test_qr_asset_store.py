@@ -0,0 +1,122 @@
+import os
+import shutil
+import sys
+import unittest
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+# Thêm thư mục gốc vào PYTHONPATH
+root_dir = str(Path(__file__).parent)
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+
+from module.qr_asset_store import QrAssetStore, content_hash
+from module.transaction_storage import TransactionStorage
+
+TODAY = date(2024, 3, 10)
+
+
+def ts(day: date, hour=12) -> float:
+    return datetime(day.year, day.month, day.day, hour).timestamp()
+
+
+class TestQrAssetStore(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path("test_qr_assets")
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+        self.store = QrAssetStore(self.test_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_put_dedupes(self):
+        h1 = self.store.put(b"qr-1")
+        h2 = self.store.put(b"qr-1")
+        self.assertEqual(h1, h2)
+        self.assertEqual(h1, content_hash(b"qr-1"))
+        self.assertEqual(len(list(self.store.loose_dir.rglob("*.png"))), 1)
+
+    def test_pack_random_access_and_reload(self):
+        hashes = [self.store.put(f"qr-{i}".encode() * (i + 1)) for i in range(5)]
+        self.assertEqual(self.store.pack_day(TODAY, hashes + hashes[:2]), 5)
+        self.assertEqual(self.store.remove_loose(hashes), 5)
+        self.assertEqual(list(self.store.loose_dir.rglob("*.png")), [])
+        reopened = QrAssetStore(self.test_dir)
+        for i in (3, 0, 4):
+            self.assertEqual(reopened.get(hashes[i]), f"qr-{i}".encode() * (i + 1))
+        path = reopened.path_for(hashes[2])
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(), b"qr-2" * 3)
+
+    def test_retention_keeps_hash_in_newer_pack(self):
+        shared = self.store.put(b"shared")
+        old_only = self.store.put(b"old")
+        self.store.pack_day(TODAY - timedelta(days=40), [shared, old_only])
+        self.store.pack_day(TODAY - timedelta(days=1), [shared])
+        self.store.remove_loose([shared, old_only])
+        self.assertEqual(self.store.apply_retention(30, TODAY), 1)
+        self.assertEqual(self.store.get(shared), b"shared")
+        self.assertIsNone(self.store.get(old_only))
+        self.assertEqual(self.store.apply_retention(0, TODAY), 0)
+
+
+class TestStorageQrCompaction(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path("test_qr_compaction")
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+        self.storage = TransactionStorage(str(self.test_dir))
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def save(self, order_number, day, qr):
+        return self.storage.save_transaction(
+            {"type": "buy", "order_number": order_number, "amount": 1, "timestamp": ts(day)}, qr, "TRADING")
+
+    def test_record_references_hash(self):
+        saved = self.save("A1", TODAY, b"qr-a")
+        self.assertTrue(os.path.exists(saved["qr_path"]))
+        stored = self.storage.get_transactions_by_date(TODAY)[0]
+        self.assertEqual(stored["qr_hash"], content_hash(b"qr-a"))
+        self.assertNotIn("qr_path", stored)
+        with open(self.storage.qr_path_for(stored), 'rb') as f:
+            self.assertEqual(f.read(), b"qr-a")
+
+    def test_compaction(self):
+        yesterday = TODAY - timedelta(days=1)
+        self.save("Y1", yesterday, b"qr-y1")
+        self.save("Y2", yesterday, b"qr-shared")
+        self.save("T1", TODAY, b"qr-shared")
+        # Bản ghi cũ lưu QR dạng file riêng
+        legacy = self.storage.qr_dir / "buy_legacy.png"
+        legacy.write_bytes(b"qr-legacy")
+        self.storage.save_transaction({"type": "buy", "order_number": "Y3", "amount": 1,
+                                       "timestamp": ts(yesterday), "qr_path": str(legacy)})
+
+        result = self.storage.compact_qr_assets(today=TODAY)
+        self.assertEqual(result["packed_days"], 1)
+        self.assertFalse(legacy.exists())
+        # Chỉ còn QR của ngày đang mở ở dạng file lẻ
+        loose = {p.stem for p in self.storage.qr_assets.loose_dir.rglob("*.png")}
+        self.assertEqual(loose, {content_hash(b"qr-shared")})
+
+        records = {t["order_number"]: t for t in self.storage.get_transactions_by_date(yesterday)}
+        self.assertEqual(records["Y3"]["qr_hash"], content_hash(b"qr-legacy"))
+        for number, data in (("Y1", b"qr-y1"), ("Y2", b"qr-shared"), ("Y3", b"qr-legacy")):
+            with open(self.storage.qr_path_for(records[number]), 'rb') as f:
+                self.assertEqual(f.read(), data)
+
+        # Chạy lại không đóng gói lại ngày không đổi
+        self.assertEqual(self.storage.compact_qr_assets(today=TODAY)["packed_days"], 0)
+
+    def test_retention(self):
+        old_day = TODAY - timedelta(days=10)
+        self.save("O1", old_day, b"qr-old")
+        result = self.storage.compact_qr_assets(retention_days=5, today=TODAY)
+        self.assertEqual(result["expired_packs"], 1)
+        record = self.storage.get_transactions_by_date(old_day)[0]
+        self.assertIsNone(self.storage.qr_path_for(record))
+
+
+if __name__ == '__main__':
+    unittest.main()
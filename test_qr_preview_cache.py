@@ -0,0 +1,90 @@
+import os
+import shutil
+import sys
+import time
+import unittest
+from pathlib import Path
+
+# Thêm thư mục gốc vào PYTHONPATH
+root_dir = str(Path(__file__).parent)
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+
+from PyQt5.QtGui import QColor, QImage
+from PyQt5.QtWidgets import QApplication
+
+from qr_preview_cache import QrPreviewCache
+
+
+class TestQrPreviewCache(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.test_dir = Path("test_qr_previews")
+        self.test_dir.mkdir(exist_ok=True)
+        self.cache = QrPreviewCache(size=100, max_items=2)
+        self.ready = []
+        self.cache.preview_ready.connect(self.ready.append)
+
+    def tearDown(self):
+        self.cache.shutdown()
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def make_qr(self, name, color="black", size=400):
+        path = str(self.test_dir / name)
+        image = QImage(size, size, QImage.Format_RGB32)
+        image.fill(QColor(color))
+        image.save(path, "PNG")
+        return path
+
+    def wait(self, predicate, timeout=3.0):
+        deadline = time.time() + timeout
+        while time.time() < deadline and not predicate():
+            self.app.processEvents()
+            time.sleep(0.01)
+        return predicate()
+
+    def test_get_scales_and_caches(self):
+        path = self.make_qr("a.png")
+        first = self.cache.get(path)
+        self.assertEqual((first.width(), first.height()), (100, 100))
+        self.assertIs(self.cache.get(path), first)
+        self.assertEqual(self.cache.stats, {"hits": 1, "sync_loads": 1, "prefetched": 0})
+
+    def test_missing_or_invalid_file(self):
+        self.assertIsNone(self.cache.get(str(self.test_dir / "khong_co.png")))
+        bad = self.test_dir / "bad.png"
+        bad.write_bytes(b"not an image")
+        self.assertIsNone(self.cache.get(str(bad)))
+
+    def test_changed_file_reloaded(self):
+        path = self.make_qr("b.png", "black")
+        first = self.cache.get(path)
+        self.make_qr("b.png", "white", size=200)
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        second = self.cache.get(path)
+        self.assertIsNot(second, first)
+        self.assertEqual(second.toImage().pixelColor(0, 0), QColor("white"))
+
+    def test_prefetch_in_background(self):
+        paths = [self.make_qr(f"p{i}.png") for i in range(2)]
+        self.cache.prefetch(paths + [None, str(self.test_dir / "khong_co.png")])
+        self.assertTrue(self.wait(lambda: sorted(self.ready) == sorted(paths)))
+        for path in paths:
+            self.assertIsNotNone(self.cache.cached(path))
+        self.cache.get(paths[0])
+        self.assertEqual(self.cache.stats["sync_loads"], 0)
+
+    def test_lru_bound(self):
+        paths = [self.make_qr(f"l{i}.png") for i in range(3)]
+        for path in paths:
+            self.cache.get(path)
+        self.assertIsNone(self.cache.cached(paths[0]))
+        self.assertIsNotNone(self.cache.cached(paths[2]))
+
+
+if __name__ == '__main__':
+    unittest.main()
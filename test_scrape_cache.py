@@ -0,0 +1,80 @@
+import os
+import shutil
+import sys
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Thêm thư mục gốc vào PYTHONPATH
+root_dir = str(Path(__file__).parent)
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+
+from module.scrape_cache import ScrapeCache
+from module.selenium_get_info import parse_order_html
+
+TEST_DIR = "test_scrape_cache"
+FULL = {"Fiat amount": 1500000.0, "Full Name": "NGUYỄN VĂN A", "Bank Card": "0071000123",
+        "Bank Name": "Vietcombank", "Reference message": "P2P 123"}
+HTML = ('<html><body><div class="subtitle6 text-textBuy">₫1,500,000</div><div class="relative w-full">'
+        '<div><div class="body2 text-tertiaryText">Full Name</div>'
+        '<div class="body2 text-right break-words">NGUYỄN VĂN A</div></div>'
+        '<div><div class="body2 text-tertiaryText">Bank Card</div>'
+        '<div class="body2 text-right break-words">0071000123</div></div>'
+        '</div></body></html>')
+
+
+class TestScrapeCache(unittest.TestCase):
+    def setUp(self):
+        shutil.rmtree(TEST_DIR, ignore_errors=True)
+        self.cache = ScrapeCache(TEST_DIR, ttl=100, incomplete_ttl=10)
+
+    def tearDown(self):
+        shutil.rmtree(TEST_DIR, ignore_errors=True)
+
+    def test_miss_then_hit(self):
+        self.assertIsNone(self.cache.get("1"))
+        entry = self.cache.put("1", FULL)
+        self.assertTrue(entry["complete"])
+        self.assertEqual(self.cache.get("1")["raw"], FULL)
+        # Cache khác cùng thư mục (bot khởi động lại) vẫn đọc được
+        self.assertTrue(ScrapeCache(TEST_DIR).get("1")["complete"])
+        self.assertEqual(list(Path(TEST_DIR).glob("*.tmp")), [])
+
+    def test_expiry_and_incomplete_ttl(self):
+        now = time.time()
+        partial = {k: v for k, v in FULL.items() if k != "Bank Card"}
+        entry = self.cache.put("2", partial)
+        self.assertEqual(entry["missing_fields"], ["Bank Card"])
+        self.assertAlmostEqual(entry["expires_at"], now + 10, delta=2)
+        # Lần scrape sau bổ sung trường còn thiếu, giữ trường đã có
+        entry = self.cache.put("2", {"Bank Card": "0071000123", "Full Name": ""})
+        self.assertTrue(entry["complete"])
+        self.assertEqual(entry["raw"]["Full Name"], "NGUYỄN VĂN A")
+        self.assertEqual(entry["scrape_count"], 2)
+        self.assertAlmostEqual(entry["expires_at"], now + 100, delta=2)
+        with mock.patch("module.scrape_cache.time.time", return_value=now + 101):
+            self.assertIsNone(self.cache.get("2"))
+            self.assertIsNotNone(self.cache.get("2", allow_expired=True))
+
+    def test_purge_expired(self):
+        self.cache.put("old", {"Full Name": "A"}, html=HTML)
+        self.cache.put("new", FULL, html=HTML)
+        (Path(TEST_DIR) / "orphan.html").write_text(HTML, encoding="utf-8")
+        with mock.patch("module.scrape_cache.time.time", return_value=time.time() + 50):
+            self.assertEqual(self.cache.purge_expired(), 1)
+        self.assertEqual(sorted(os.listdir(TEST_DIR)), ["new.html", "new.json"])
+
+    def test_replay_saved_html(self):
+        self.cache.put("3", {"Full Name": "NGUYỄN VĂN A"}, html=HTML)
+        raw, _ = parse_order_html(self.cache.load_html("3"))
+        self.assertEqual(raw["Fiat amount"], 1500000.0)
+        self.assertEqual(raw["Full Name"], "NGUYỄN VĂN A")
+        self.assertEqual(raw["Bank Card"], "0071000123")
+        self.assertTrue(self.cache.get("3")["has_html"])
+        self.assertIsNone(self.cache.load_html("khong-co"))
+
+
+if __name__ == '__main__':
+    unittest.main()
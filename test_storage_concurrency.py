@@ -0,0 +1,122 @@
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import threading
+import unittest
+from datetime import datetime
+from pathlib import Path
+from unittest import mock
+
+# Thêm thư mục gốc vào PYTHONPATH
+root_dir = str(Path(__file__).parent)
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+
+from module.transaction_storage import TransactionStorage
+
+TEST_DIR = "test_storage_concurrency"
+TIMESTAMP = datetime(2024, 1, 15, 12, 0).timestamp()
+
+
+def write_orders(prefix, count, base_dir=TEST_DIR):
+    storage = TransactionStorage(base_dir)
+    for i in range(count):
+        storage.save_transaction({"type": "buy", "order_number": f"{prefix}-{i}", "amount": i,
+                                  "timestamp": TIMESTAMP})
+        storage.update_used_orders(f"{prefix}-{i}", "COMPLETED")
+
+
+class TestStorageConcurrency(unittest.TestCase):
+    def setUp(self):
+        shutil.rmtree(TEST_DIR, ignore_errors=True)
+        self.day = datetime.fromtimestamp(TIMESTAMP)
+
+    def tearDown(self):
+        shutil.rmtree(TEST_DIR, ignore_errors=True)
+
+    def assert_all_saved(self, prefixes, count):
+        transactions = TransactionStorage(TEST_DIR).get_transactions_by_date(self.day)
+        numbers = {t["order_number"] for t in transactions}
+        expected = {f"{p}-{i}" for p in prefixes for i in range(count)}
+        self.assertEqual(numbers, expected)
+        self.assertEqual(len(transactions), len(expected))
+        self.assertTrue(all(t["order_status"] == "COMPLETED" for t in transactions))
+
+    def test_threads_with_separate_instances(self):
+        """Nhiều instance (như màn hình và P2PBinance) ghi song song không mất cập nhật"""
+        prefixes = [f"T{n}" for n in range(6)]
+        threads = [threading.Thread(target=write_orders, args=(p, 15)) for p in prefixes]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assert_all_saved(prefixes, 15)
+
+    def test_processes(self):
+        """Hai process ghi cùng thư mục được tuần tự hóa bằng khóa file"""
+        ctx = multiprocessing.get_context("spawn")
+        prefixes = ["P0", "P1"]
+        processes = [ctx.Process(target=write_orders, args=(p, 10, os.path.abspath(TEST_DIR)))
+                     for p in prefixes]
+        for p in processes:
+            p.start()
+        for p in processes:
+            p.join(60)
+            self.assertEqual(p.exitcode, 0)
+        self.assert_all_saved(prefixes, 10)
+
+    def test_snapshot_reads(self):
+        storage = TransactionStorage(TEST_DIR)
+        write_orders("S", 3)
+        engine = storage._engine
+        first = storage.get_transactions_by_date(self.day)
+        parses = engine.stats["parses"]
+        # Người gọi sửa kết quả không ảnh hưởng snapshot
+        first[0]["order_status"] = "SỬA"
+        first.clear()
+        second = storage.get_transactions_by_date(self.day)
+        self.assertEqual(engine.stats["parses"], parses)
+        self.assertEqual(len(second), 3)
+        self.assertTrue(all(t["order_status"] == "COMPLETED" for t in second))
+
+    def test_external_write_reparsed(self):
+        storage = TransactionStorage(TEST_DIR)
+        write_orders("E", 1)
+        storage.get_transactions_by_date(self.day)
+        date_file = storage.date_file_path(self.day)
+        with open(date_file, 'w', encoding='utf-8') as f:
+            json.dump([{"order_number": "khác", "timestamp": TIMESTAMP, "padding": "x" * 10}], f)
+        self.assertEqual([t["order_number"] for t in storage.get_transactions_by_date(self.day)], ["khác"])
+
+    def test_group_commit(self):
+        """Các lần ghi dồn dập dùng chung fsync, dữ liệu đã xuống file khi hàm ghi trả về"""
+        storage = TransactionStorage(TEST_DIR)
+        engine = storage._engine
+        writes, commits = engine.stats["writes"], engine.stats["commits"]
+        with mock.patch.object(type(engine), "GROUP_COMMIT_WINDOW", 0.05):
+            self.test_threads_with_separate_instances()
+        self.assertLess(engine.stats["commits"] - commits, (engine.stats["writes"] - writes) / 2)
+        date_file = storage.date_file_path(self.day)
+        with open(date_file, encoding='utf-8') as f:
+            self.assertEqual(len(json.load(f)), 90)
+        self.assertEqual(list(Path(TEST_DIR).glob("*.tmp")), [])
+
+    def test_failed_commit_keeps_old_file(self):
+        """Lỗi giữa chừng (fsync/rename) không làm hỏng file ngày đang có"""
+        storage = TransactionStorage(TEST_DIR)
+        write_orders("A", 2)
+        date_file = storage.date_file_path(self.day)
+        before = date_file.read_bytes()
+        with mock.patch("module.transaction_storage.os.fsync", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                storage.save_transaction({"type": "buy", "order_number": "B-0", "timestamp": TIMESTAMP})
+        self.assertEqual(date_file.read_bytes(), before)
+        self.assertEqual(list(Path(TEST_DIR).glob("*.tmp")), [])
+        self.assertEqual(len(storage.get_transactions_by_date(self.day)), 2)
+        self.assertIsNone(storage.get_transaction_by_order("B-0"))
+
+
+if __name__ == '__main__':
+    unittest.main()
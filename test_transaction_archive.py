@@ -0,0 +1,139 @@
+import shutil
+import subprocess
+import sys
+import unittest
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+# Thêm thư mục gốc vào PYTHONPATH
+root_dir = str(Path(__file__).parent)
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+
+from module.transaction_archive import TransactionArchive
+from module.transaction_storage import TransactionStorage
+
+TODAY = date(2024, 3, 10)
+
+
+def ts(day: date, hour=12) -> float:
+    return datetime(day.year, day.month, day.day, hour).timestamp()
+
+
+class TestTransactionArchive(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path("test_archive")
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+        self.archive = TransactionArchive(self.test_dir)
+        self.day = date(2024, 3, 1)
+        self.transactions = [
+            {"type": "BUY", "order_number": "1", "amount": "500000", "order_status": "COMPLETED",
+             "timestamp": ts(self.day, 1), "account_name": "NGUYỄN VĂN A"},
+            {"type": "sell", "order_number": "2", "amount": 1200000, "order_status": "TRADING",
+             "timestamp": ts(self.day, 2)},
+            {"type": "buy", "order_number": "3", "order_status": "COMPLETED", "timestamp": ts(self.day, 3)},
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_round_trip(self):
+        self.assertEqual(self.archive.write_day(self.day, self.transactions), 3)
+        self.assertEqual(self.archive.load(self.day), self.transactions)
+        self.assertEqual(self.archive.days(), [self.day])
+        self.assertEqual(self.archive.load(date(2024, 3, 2)), [])
+
+    def test_select_reads_columns(self):
+        self.archive.write_day(self.day, self.transactions)
+        archived = self.archive.open(self.day)
+        numbers = lambda rows: [t["order_number"] for t in rows]
+        self.assertEqual(numbers(archived.select(trade_type="buy")), ["1", "3"])
+        self.assertEqual(numbers(archived.select(order_status="TRADING")), ["2"])
+        self.assertEqual(numbers(archived.select(min_amount=600000)), ["2"])
+        # Giao dịch không có số tiền bị loại khi lọc theo số tiền
+        self.assertEqual(numbers(archived.select(max_amount=10 ** 9)), ["1", "2"])
+        self.assertEqual(archived.select(trade_type="unknown"), [])
+
+    def test_empty_day_and_rewrite(self):
+        self.archive.write_day(self.day, [])
+        self.assertEqual(self.archive.load(self.day), [])
+        self.assertEqual(len(self.archive.open(self.day).select(trade_type="buy")), 0)
+        self.archive.write_day(self.day, self.transactions[:1])
+        self.assertEqual(self.archive.load(self.day), self.transactions[:1])
+        self.assertEqual(sorted(p.name for p in self.test_dir.iterdir()), ["2024-03-01"])
+
+
+class TestClosedDayCompaction(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = "test_archive_storage"
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+        self.storage = TransactionStorage(self.test_dir)
+        self.all = []
+        for offset in range(4, -1, -1):
+            day = TODAY - timedelta(days=offset)
+            for i in range(3):
+                trans = {"type": "buy" if i else "sell", "order_number": f"{offset}-{i}",
+                         "amount": (i + 1) * 100, "timestamp": ts(day, 8 + i)}
+                self.storage.save_transaction(trans, order_status="COMPLETED")
+                self.all.append(trans["order_number"])
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def numbers(self, transactions):
+        return [t["order_number"] for t in transactions]
+
+    def test_compacts_only_closed_days(self):
+        result = self.storage.compact_closed_days(keep_days=2, today=TODAY)
+        self.assertEqual(result, {"archived_days": 3, "rows": 9})
+        remaining = sorted(p.name for p in Path(self.test_dir).glob("transactions_*.json"))
+        self.assertEqual(remaining, ["transactions_2024-03-09.json", "transactions_2024-03-10.json"])
+        # Chạy lại không làm gì thêm
+        self.assertEqual(self.storage.compact_closed_days(keep_days=2, today=TODAY)["archived_days"], 0)
+        self.assertEqual(self.storage.compact_closed_days(keep_days=0, today=TODAY)["archived_days"], 0)
+
+    def test_queries_read_archive(self):
+        before_range = self.storage.get_transactions_by_date_range(TODAY - timedelta(days=4), TODAY)
+        before_recent = self.storage.get_recent_transactions(20)
+        self.storage.compact_closed_days(keep_days=1, today=TODAY)
+        self.assertEqual(self.storage.get_transactions_by_date_range(TODAY - timedelta(days=4), TODAY),
+                         before_range)
+        self.assertEqual(self.storage.get_recent_transactions(20), before_recent)
+        self.assertEqual(self.numbers(self.storage.get_transactions_by_date(datetime(2024, 3, 7))),
+                         ["3-0", "3-1", "3-2"])
+        filtered = self.storage.get_transactions_by_date_range(
+            TODAY - timedelta(days=4), TODAY, trade_type="buy", min_amount=250)
+        self.assertEqual(self.numbers(filtered), [f"{d}-2" for d in range(4, -1, -1)])
+        self.assertEqual(sorted(self.storage.load_used_orders()), sorted(self.all))
+
+    def test_archived_day_can_be_updated(self):
+        self.storage.compact_closed_days(keep_days=1, today=TODAY)
+        self.assertTrue(self.storage.update_used_orders("4-1", "CANCELLED"))
+        day = datetime(2024, 3, 6)
+        self.assertEqual(self.storage.date_file_path(day).name, "transactions_2024-03-06.json")
+        self.assertTrue(self.storage.date_file_path(day).exists())
+        statuses = {t["order_number"]: t["order_status"] for t in self.storage.get_transactions_by_date(day)}
+        self.assertEqual(statuses, {"4-0": "COMPLETED", "4-1": "CANCELLED", "4-2": "COMPLETED"})
+        # JSON của ngày mở lại được ưu tiên, lần compact sau ghi đè archive
+        self.assertEqual(self.storage.compact_closed_days(keep_days=1, today=TODAY)["archived_days"], 1)
+        self.assertFalse(self.storage.date_file_path(day).exists())
+        self.assertEqual(self.storage.get_transactions_by_date_range(day, day, order_status="CANCELLED")[0]
+                         ["order_number"], "4-1")
+
+    def test_restore_to_json(self):
+        before = self.storage.get_transactions_by_date_range(TODAY - timedelta(days=4), TODAY)
+        self.storage.compact_closed_days(keep_days=1, today=TODAY)
+        self.assertEqual(self.storage.restore_archived_days([date(2024, 3, 6)]), 3)
+        self.assertTrue(self.storage.date_file_path(datetime(2024, 3, 6)).exists())
+        self.assertNotIn(date(2024, 3, 6), self.storage._engine.archive.days())
+        # Công cụ dòng lệnh khôi phục các ngày còn lại
+        subprocess.run([sys.executable, "-m", "module.transaction_archive", self.test_dir, "--restore", "all"],
+                       cwd=root_dir, check=True, capture_output=True)
+        self.assertEqual(self.storage._engine.archive.days(), [])
+        self.assertEqual(len(list(Path(self.test_dir).glob("transactions_*.json"))), 5)
+        self.assertEqual(self.storage.get_transactions_by_date_range(TODAY - timedelta(days=4), TODAY), before)
+        self.assertEqual(self.storage.restore_archived_days(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
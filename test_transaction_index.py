@@ -0,0 +1,85 @@
+import random
+import sys
+import unittest
+from pathlib import Path
+
+# Thêm thư mục gốc vào PYTHONPATH
+root_dir = str(Path(__file__).parent)
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+
+from module.transaction_index import TransactionIndex
+
+
+def brute_force(transactions, order_suffix="", trade_type=None, order_status=None):
+    """Cách lọc cũ: duyệt toàn bộ danh sách rồi sắp xếp"""
+    result = transactions
+    if order_suffix:
+        result = [t for t in result if str(t.get('order_number', '')).endswith(order_suffix)]
+    if trade_type:
+        result = [t for t in result if t.get('type', '').lower() == trade_type]
+    if order_status:
+        result = [t for t in result if t.get('order_status', '') == order_status]
+    return sorted(result, key=lambda x: x.get('timestamp', 0), reverse=True)
+
+
+class TestTransactionIndex(unittest.TestCase):
+    def setUp(self):
+        self.transactions = [
+            {"type": "buy", "order_number": "1001", "timestamp": 70, "order_status": "COMPLETED"},
+            {"type": "SELL", "order_number": "2001", "timestamp": 90, "order_status": "TRADING"},
+            {"type": "sell", "order_number": "3002", "timestamp": 80, "order_status": "COMPLETED"},
+        ]
+        self.index = TransactionIndex(self.transactions)
+
+    def numbers(self, mask, page=0, rows=10):
+        return [t["order_number"] for t in self.index.page(mask, page, rows)]
+
+    def test_no_filter_sorted_newest_first(self):
+        mask = self.index.query()
+        self.assertEqual(self.index.count(mask), 3)
+        self.assertEqual(self.numbers(mask), ["2001", "3002", "1001"])
+
+    def test_filters_intersect(self):
+        self.assertEqual(self.numbers(self.index.query("001")), ["2001", "1001"])
+        self.assertEqual(self.numbers(self.index.query(trade_type="sell")), ["2001", "3002"])
+        self.assertEqual(self.numbers(self.index.query(order_status="COMPLETED")), ["3002", "1001"])
+        self.assertEqual(self.numbers(self.index.query("1", "sell", "TRADING")), ["2001"])
+        self.assertEqual(self.index.query("001", "sell", "COMPLETED"), 0)
+        self.assertEqual(self.index.query("99001"), 0)
+
+    def test_paging(self):
+        mask = self.index.query(order_status="COMPLETED")
+        self.assertEqual(self.numbers(mask, 0, 1), ["3002"])
+        self.assertEqual(self.numbers(mask, 1, 1), ["1001"])
+        self.assertEqual(self.numbers(mask, 2, 1), [])
+        self.assertEqual(self.numbers(self.index.query(), 1, 2), ["1001"])
+
+    def test_matches_brute_force(self):
+        """Kết quả giống cách lọc cũ với dữ liệu ngẫu nhiên"""
+        rng = random.Random(7)
+        transactions = [
+            {
+                "type": rng.choice(["buy", "sell"]),
+                "order_number": str(rng.randrange(10 ** 6)),
+                "timestamp": rng.random(),
+                "order_status": rng.choice(["TRADING", "COMPLETED", "CANCELLED"]),
+            }
+            for _ in range(300)
+        ]
+        index = TransactionIndex(transactions)
+        for _ in range(100):
+            args = (
+                str(rng.randrange(100)) if rng.random() < 0.5 else "",
+                rng.choice([None, "buy", "sell"]),
+                rng.choice([None, "TRADING", "COMPLETED", "CANCELLED"]),
+            )
+            expected = brute_force(transactions, *args)
+            mask = index.query(*args)
+            self.assertEqual(index.count(mask), len(expected))
+            page = rng.randrange(3)
+            self.assertEqual(index.page(mask, page, 20), expected[page * 20:page * 20 + 20])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import os
+import shutil
+import sys
+import time
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+# Thêm thư mục gốc vào PYTHONPATH
+root_dir = str(Path(__file__).parent)
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+
+from PyQt5.QtCore import QCoreApplication
+
+from module.transaction_storage import TransactionStorage
+from transaction_loader import TransactionLoader, format_day_summary
+
+
+def make_transactions():
+    now = datetime.now().timestamp()
+    return [
+        {"type": "buy", "order_number": "1001", "amount": 100, "timestamp": now - 30, "order_status": "COMPLETED"},
+        {"type": "sell", "order_number": "2001", "amount": 200, "timestamp": now - 10, "order_status": "TRADING"},
+        {"type": "sell", "order_number": "3002", "amount": 300, "timestamp": now - 20, "order_status": "COMPLETED"},
+    ]
+
+
+class TestTransactionLoader(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def setUp(self):
+        self.test_dir = os.path.abspath("test_loader_transactions")
+        self.storage = TransactionStorage(self.test_dir)
+        for trans in make_transactions():
+            self.storage.save_transaction(trans)
+        self.loader = TransactionLoader(self.storage)
+        self.results = []
+        self.loader.page_ready.connect(lambda rid, result: self.results.append((rid, result)))
+
+    def tearDown(self):
+        self.loader.shutdown()
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def wait_results(self, count=1, timeout=2.0):
+        deadline = time.time() + timeout
+        while time.time() < deadline and len(self.results) < count:
+            self.app.processEvents()
+            time.sleep(0.01)
+
+    def test_page_and_clamp(self):
+        """Trang vượt quá tổng số trang được đưa về trang cuối"""
+        rid = self.loader.request(datetime.now().date(), 5, 2, reload=True)
+        self.wait_results()
+        self.assertEqual(len(self.results), 1)
+        got_rid, result = self.results[0]
+        self.assertEqual(got_rid, rid)
+        self.assertEqual(result["total"], 3)
+        self.assertEqual(result["page_index"], 1)
+        self.assertEqual([t["order_number"] for t in result["page"]], ["1001"])
+        self.assertTrue(result["reloaded"])
+        self.assertEqual(result["loaded"], 3)
+
+    def test_day_summary_from_rollups(self):
+        self.loader.request(datetime.now().date(), 0, 2, reload=True)
+        self.wait_results()
+        summary = self.results[0][1]["summary"]
+        self.assertEqual(sum(r["count"] for r in summary), 3)
+        self.assertEqual(format_day_summary(summary),
+                         "Mua: 1 lệnh · 100 ₫ (xong 1) | Bán: 2 lệnh · 500 ₫ (xong 1)")
+        self.assertEqual(format_day_summary([]), "Chưa có giao dịch")
+
+    def test_unchanged_file_not_reloaded(self):
+        day = datetime.now().date()
+        self.loader.request(day, 0, 10)
+        self.wait_results()
+        self.loader.request(day, 0, 10, trade_type="Mua")
+        self.wait_results(2)
+        result = self.results[-1][1]
+        self.assertFalse(result["reloaded"])
+        self.assertEqual([t["order_number"] for t in result["page"]], ["1001"])
+
+    def test_stale_requests_dropped(self):
+        """Nhiều yêu cầu liên tiếp: kết quả cuối cùng luôn là của yêu cầu mới nhất"""
+        day = datetime.now().date()
+        for suffix in ["1", "01", "001"]:
+            rid = self.loader.request(day, 0, 10, order_suffix=suffix)
+        self.wait_results()
+        # Chờ thêm để chắc chắn không còn kết quả nào về sau
+        end = time.time() + 0.2
+        while time.time() < end:
+            self.app.processEvents()
+            time.sleep(0.01)
+        self.assertEqual(self.results[-1][0], rid)
+        self.assertEqual([t["order_number"] for t in self.results[-1][1]["page"]], ["2001", "1001"])
+
+    def test_stale_request_not_emitted(self):
+        """Yêu cầu đã có yêu cầu mới hơn thì không phát kết quả"""
+        params = {"day": datetime.now().date(), "page": 0, "rows_per_page": 10, "order_suffix": "",
+                  "trade_type": "Tất cả", "order_status": "Tất cả", "reload": True}
+        old = self.loader.request(params["day"], 0, 10, reload=True)
+        self.loader.request(params["day"], 0, 10)
+        self.wait_results()
+        self.results.clear()
+        self.loader._process(old, params)
+        self.assertEqual(self.results, [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+import random
+import shutil
+import sys
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest import mock
+
+# Thêm thư mục gốc vào PYTHONPATH
+root_dir = str(Path(__file__).parent)
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+
+from module.transaction_storage import TransactionStorage
+
+START = datetime(2024, 5, 1)
+DAYS = 12
+
+
+class TestRecentTransactions(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.test_dir = "test_transaction_queries"
+        shutil.rmtree(cls.test_dir, ignore_errors=True)
+        cls.storage = TransactionStorage(cls.test_dir)
+        rng = random.Random(3)
+        cls.all = []
+        for day in range(DAYS):
+            for i in range(8):
+                moment = START + timedelta(days=day, minutes=rng.randrange(24 * 60))
+                trans = {
+                    "type": rng.choice(["buy", "sell"]),
+                    "order_number": f"{day}-{i}",
+                    "amount": i,
+                    "timestamp": moment.timestamp(),
+                }
+                cls.storage.save_transaction(trans, order_status=rng.choice(["TRADING", "COMPLETED"]))
+                cls.all.append(trans)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.test_dir, ignore_errors=True)
+
+    def brute_force(self, limit, offset=0, trade_type=None, order_status=None):
+        """Cách cũ: đọc toàn bộ lịch sử, sắp xếp rồi cắt"""
+        result = [t for t in self.all
+                  if (not trade_type or t["type"] == trade_type)
+                  and (not order_status or t["order_status"] == order_status)]
+        result.sort(key=lambda x: x["timestamp"], reverse=True)
+        return [t["order_number"] for t in result[offset:offset + limit]]
+
+    def numbers(self, transactions):
+        return [t["order_number"] for t in transactions]
+
+    def test_matches_full_sort(self):
+        for limit, offset in [(1, 0), (10, 0), (5, 7), (30, 40), (200, 0), (10, 95)]:
+            self.assertEqual(self.numbers(self.storage.get_recent_transactions(limit, offset)),
+                             self.brute_force(limit, offset), (limit, offset))
+
+    def test_filters(self):
+        self.assertEqual(
+            self.numbers(self.storage.get_recent_transactions(6, 2, trade_type="sell", order_status="COMPLETED")),
+            self.brute_force(6, 2, "sell", "COMPLETED"))
+        result = self.storage.get_recent_transactions(4, predicate=lambda t: t["amount"] == 3)
+        self.assertEqual(self.numbers(result), [f"{d}-3" for d in range(DAYS - 1, DAYS - 5, -1)])
+
+    def test_stops_early(self):
+        """Lấy vài giao dịch gần nhất chỉ đọc các file ngày mới nhất"""
+        engine = self.storage._engine
+        with mock.patch.object(engine, "read", wraps=engine.read) as read:
+            self.storage.get_recent_transactions(5)
+        self.assertEqual(read.call_count, 1)
+        with mock.patch.object(engine, "read", wraps=engine.read) as read:
+            self.storage.get_recent_transactions(5, offset=8)
+        self.assertEqual(read.call_count, 2)
+
+    def test_empty_limit(self):
+        self.assertEqual(self.storage.get_recent_transactions(0), [])
+
+
+class TestDateRange(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.test_dir = "test_transaction_range"
+        shutil.rmtree(cls.test_dir, ignore_errors=True)
+        cls.storage = TransactionStorage(cls.test_dir)
+        # Khoảng ngày vắt qua cuối tháng (cách tính ngày cũ lỗi ở 30/4 -> 31/4)
+        cls.start = datetime(2024, 4, 27)
+        cls.all = []
+        for day in range(8):
+            for i in range(5):
+                trans = {
+                    "type": "buy" if i % 2 else "sell",
+                    "order_number": f"{day}-{i}",
+                    "amount": str(i * 100),
+                    "timestamp": (cls.start + timedelta(days=day, hours=i)).timestamp(),
+                }
+                cls.storage.save_transaction(trans, order_status="COMPLETED" if i < 3 else "TRADING")
+                cls.all.append(trans)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.test_dir, ignore_errors=True)
+
+    def numbers(self, transactions):
+        return [t["order_number"] for t in transactions]
+
+    def test_crosses_month_boundary(self):
+        result = self.storage.get_transactions_by_date_range(self.start, self.start + timedelta(days=7))
+        self.assertEqual(self.numbers(result), self.numbers(self.all))
+        result = self.storage.get_transactions_by_date_range(datetime(2024, 4, 30, 23), datetime(2024, 5, 1))
+        self.assertEqual(self.numbers(result), [f"{d}-{i}" for d in (3, 4) for i in range(5)])
+
+    def test_filters(self):
+        result = self.storage.get_transactions_by_date_range(
+            self.start, self.start + timedelta(days=7), trade_type="BUY", order_status="COMPLETED")
+        self.assertEqual(self.numbers(result), [f"{d}-1" for d in range(8)])
+        result = self.storage.get_transactions_by_date_range(
+            self.start, self.start + timedelta(days=1), min_amount=150, max_amount=300)
+        self.assertEqual(self.numbers(result), ["0-2", "0-3", "1-2", "1-3"])
+        result = self.storage.get_transactions_by_date_range(
+            self.start, self.start, predicate=lambda t: t["order_number"].endswith("4"))
+        self.assertEqual(self.numbers(result), ["0-4"])
+
+    def test_parallel_matches_sequential(self):
+        end = self.start + timedelta(days=10)
+        sequential = list(self.storage.iter_transactions_by_date_range(self.start, end, max_workers=1))
+        for workers in (2, 3, 16):
+            parallel = list(self.storage.iter_transactions_by_date_range(self.start, end, max_workers=workers))
+            self.assertEqual(parallel, sequential, workers)
+
+    def test_lazy_and_bounded(self):
+        """Generator chỉ đọc trước tối đa max_workers ngày"""
+        engine = self.storage._engine
+        with mock.patch.object(engine, "read", wraps=engine.read) as read:
+            iterator = self.storage.iter_transactions_by_date_range(
+                self.start, self.start + timedelta(days=7), max_workers=2)
+            self.assertEqual(read.call_count, 0)
+            self.assertEqual(next(iterator)["order_number"], "0-0")
+            self.assertLessEqual(read.call_count, 2)
+            iterator.close()
+
+    def test_results_are_copies(self):
+        result = self.storage.get_transactions_by_date_range(self.start, self.start)
+        result[0]["amount"] = "changed"
+        self.assertEqual(self.storage.get_transactions_by_date_range(self.start, self.start)[0]["amount"], 0)
+
+    def test_used_orders_include_end_day(self):
+        start = self.start + timedelta(days=2, hours=1)
+        end = self.start + timedelta(days=4, minutes=30)
+        used = self.storage.load_used_orders(int(start.timestamp() * 1000), int(end.timestamp() * 1000))
+        expected = [t["order_number"] for t in self.all
+                    if start.timestamp() <= t["timestamp"] <= end.timestamp()]
+        self.assertEqual(sorted(used), sorted(expected))
+        self.assertIn("4-0", used)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import os
+import random
+import shutil
+import sys
+import unittest
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from unittest import mock
+
+# Thêm thư mục gốc vào PYTHONPATH
+root_dir = str(Path(__file__).parent)
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+
+from module import transaction_storage
+from module.transaction_storage import TransactionStorage
+
+START = date(2024, 6, 29)
+
+
+class TestTransactionRollup(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = "test_transaction_rollup"
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+        self.storage = TransactionStorage(self.test_dir)
+        rng = random.Random(7)
+        for i in range(60):
+            moment = datetime.combine(START, datetime.min.time()) + timedelta(minutes=rng.randrange(4 * 24 * 60))
+            self.storage.save_transaction({
+                "type": rng.choice(["buy", "sell"]),
+                "order_number": f"o{i}",
+                "amount": str(rng.randrange(1, 50) * 100000),
+                "crypto_amount": rng.randrange(1, 100) / 10,
+                "timestamp": moment.timestamp(),
+            }, order_status="TRADING")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def brute_force(self, start, end, by_hour=False):
+        """Cách cũ: tổng hợp lại từ các giao dịch thô"""
+        totals = defaultdict(lambda: [0, 0.0, 0.0])
+        for t in self.storage.get_transactions_by_date_range(start, end):
+            moment = datetime.fromtimestamp(t["timestamp"])
+            group = (moment.strftime("%Y-%m-%d"),) + ((moment.hour,) if by_hour else ()) \
+                + (t["type"], t.get("order_status", "UNKNOWN"))
+            totals[group][0] += 1
+            totals[group][1] += float(t["amount"])
+            totals[group][2] += t["crypto_amount"]
+        return {g: (c, round(f, 6), round(k, 6)) for g, (c, f, k) in totals.items()}
+
+    def rollup(self, start, end, by_hour=False):
+        result = {}
+        for row in self.storage.get_rollups(start, end, by_hour):
+            group = (row["day"],) + ((row["hour"],) if by_hour else ()) + (row["side"], row["status"])
+            result[group] = (row["count"], round(row["fiat_volume"], 6), round(row["crypto_volume"], 6))
+        return result
+
+    def assert_matches(self):
+        end = START + timedelta(days=3)
+        self.assertEqual(self.rollup(START, end), self.brute_force(START, end))
+        self.assertEqual(self.rollup(START, end, by_hour=True), self.brute_force(START, end, by_hour=True))
+        self.assertEqual(self.rollup(START + timedelta(days=1), START + timedelta(days=1)),
+                         self.brute_force(START + timedelta(days=1), START + timedelta(days=1)))
+
+    def test_maintained_on_write(self):
+        self.assert_matches()
+
+    def test_status_changes_and_overwrites(self):
+        for i in range(0, 60, 3):
+            self.assertTrue(self.storage.update_used_orders(f"o{i}", "COMPLETED"))
+        # Ghi đè một giao dịch (cùng order, số tiền mới)
+        existing = dict(self.storage.get_transactions_by_date_range(START, START + timedelta(days=3))[0])
+        existing["amount"] = "123"
+        self.storage.save_transaction(existing, order_status="CANCELLED")
+        self.assert_matches()
+
+    def test_rebuild(self):
+        rollup_file = Path(self.test_dir) / "rollups.json"
+        expected = self.rollup(START, START + timedelta(days=3), by_hour=True)
+        os.remove(rollup_file)
+        # Thiếu bảng tổng hợp thì tự dựng lại khi đọc
+        self.assertEqual(self.rollup(START, START + timedelta(days=3), by_hour=True), expected)
+        self.assertEqual(self.storage.rebuild_rollups(), 60)
+        self.assertEqual(self.rollup(START, START + timedelta(days=3), by_hour=True), expected)
+
+    def test_shared_between_instances(self):
+        other = TransactionStorage(self.test_dir)
+        other.update_used_orders("o1", "COMPLETED")
+        rows = self.storage.get_rollups(START, START + timedelta(days=3))
+        self.assertEqual(sum(r["count"] for r in rows if r["status"] == "COMPLETED"), 1)
+        self.assertEqual(sum(r["count"] for r in rows), 60)
+
+    def test_failed_commit_not_counted(self):
+        """Lô ghi lỗi (fsync) không được cộng vào bảng tổng hợp"""
+        end = START + timedelta(days=3)
+        expected = self.rollup(START, end)
+        with mock.patch("module.transaction_storage.os.fsync", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                self.storage.save_transaction({"type": "buy", "order_number": "x", "amount": 1,
+                                               "timestamp": datetime.combine(START, datetime.min.time()).timestamp()})
+        self.assertEqual(self.rollup(START, end), expected)
+        self.assert_matches()
+
+    def test_interrupted_commit_rebuilds(self):
+        """Process chết giữa rename và cập nhật rollup: lần mở sau dựng lại bảng tổng hợp"""
+        rollup_file = Path(self.test_dir) / "rollups.json"
+        rollup_file.write_text('{"2024-06-29": {"00|buy|TRADING": [999, 1.0, 1.0]}}', encoding="utf-8")
+        (Path(self.test_dir) / "rollups.dirty").touch()
+        transaction_storage._engines.pop(Path(self.test_dir).resolve())
+        self.storage = TransactionStorage(self.test_dir)
+        self.assertFalse((Path(self.test_dir) / "rollups.dirty").exists())
+        self.assert_matches()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+import sys
+from pathlib import Path
+
+# Thêm thư mục gốc vào PYTHONPATH
+root_dir = str(Path(__file__).parent)
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+
+from PyQt5.QtCore import QCoreApplication, Qt
+
+from transaction_table_model import TransactionTableModel
+
+
+def make_transaction(order_number, timestamp, status="TRADING", amount=100000):
+    return {
+        "type": "buy",
+        "order_number": order_number,
+        "amount": amount,
+        "bank_name": "VCB",
+        "account_number": "123",
+        "account_name": "A",
+        "message": "",
+        "timestamp": timestamp,
+        "order_status": status,
+    }
+
+
+class TestTransactionTableModel(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def setUp(self):
+        self.model = TransactionTableModel()
+        self.events = []
+        self.model.rowsInserted.connect(lambda p, a, b: self.events.append(("insert", a, b)))
+        self.model.rowsRemoved.connect(lambda p, a, b: self.events.append(("remove", a, b)))
+        self.model.rowsMoved.connect(lambda *args: self.events.append(("move",)))
+        self.model.dataChanged.connect(lambda a, b, *r: self.events.append(("changed", a.row())))
+
+    def orders(self):
+        return [self.model.index(r, 1).data() for r in range(self.model.rowCount())]
+
+    def test_unchanged_refresh_emits_nothing(self):
+        """Refresh không có thay đổi thì không phát signal nào"""
+        data = [make_transaction("1", 100), make_transaction("2", 90)]
+        self.model.set_transactions(data)
+        self.events.clear()
+        self.model.set_transactions([dict(t) for t in data])
+        self.assertEqual(self.events, [])
+
+    def test_only_changed_rows(self):
+        """Chỉ dòng mới và dòng đổi trạng thái phát signal"""
+        self.model.set_transactions([make_transaction("1", 100), make_transaction("2", 90)])
+        self.events.clear()
+        self.model.set_transactions([
+            make_transaction("3", 110),
+            make_transaction("1", 100, status="COMPLETED"),
+            make_transaction("2", 90),
+        ])
+        self.assertEqual(self.orders(), ["3", "1", "2"])
+        self.assertEqual(self.events, [("insert", 0, 0), ("changed", 1)])
+        self.assertEqual(self.model.index(1, 8).data(), "COMPLETED")
+
+    def test_remove_and_reorder(self):
+        """Dòng không còn bị xóa, dòng đổi vị trí được di chuyển"""
+        self.model.set_transactions([make_transaction(str(i), 100 - i) for i in range(5)])
+        self.model.set_transactions([make_transaction("4", 96), make_transaction("0", 100),
+                                     make_transaction("2", 98)])
+        self.assertEqual(self.orders(), ["4", "0", "2"])
+
+    def test_sort_is_kept(self):
+        """Thứ tự sắp xếp người dùng chọn được giữ qua các lần cập nhật"""
+        self.model.sort(7, Qt.AscendingOrder)
+        self.model.set_transactions([make_transaction("1", 300), make_transaction("2", 100),
+                                     make_transaction("3", 200)])
+        self.assertEqual(self.orders(), ["2", "3", "1"])
+        self.assertEqual(self.model.index(0, 7).data(Qt.UserRole), 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+# Thêm thư mục gốc vào PYTHONPATH
+root_dir = str(Path(__file__).parent)
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+
+from PyQt5.QtCore import QCoreApplication
+
+from module.transaction_storage import TransactionStorage
+from transaction_watcher import TransactionChangeWatcher
+
+
+class TestTransactionChangeWatcher(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def setUp(self):
+        self.test_dir = os.path.abspath("test_watcher_transactions")
+        self.storage = TransactionStorage(self.test_dir)
+        self.watcher = TransactionChangeWatcher(self.storage, debounce_ms=20)
+        self.events = []
+        self.watcher.changed.connect(self.events.append)
+        self.watcher.start(datetime.now().date())
+
+    def tearDown(self):
+        self.watcher.stop()
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def wait_events(self, timeout=2.0):
+        deadline = time.time() + timeout
+        while time.time() < deadline and not self.events:
+            self.app.processEvents()
+            time.sleep(0.01)
+        # Xử lý thêm một chút để gom các sự kiện dư
+        end = time.time() + 0.1
+        while time.time() < end:
+            self.app.processEvents()
+            time.sleep(0.01)
+
+    def test_no_change_no_event(self):
+        """Không có ghi thì không refresh"""
+        self.wait_events(timeout=0.3)
+        self.assertEqual(self.events, [])
+        self.assertFalse(self.watcher.check_now())
+
+    def test_storage_write_from_other_thread(self):
+        """Ghi từ thread khác (như P2PBinance) được báo về đúng một lần sau debounce"""
+        def write():
+            self.storage.save_transaction({"type": "sell", "order_number": "W1", "amount": 1})
+            self.storage.update_used_orders("W1", "COMPLETED")
+        thread = threading.Thread(target=write)
+        thread.start()
+        thread.join()
+        self.wait_events()
+        self.assertEqual(len(self.events), 1)
+
+    def test_external_write(self):
+        """File bị process khác ghi vẫn được phát hiện"""
+        day_file = self.storage.date_file_path(datetime.now())
+        with open(day_file, 'w', encoding='utf-8') as f:
+            json.dump([{"order_number": "X"}], f)
+        self.wait_events()
+        self.assertGreaterEqual(len(self.events), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+"""
+Đọc và lọc danh sách giao dịch ở thread nền cho tab "Giao dịch".
+Mục đích: Đọc file ngày, dựng chỉ mục tìm kiếm, lọc theo số order/loại/trạng thái và cắt trang
+ngoài thread UI; UI chỉ nhận trang đã sẵn sàng qua signal. Yêu cầu cũ (bộ lọc đã đổi)
+bị bỏ qua ngay khi có yêu cầu mới hơn. Tổng kết của ngày đọc từ bảng tổng hợp (rollup).
+"""
+
+import logging
+import threading
+
+from PyQt5.QtCore import QObject, QThread, pyqtSignal
+
+from module.transaction_index import TransactionIndex
+
+logger = logging.getLogger(__name__)
+
+# Nhãn combobox loại giao dịch -> giá trị 'type' trong file
+TYPE_MAP = {"Mua": "buy", "Bán": "sell"}
+ALL = "Tất cả"
+
+
+def format_day_summary(rows: list) -> str:
+    """Dòng tổng kết ngày từ TransactionStorage.get_rollups: số lệnh, khối lượng fiat, số lệnh đã xong"""
+    parts = []
+    for label, side in TYPE_MAP.items():
+        side_rows = [r for r in rows if r["side"] == side]
+        if not side_rows:
+            continue
+        count = sum(r["count"] for r in side_rows)
+        volume = sum(r["fiat_volume"] for r in side_rows)
+        completed = sum(r["count"] for r in side_rows if r["status"] == "COMPLETED")
+        parts.append(f"{label}: {count} lệnh · {volume:,.0f} ₫ (xong {completed})")
+    return " | ".join(parts) or "Chưa có giao dịch"
+
+
+class TransactionLoader(QObject):
+    # (request_id, kết quả): page, total, page_index, loaded, previous_loaded, reloaded, summary
+    page_ready = pyqtSignal(int, dict)
+    failed = pyqtSignal(int, str)
+    _requested = pyqtSignal(int, dict)
+
+    def __init__(self, storage):
+        """
+        Args:
+            storage: TransactionStorage dùng để đọc file ngày
+        """
+        super().__init__()
+        self.storage = storage
+        self._latest = 0
+        self._lock = threading.Lock()
+
+        # Chỉ truy cập trên thread nền
+        self._day = None
+        self._day_stat = None
+        self._index = TransactionIndex([])
+        self._filter_key = None
+        self._mask = 0
+        self._summary = []
+
+        self._thread = QThread()
+        self._thread.setObjectName("TransactionLoader")
+        self.moveToThread(self._thread)
+        self._requested.connect(self._process)
+        self._thread.start()
+
+    def request(self, day, page: int, rows_per_page: int, order_suffix: str = "",
+                trade_type: str = ALL, order_status: str = ALL, reload: bool = False) -> int:
+        """
+        Gửi yêu cầu tải một trang (không chờ). Trả về request_id; kết quả về qua page_ready.
+        Mọi yêu cầu cũ hơn chưa xong sẽ bị hủy.
+        """
+        with self._lock:
+            self._latest += 1
+            request_id = self._latest
+        self._requested.emit(request_id, {
+            "day": day,
+            "page": page,
+            "rows_per_page": rows_per_page,
+            "order_suffix": order_suffix,
+            "trade_type": trade_type,
+            "order_status": order_status,
+            "reload": reload,
+        })
+        return request_id
+
+    def _is_stale(self, request_id: int) -> bool:
+        with self._lock:
+            return request_id != self._latest
+
+    def _day_file_stat(self, day):
+        try:
+            st = self.storage.date_file_path(day).stat()
+            return st.st_mtime_ns, st.st_size
+        except FileNotFoundError:
+            return None
+
+    def _process(self, request_id: int, params: dict):
+        if self._is_stale(request_id):
+            return
+        try:
+            day = params["day"]
+            previous_loaded = len(self._index) if self._day == day else 0
+            stat = self._day_file_stat(day)
+            reloaded = params["reload"] or day != self._day or stat != self._day_stat
+            if reloaded:
+                self._index = TransactionIndex(self.storage.get_transactions_by_date(day))
+                self._summary = self.storage.get_rollups(day)
+                self._day, self._day_stat = day, stat
+                self._filter_key = None
+            if self._is_stale(request_id):
+                return
+
+            filter_key = (params["order_suffix"], params["trade_type"], params["order_status"])
+            if filter_key != self._filter_key:
+                order_suffix, trade_type, order_status = filter_key
+                self._mask = self._index.query(
+                    order_suffix,
+                    TYPE_MAP.get(trade_type),
+                    order_status if order_status != ALL else None,
+                )
+                self._filter_key = filter_key
+            if self._is_stale(request_id):
+                return
+
+            rows = params["rows_per_page"]
+            total = self._index.count(self._mask)
+            total_pages = (total + rows - 1) // rows
+            page = max(0, min(params["page"], total_pages - 1))
+            self.page_ready.emit(request_id, {
+                "page": self._index.page(self._mask, page, rows),
+                "total": total,
+                "page_index": page,
+                "loaded": len(self._index),
+                "previous_loaded": previous_loaded,
+                "reloaded": reloaded,
+                "summary": self._summary,
+            })
+        except Exception as e:
+            logger.error(f"Lỗi khi tải danh sách giao dịch: {e}")
+            self.failed.emit(request_id, str(e))
+
+    def shutdown(self):
+        """Dừng thread nền (gọi khi đóng cửa sổ)"""
+        self._thread.quit()
+        self._thread.wait()
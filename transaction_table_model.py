@@ -0,0 +1,193 @@
+"""
+Model cho bảng giao dịch (tab "Giao dịch").
+Mục đích: Cập nhật bảng theo diff (khóa theo order_number) thay vì dựng lại toàn bộ
+QTableWidgetItem mỗi lần refresh: chỉ các dòng thêm/xóa/đổi mới phát signal.
+"""
+
+from datetime import datetime
+
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+HEADERS = [
+    "Loại", "Số Order", "Số tiền", "Ngân hàng",
+    "Số TK", "Tên TK", "Thông tin", "Thời gian", "Trạng thái", "Action"
+]
+COL_ORDER = 1
+COL_AMOUNT = 2
+COL_TIME = 7
+
+
+def _format_amount(amount) -> str:
+    try:
+        return f"{int(float(amount)):,} VND"
+    except (TypeError, ValueError):
+        return str(amount or "")
+
+
+def display_row(trans: dict) -> tuple:
+    """Chuỗi hiển thị của từng cột cho một giao dịch"""
+    trans_type = trans.get('type', '').lower()
+    timestamp = trans.get('timestamp', 0)
+    return (
+        "Mua" if trans_type == 'buy' else "Bán",
+        str(trans.get('order_number', '')),
+        _format_amount(trans.get('amount')),
+        trans.get('bank_name', '') or '',
+        trans.get('account_number', '') or '',
+        trans.get('account_name', '') or '',
+        trans.get('message', '') or '',
+        datetime.fromtimestamp(timestamp).strftime('%H:%M:%S'),
+        trans.get('order_status', 'TRADING'),
+        "",
+    )
+
+
+class TransactionTableModel(QAbstractTableModel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []      # dict giao dịch theo thứ tự hiển thị
+        self._keys = []      # order_number tương ứng từng dòng
+        self._display = []   # tuple chuỗi hiển thị đã tính sẵn
+        self._sort = None    # (cột, thứ tự) người dùng chọn
+
+    # --- API của QAbstractTableModel ---
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row, col = index.row(), index.column()
+        if role == Qt.DisplayRole:
+            return self._display[row][col]
+        if role == Qt.TextAlignmentRole and col < 9:
+            return Qt.AlignCenter
+        if role == Qt.UserRole:
+            if col == COL_ORDER:
+                return self._rows[row].get('qr_path')
+            if col == COL_TIME:
+                return self._rows[row].get('timestamp', 0)
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """Sắp xếp theo cột; thứ tự này được giữ cho các lần cập nhật sau"""
+        self._sort = (column, order)
+        self.layoutAboutToBeChanged.emit()
+        rows = self._sorted(list(zip(self._rows, self._keys, self._display)))
+        old_keys = self._keys
+        self._rows = [r[0] for r in rows]
+        self._keys = [r[1] for r in rows]
+        self._display = [r[2] for r in rows]
+        position = {key: row for row, key in enumerate(self._keys)}
+        old_indexes = self.persistentIndexList()
+        new_indexes = [
+            self.index(position[old_keys[idx.row()]], idx.column()) for idx in old_indexes
+        ]
+        self.changePersistentIndexList(old_indexes, new_indexes)
+        self.layoutChanged.emit()
+
+    def _sorted(self, rows):
+        if self._sort is None:
+            return rows
+        column, order = self._sort
+        if column == COL_TIME:
+            key = lambda r: r[0].get('timestamp', 0)
+        elif column == COL_AMOUNT:
+            def key(r):
+                try:
+                    return float(r[0].get('amount') or 0)
+                except (TypeError, ValueError):
+                    return 0.0
+        else:
+            key = lambda r: r[2][column]
+        return sorted(rows, key=key, reverse=(order == Qt.DescendingOrder))
+
+    # --- Cập nhật theo diff ---
+    def set_transactions(self, transactions):
+        """
+        Thay nội dung bảng bằng danh sách mới, chỉ phát signal cho phần thay đổi:
+        dòng không còn -> rowsRemoved, dòng mới -> rowsInserted, dòng đổi vị trí -> rowsMoved,
+        dòng đổi nội dung -> dataChanged. Dòng giữ nguyên không phát gì.
+        """
+        seen = set()
+        incoming = []
+        for trans in transactions:
+            key = str(trans.get('order_number', ''))
+            if key in seen:
+                continue
+            seen.add(key)
+            incoming.append((trans, key, display_row(trans)))
+        incoming = self._sorted(incoming)
+
+        # 1. Xóa các dòng không còn (gộp các dòng liền nhau, duyệt từ dưới lên)
+        row = len(self._keys) - 1
+        while row >= 0:
+            if self._keys[row] in seen:
+                row -= 1
+                continue
+            last = row
+            while row - 1 >= 0 and self._keys[row - 1] not in seen:
+                row -= 1
+            self.beginRemoveRows(QModelIndex(), row, last)
+            del self._rows[row:last + 1]
+            del self._keys[row:last + 1]
+            del self._display[row:last + 1]
+            self.endRemoveRows()
+            row -= 1
+
+        # 2. Đưa từng dòng về đúng vị trí: giữ, di chuyển hoặc chèn
+        for target, (trans, key, display) in enumerate(incoming):
+            if target < len(self._keys) and self._keys[target] == key:
+                self._update_row(target, trans, display)
+                continue
+            try:
+                current = self._keys.index(key, target + 1)
+            except ValueError:
+                current = -1
+            if current >= 0:
+                self.beginMoveRows(QModelIndex(), current, current, QModelIndex(), target)
+                self._rows.insert(target, self._rows.pop(current))
+                self._keys.insert(target, self._keys.pop(current))
+                self._display.insert(target, self._display.pop(current))
+                self.endMoveRows()
+                self._update_row(target, trans, display)
+            else:
+                self.beginInsertRows(QModelIndex(), target, target)
+                self._rows.insert(target, trans)
+                self._keys.insert(target, key)
+                self._display.insert(target, display)
+                self.endInsertRows()
+
+    def _update_row(self, row, trans, display):
+        old = self._rows[row]
+        self._rows[row] = trans
+        qr_changed = (old.get('qr_hash'), old.get('qr_path')) != (trans.get('qr_hash'), trans.get('qr_path'))
+        if display != self._display[row] or qr_changed:
+            self._display[row] = display
+            self.dataChanged.emit(self.index(row, 0), self.index(row, len(HEADERS) - 1))
+
+    def transaction_at(self, row: int) -> dict:
+        """Giao dịch ở dòng `row` (None nếu ngoài phạm vi)"""
+        if 0 <= row < len(self._rows):
+            return self._rows[row]
+        return None
+
+    def row_of(self, order_number) -> int:
+        """Dòng của order (-1 nếu không có trên trang hiện tại)"""
+        try:
+            return self._keys.index(str(order_number))
+        except ValueError:
+            return -1
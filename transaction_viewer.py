@@ -3,9 +3,9 @@ from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                            QHBoxLayout, QLabel, QPushButton, QTableWidget, 
                            QTableWidgetItem, QDateEdit, QMessageBox, QHeaderView)
 from PyQt5.QtCore import Qt, QDate
-from PyQt5.QtGui import QPixmap
 from datetime import datetime
 from module.transaction_storage import TransactionStorage
+from qr_preview_cache import get_preview_cache
 import os
 from PyQt5.QtCore import pyqtSignal
 
@@ -18,6 +18,7 @@ class TransactionViewer(QMainWindow):
     def __init__(self, storage=None):
         super().__init__()
         self.storage = storage if storage else TransactionStorage()
+        self.qr_previews = get_preview_cache()
         self.initUI()
         
     def initUI(self):
@@ -133,8 +134,13 @@ class TransactionViewer(QMainWindow):
                 self.table.setItem(row, 7, QTableWidgetItem(time_str))
                 
                 # Lưu đường dẫn QR vào item
-                if 'qr_path' in trans:
-                    self.table.item(row, 1).setData(Qt.UserRole, trans['qr_path'])
+                qr_path = self.storage.qr_path_for(trans)
+                if qr_path:
+                    self.table.item(row, 1).setData(Qt.UserRole, qr_path)
+            
+            # Giải mã trước QR của các dòng đầu bảng (không vượt quá nửa dung lượng cache)
+            prefetch_rows = transactions[:self.qr_previews.max_items // 2]
+            self.qr_previews.prefetch(self.storage.qr_path_for(trans) for trans in prefetch_rows)
             
             # Căn giữa các cột
             for row in range(self.table.rowCount()):
@@ -190,13 +196,10 @@ class TransactionViewer(QMainWindow):
                 )
                 return
                 
-            # Hiển thị QR
-            pixmap = QPixmap(qr_path)
-            scaled_pixmap = pixmap.scaled(
-                300, 300,
-                Qt.KeepAspectRatio,
-                Qt.SmoothTransformation
-            )
+            # Hiển thị QR (ảnh đã thu nhỏ sẵn từ cache)
+            scaled_pixmap = self.qr_previews.get(qr_path)
+            if scaled_pixmap is None:
+                raise ValueError(f"File QR không hợp lệ: {qr_path}")
             self.qr_label.setPixmap(scaled_pixmap)
             self.qr_label.show()
             
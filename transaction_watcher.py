@@ -0,0 +1,114 @@
+"""
+Theo dõi thay đổi file giao dịch cho chế độ realtime.
+Mục đích: Chỉ refresh bảng giao dịch khi file ngày đang xem thực sự thay đổi,
+thay vì đọc lại file theo chu kỳ QTimer. Nguồn sự kiện: listener của TransactionStorage
+(ghi trong cùng process) và QFileSystemWatcher (ghi từ process khác).
+"""
+
+from datetime import date as date_type
+from pathlib import Path
+
+from PyQt5.QtCore import QFileSystemWatcher, QObject, QTimer, pyqtSignal
+
+
+class TransactionChangeWatcher(QObject):
+    # Phát ra (trên thread UI) khi file ngày đang theo dõi đã thay đổi
+    changed = pyqtSignal(str)
+    # Nội bộ: chuyển sự kiện từ thread ghi về thread UI
+    _storage_event = pyqtSignal(str)
+
+    def __init__(self, storage, debounce_ms: int = 150, parent=None):
+        """
+        Args:
+            storage: TransactionStorage của màn hình
+            debounce_ms: Gộp các sự kiện liên tiếp trong khoảng này thành một lần refresh
+        """
+        super().__init__(parent)
+        self.storage = storage
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._on_fs_event)
+        self._watcher.fileChanged.connect(self._on_fs_event)
+        self._storage_event.connect(self._on_storage_event)
+
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(debounce_ms)
+        self._debounce.timeout.connect(self.check_now)
+
+        self._day_file = None
+        self._last_stat = None
+        self._force = False
+        self._active = False
+
+    @property
+    def active(self) -> bool:
+        return self._active
+
+    def start(self, day: date_type):
+        """Bắt đầu theo dõi file giao dịch của ngày `day`"""
+        if not self._active:
+            self.storage.add_listener(self._on_storage_write)
+            self._active = True
+        self.set_date(day)
+
+    def stop(self):
+        if self._active:
+            self.storage.remove_listener(self._on_storage_write)
+            self._active = False
+        self._debounce.stop()
+        paths = self._watcher.files() + self._watcher.directories()
+        if paths:
+            self._watcher.removePaths(paths)
+
+    def set_date(self, day: date_type):
+        """Đổi ngày đang theo dõi (khi người dùng chọn ngày khác)"""
+        self._day_file = Path(self.storage.date_file_path(day)).resolve()
+        self._last_stat = self._stat()
+        if self._active:
+            self._rewatch()
+
+    def _rewatch(self):
+        directory = str(self._day_file.parent)
+        if directory not in self._watcher.directories():
+            self._watcher.addPath(directory)
+        stale = [f for f in self._watcher.files() if f != str(self._day_file)]
+        if stale:
+            self._watcher.removePaths(stale)
+        # File bị thay thế (ghi nguyên tử) hoặc vừa được tạo thì watcher mất dấu, cần thêm lại
+        if self._day_file.exists() and str(self._day_file) not in self._watcher.files():
+            self._watcher.addPath(str(self._day_file))
+
+    def _on_storage_write(self, date_file, order_number=None):
+        # Gọi từ thread ghi: chỉ phát signal, Qt tự chuyển về thread UI
+        self._storage_event.emit(str(date_file))
+
+    def _on_storage_event(self, path: str):
+        # Ghi trong process luôn được tính là thay đổi (không phụ thuộc độ phân giải mtime)
+        if self._day_file is not None and Path(path).resolve() == self._day_file:
+            self._force = True
+            self._on_fs_event(path)
+
+    def _on_fs_event(self, path: str):
+        if self._active:
+            self._debounce.start()
+
+    def _stat(self):
+        try:
+            st = self._day_file.stat()
+            return st.st_mtime_ns, st.st_size
+        except (FileNotFoundError, AttributeError):
+            return None
+
+    def check_now(self) -> bool:
+        """So sánh mtime/size của file ngày; phát `changed` nếu khác lần trước"""
+        if self._day_file is None:
+            return False
+        if self._active:
+            self._rewatch()
+        current = self._stat()
+        if current == self._last_stat and not self._force:
+            return False
+        self._last_stat = current
+        self._force = False
+        self.changed.emit(str(self._day_file))
+        return True